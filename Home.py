@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+
+from charts import map_win_rate_bar
+from data_loader import load_clean_data
+from tenants import spreadsheet_selector
+from views import map_summary
 
 # ---------------------------------------------------------
 # PAGE CONFIG
 # ---------------------------------------------------------
 st.set_page_config(page_title="Valorant Scrim Dashboard", layout="wide")
+spreadsheet_selector()
 
 # Logo + title
 col1, col2 = st.columns([1, 10])
@@ -15,6 +20,15 @@ with col2:
     st.markdown("<h1 style='color:#d4af37;'>Valorant Scrim Dashboard</h1>", unsafe_allow_html=True)
 
 
+try:
+    matches = load_clean_data()
+except Exception as e:
+    st.error(f"❌ Error loading Match History sheet: {e}")
+    st.stop()
+
+dates = matches["DATE"].dropna() if "DATE" in matches.columns else pd.Series(dtype="datetime64[ns]")
+
+
 # ---------------------------------------------------------
 # DATE FILTER
 # ---------------------------------------------------------
@@ -22,29 +36,27 @@ st.markdown("### 🔎 Filter by Date Range")
 
 c1, c2 = st.columns(2)
 with c1:
-    start_date = st.date_input("Start Date (Overview)")
+    start_date = st.date_input("Start Date (Overview)", value=dates.min() if len(dates) else None)
 with c2:
-    end_date = st.date_input("End Date (Overview)")
+    end_date = st.date_input("End Date (Overview)", value=dates.max() if len(dates) else None)
+
+if len(dates) and start_date:
+    matches = matches[matches["DATE"] >= pd.Timestamp(start_date)]
+if len(dates) and end_date:
+    matches = matches[matches["DATE"] < pd.Timestamp(end_date) + pd.Timedelta(days=1)]
 
 st.write("---")
 
 
 # ---------------------------------------------------------
-# MAP OVERVIEW TABLE (Example Placeholder)
+# MAP OVERVIEW TABLE (AGGREGATED SERVER-SIDE: ONE ROW PER MAP)
 # ---------------------------------------------------------
 
 st.markdown("### 🗺️ Map Overview: Total Games, Wins, Draws, Losses, Win Rate")
 
-map_data = pd.DataFrame({
-    "Map": ["Ascent", "Fracture", "Icebox", "Lotus", "Split"],
-    "Games": [10, 6, 9, 3, 4],
-    "Wins": [7, 3, 6, 1, 1],
-    "Draws": [2, 2, 3, 1, 1],
-    "Losses": [1, 1, 0, 1, 1],
-    "Win Rate": [0.70, 0.50, 0.66, 0.33, 0.25]
-})
+map_data = map_summary(matches)
 
-st.dataframe(map_data, use_container_width=True)
+st.dataframe(map_data.style.format({"Win Rate": "{:.1f}%"}), use_container_width=True)
 st.write("---")
 
 
@@ -54,21 +66,7 @@ st.write("---")
 
 st.markdown("### 📊 Map Win Rates")
 
-fig = px.bar(
-    map_data,
-    x="Win Rate",
-    y="Map",
-    orientation='h',
-    text=map_data["Win Rate"].apply(lambda x: f"{x*100:.1f}%"),
-    color="Win Rate",
-    color_continuous_scale=["red", "orange", "yellow"]
-)
-
-fig.update_layout(
-    paper_bgcolor="#0f1113",
-    plot_bgcolor="#0f1113",
-    font=dict(color="white"),
-    showlegend=False
-)
-
-st.plotly_chart(fig, use_container_width=True)
+if map_data.empty:
+    st.warning("No matches in this date range.")
+else:
+    st.plotly_chart(map_win_rate_bar(map_data, "Map", "Win Rate"), use_container_width=True)
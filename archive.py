@@ -0,0 +1,245 @@
+"""Streaming ingest of archived match history exports.
+
+Old seasons live in CSV/XLSX exports of the "All Match History" worksheet,
+under HS_ARCHIVE_DIR (<dir>/<spreadsheet>/ or <dir>/). Each file is read
+ARCHIVE_CHUNK_ROWS rows at a time, cleaned with the same
+data_loader.clean_match_history as the live sheet, and folded into running
+per-map / per-opponent / per-month totals. Only one chunk and the totals are
+ever in memory.
+
+Several changed files are ingested in parallel (see ingest.py). XLSX files
+need the optional `openpyxl` package.
+
+    python archive.py old_season.csv
+"""
+import csv
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from cache import resize, resource
+from data_loader import clean_match_history
+from ingest import from_ipc, run_parallel, to_ipc
+from tenants import current_spreadsheet
+
+ARCHIVE_DIR = os.environ.get("HS_ARCHIVE_DIR", "archive")
+ARCHIVE_CHUNK_ROWS = 5000
+ARCHIVE_EXTENSIONS = (".csv", ".xlsx")
+
+# Header search: the export's header row is the first with these cells
+HEADER_CELLS = {"Opponent", "Map"}
+HEADER_SEARCH_ROWS = 20
+
+# Totals kept per group; rates are derived from them after folding
+SUM_COLUMNS = [
+    "Games", "Wins", "Losses", "Ties", "Won", "Lost",
+    "ATK W", "ATK L", "DEF W", "DEF L", "Pistols (ATK)", "Pistols (DEF)"
+]
+
+AGGREGATES = {
+    "by_map": ["Map"],
+    "by_opponent": ["Opponent"],
+    "by_month": ["Month"],
+    "by_map_type": ["Map", "Type of Match"],
+}
+
+
+# ---------------------------------------------------------
+# CHUNKED READERS (RAW GRID ROWS)
+# ---------------------------------------------------------
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            yield row
+
+
+def _iter_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Reading .xlsx archives needs openpyxl (pip install openpyxl).") from e
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb["All Match History"] if "All Match History" in wb.sheetnames else wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            yield ["" if v is None else str(v) for v in row]
+    finally:
+        wb.close()
+
+
+def iter_raw_chunks(path, chunk_rows=ARCHIVE_CHUNK_ROWS):
+    """Yield raw grids shaped like the live sheet (header at row 2), each
+    holding the header and up to `chunk_rows` data rows."""
+    rows = _iter_xlsx(path) if path.lower().endswith(".xlsx") else _iter_csv(path)
+
+    header = None
+    for i, row in enumerate(rows):
+        if HEADER_CELLS <= {c.strip() for c in row}:
+            header = [c.strip() for c in row]
+            break
+        if i >= HEADER_SEARCH_ROWS:
+            break
+    if header is None:
+        raise ValueError(f"No match history header (Opponent, Map) in {os.path.basename(path)}.")
+
+    width = len(header)
+    chunk = []
+    for row in rows:
+        chunk.append((row + [""] * (width - len(row)))[:width])
+        if len(chunk) >= chunk_rows:
+            yield [[], [], header] + chunk
+            chunk = []
+    if chunk:
+        yield [[], [], header] + chunk
+
+
+# ---------------------------------------------------------
+# FOLDING CLEANED CHUNKS INTO TOTALS
+# ---------------------------------------------------------
+def chunk_totals(df):
+    """{aggregate: per-group sums} for one cleaned chunk."""
+    work = pd.DataFrame(index=df.index)
+    result = df["Result"] if "Result" in df.columns else pd.Series("", index=df.index)
+    work["Games"] = 1
+    work["Wins"] = (result == "Win").astype(int)
+    work["Losses"] = (result == "Loss").astype(int)
+    work["Ties"] = (result == "Tie").astype(int)
+    for c in SUM_COLUMNS[4:]:
+        work[c] = pd.to_numeric(df[c], errors="coerce").fillna(0) if c in df.columns else 0
+
+    keys = pd.DataFrame(index=df.index)
+    for c in ["Map", "Opponent", "Type of Match"]:
+        keys[c] = df[c].fillna("") if c in df.columns else ""
+    if "DATE" in df.columns:
+        keys["Month"] = df["DATE"].dt.to_period("M").astype(str).where(df["DATE"].notna(), "")
+    else:
+        keys["Month"] = ""
+
+    return {
+        name: work.groupby([keys[c] for c in by]).sum()
+        for name, by in AGGREGATES.items()
+    }
+
+
+def fold(totals, chunk):
+    """Add one chunk's totals into the running ones."""
+    if totals is None:
+        return chunk
+    return {name: totals[name].add(chunk[name], fill_value=0) for name in totals}
+
+
+def ingest_file(path, chunk_rows=ARCHIVE_CHUNK_ROWS):
+    """Stream one archive file into totals. Returns (totals, stats)."""
+    totals, rows, chunks = None, 0, 0
+    for raw in iter_raw_chunks(path, chunk_rows):
+        df = clean_match_history(raw)
+        totals = fold(totals, chunk_totals(df))
+        rows += len(df)
+        chunks += 1
+    if totals is None:
+        totals = chunk_totals(clean_match_history([[], [], list(HEADER_CELLS)]))
+    return totals, {"File": os.path.basename(path), "Matches": rows, "Chunks": chunks}
+
+
+def ingest_file_ipc(path):
+    """Worker side of ingest_archives: ingest_file with the totals as Arrow
+    IPC buffers."""
+    totals, stats = ingest_file(path)
+    return {name: to_ipc(t.reset_index()) for name, t in totals.items()}, stats
+
+
+def ingest_archives(paths, workers=None):
+    """[(totals, stats)] for each path, files spread over the ingest pool."""
+    return [
+        ({name: from_ipc(buf).set_index(AGGREGATES[name]) for name, buf in buffers.items()}, stats)
+        for buffers, stats in run_parallel(ingest_file_ipc, [(p,) for p in paths], workers)
+    ]
+
+
+def finish(totals):
+    """Totals → display tables with win and side rates."""
+    out = {}
+    for name, t in totals.items():
+        t = t.reset_index()
+        t = t[(t[AGGREGATES[name]] != "").all(axis=1)].copy()
+        t[SUM_COLUMNS] = t[SUM_COLUMNS].round().astype(int)
+        atk = t["ATK W"] + t["ATK L"]
+        dfn = t["DEF W"] + t["DEF L"]
+        t["Win Rate"] = t["Wins"] / t["Games"].where(t["Games"] > 0) * 100
+        t["ATK WR"] = t["ATK W"] / atk.where(atk > 0) * 100
+        t["DEF WR"] = t["DEF W"] / dfn.where(dfn > 0) * 100
+        t["Round Diff"] = (t["ATK W"] + t["DEF W"]) - (t["ATK L"] + t["DEF L"])
+        out[name] = t.sort_values(AGGREGATES[name]).reset_index(drop=True)
+    return out
+
+
+# ---------------------------------------------------------
+# ARCHIVE DIRECTORY (EACH FILE INGESTED ONCE PER VERSION)
+# ---------------------------------------------------------
+def archive_files(spreadsheet=None, archive_dir=None):
+    archive_dir = archive_dir or ARCHIVE_DIR
+    nested = os.path.join(archive_dir, spreadsheet or "")
+    folder = nested if spreadsheet and os.path.isdir(nested) else archive_dir
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, f) for f in os.listdir(folder)
+        if f.lower().endswith(ARCHIVE_EXTENSIONS)
+    )
+
+
+def get_ingested(spreadsheet):
+    # path -> (size, mtime, totals, stats); totals are small, raw rows are gone.
+    # Kept in the spreadsheet's partition of the budgeted cache.
+    return resource("archive", lambda: {"lock": threading.Lock(), "files": {}}, spreadsheet)
+
+
+def archive_totals(spreadsheet=None, archive_dir=None):
+    """Folded totals over every archive file, plus per-file stats. Files are
+    re-read only when their size or mtime changes."""
+    spreadsheet = spreadsheet or current_spreadsheet()
+    store = get_ingested(spreadsheet)
+    paths = archive_files(spreadsheet, archive_dir)
+
+    versions, stale = {}, []
+    for path in paths:
+        st_info = os.stat(path)
+        versions[path] = (st_info.st_size, st_info.st_mtime)
+        with store["lock"]:
+            entry = store["files"].get(path)
+        if entry is None or entry[0] != versions[path]:
+            stale.append(path)
+
+    # Changed files (e.g. several seasons on first load) are parsed in parallel
+    for path, (file_totals, file_stats) in zip(stale, ingest_archives(stale)):
+        with store["lock"]:
+            store["files"][path] = (versions[path], file_totals, file_stats)
+    if stale:
+        with store["lock"]:
+            resize("archive", store, spreadsheet)
+
+    totals, stats = None, []
+    with store["lock"]:
+        entries = [store["files"][path] for path in paths]
+    for _, file_totals, file_stats in entries:
+        totals = fold(totals, file_totals)
+        stats.append(file_stats)
+
+    return totals, pd.DataFrame(stats, columns=["File", "Matches", "Chunks"])
+
+
+def all_time_tables(live_df, spreadsheet=None, archive_dir=None):
+    """Archive totals folded with the live sheet's cleaned frame."""
+    totals, stats = archive_totals(spreadsheet, archive_dir)
+    totals = fold(totals, chunk_totals(live_df))
+    return finish(totals), stats
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        file_totals, file_stats = ingest_file(path)
+        print(f"{file_stats['File']}: {file_stats['Matches']} matches in {file_stats['Chunks']} chunks")
+        print(finish(file_totals)["by_map"].to_string(index=False))
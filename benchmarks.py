@@ -0,0 +1,216 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from comps import AGENT_ROLES
+from trends import ROUNDS_PER_SCRIM
+
+ROLES = ["Duelist", "Controller", "Initiator", "Sentinel"]
+
+METRICS = ["ACS", "KPR", "FK per Round", "K+A per Round"]
+
+# Local pro-player stat lines (CSV or Parquet), one row per player line.
+# Needs a role (a Role column, or an Agent/Agents column whose first agent
+# gives it) and the metrics, under any of the names in PRO_COLUMNS.
+PRO_STATS_PATH = os.environ.get("HS_PRO_STATS", "pro_stats.parquet")
+
+PRO_COLUMNS = {
+    "ACS": ["acs", "average combat score"],
+    "KPR": ["kpr", "kills per round"],
+    "FK per Round": ["fk per round", "fkpr", "first kills per round"],
+    "K+A per Round": ["k+a per round", "kapr"],
+    "APR": ["apr", "assists per round"],
+}
+
+
+# ---------------------------------------------------------
+# HELPER: FIND COLUMN BY NAMES
+# ---------------------------------------------------------
+def find(df, names):
+    for c in df.columns:
+        if c.lower() in [n.lower() for n in names]:
+            return c
+    for c in df.columns:
+        for n in names:
+            if n.lower() in c.lower():
+                return c
+    return None
+
+
+# ---------------------------------------------------------
+# PLAYER METRICS
+# ---------------------------------------------------------
+def player_metrics(df_p):
+    """ACS, KPR, FK per Round and K+A per Round for one player's scrims.
+    Rounds are estimated as scrims × ROUNDS_PER_SCRIM."""
+    kills_col   = find(df_p, ["kills"])
+    assists_col = find(df_p, ["assists"])
+    acs_col     = find(df_p, ["acs"])
+    fk_col      = find(df_p, ["fk", "first kill"])
+
+    def safe_sum(col):
+        return pd.to_numeric(df_p[col], errors="coerce").fillna(0).sum() if col else 0
+
+    def safe_mean(col):
+        return pd.to_numeric(df_p[col], errors="coerce").dropna().mean() if col else np.nan
+
+    total_rounds = len(df_p) * ROUNDS_PER_SCRIM
+
+    total_kills   = safe_sum(kills_col)
+    total_assists = safe_sum(assists_col)
+    total_fk      = safe_sum(fk_col)
+
+    return {
+        "ACS": safe_mean(acs_col),
+        "KPR": total_kills / total_rounds if total_rounds > 0 else np.nan,
+        "FK per Round": total_fk / total_rounds if total_rounds > 0 else np.nan,
+        "K+A per Round": (total_kills + total_assists) / total_rounds if total_rounds > 0 else np.nan
+    }
+
+
+# ---------------------------------------------------------
+# STATIC VCT BENCHMARK SET
+# ---------------------------------------------------------
+VCT_BENCHMARKS = {
+    "controller": {
+        "ACS": 199,
+        "KPR": 0.70,
+        "FK per Round": 0.10,
+        "K+A per Round": 0.92
+    },
+    "duelist": {
+        "ACS": 232,
+        "KPR": 0.83,
+        "FK per Round": 0.18,
+        "K+A per Round": 1.05
+    },
+    "initiator": {
+        "ACS": 209,
+        "KPR": 0.74,
+        "FK per Round": 0.11,
+        "K+A per Round": 1.06
+    },
+    "sentinel": {
+        "ACS": 183,
+        "KPR": 0.63,
+        "FK per Round": 0.08,
+        "K+A per Round": 0.78
+    }
+}
+
+
+# Avoid division errors
+def norm(p, b):
+    if b is None or pd.isna(b) or b == 0 or pd.isna(p):
+        return 0
+    return p / b
+
+
+# ---------------------------------------------------------
+# PRO STAT DISTRIBUTION (SORTED PER-ROLE ARRAYS)
+# ---------------------------------------------------------
+def agent_role(agent):
+    agent = str(agent).split(",")[0].strip().lower()
+    return next((role for role, agents in AGENT_ROLES.items() if agent in [a.lower() for a in agents]), None)
+
+
+def build_distribution(pro):
+    """{role: {metric: sorted float array}} from raw pro stat lines."""
+    role_col = find(pro, ["role"])
+    if role_col is not None:
+        roles = pro[role_col].astype(str).str.strip().str.lower()
+    else:
+        agent_col = find(pro, ["agent", "agents"])
+        if agent_col is None:
+            raise ValueError("Pro stats need a Role or Agent column.")
+        roles = pro[agent_col].map(agent_role).str.lower()
+
+    values = {}
+    for metric, names in PRO_COLUMNS.items():
+        col = next((c for c in pro.columns if c.strip().lower() in names), None)
+        if col is not None:
+            values[metric] = pd.to_numeric(pro[col].astype(str).str.rstrip("%"), errors="coerce")
+    if "K+A per Round" not in values and "KPR" in values and "APR" in values:
+        values["K+A per Round"] = values["KPR"] + values["APR"]
+
+    dist = {}
+    for role in [r.lower() for r in ROLES]:
+        in_role = (roles == role).to_numpy()
+        dist[role] = {
+            m: np.sort(v.to_numpy(dtype=float)[in_role & v.notna().to_numpy()])
+            for m, v in values.items() if m in METRICS
+        }
+    return dist
+
+
+@st.cache_resource
+def _load_distribution(path, mtime):
+    pro = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    return build_distribution(pro)
+
+
+def load_distribution(path=None):
+    """The pro distribution, reloaded when the file changes; None if there
+    is no pro stats file."""
+    path = path or PRO_STATS_PATH
+    if not os.path.exists(path):
+        return None
+    return _load_distribution(path, os.path.getmtime(path))
+
+
+def percentiles(sorted_values, values):
+    """Percentile (0-100) of each value within a sorted array; ties count
+    half, so a value equal to every pro line sits at 50."""
+    values = np.asarray(values, dtype=float)
+    n = len(sorted_values)
+    if n == 0:
+        return np.full(values.shape, np.nan)
+    below = np.searchsorted(sorted_values, values, side="left")
+    at_or_below = np.searchsorted(sorted_values, values, side="right")
+    pct = (below + at_or_below) / 2 / n * 100
+    return np.where(np.isnan(values), np.nan, pct)
+
+
+def role_benchmarks(role, dist=None):
+    """Per-metric benchmark for a role: the pro median when a distribution is
+    loaded, else the static VCT averages."""
+    role = role.lower()
+    if dist is not None and any(len(a) for a in dist.get(role, {}).values()):
+        return {m: float(np.median(a)) if len(a) else np.nan for m, a in dist[role].items()}
+    return VCT_BENCHMARKS[role]
+
+
+def rank_roster(metrics_df, dist, role_col="Role"):
+    """Add a "<metric> pct" column per metric: each player's percentile
+    among pro lines of their role. One searchsorted per role and metric."""
+    out = metrics_df.copy()
+    for m in METRICS:
+        out[f"{m} pct"] = np.nan
+    for role, rows in out.groupby(out[role_col].str.lower()).groups.items():
+        for m, arr in dist.get(role, {}).items():
+            if m in out.columns:
+                out.loc[rows, f"{m} pct"] = percentiles(arr, out.loc[rows, m])
+    return out
+
+
+def compare_to_benchmark(metrics, role, dist=None):
+    """Metric / Player (normalized) / VCT Bench / Delta table for a role,
+    plus each metric's pro percentile when a distribution is loaded."""
+    bench = role_benchmarks(role, dist)
+    names = list(metrics.keys())
+    player_vals = [norm(metrics[m], bench.get(m)) for m in names]
+    comp_df = pd.DataFrame({
+        "Metric": names,
+        "Player": player_vals,
+        "VCT Bench": [1 for _ in names]
+    })
+    comp_df["Delta"] = comp_df["Player"] - comp_df["VCT Bench"]
+
+    if dist is not None:
+        arrays = dist.get(role.lower(), {})
+        comp_df["Percentile"] = [
+            percentiles(arrays[m], [metrics[m]])[0] if m in arrays else np.nan for m in names
+        ]
+    return comp_df
@@ -0,0 +1,305 @@
+import functools
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared_cache import owned_nbytes
+from tenants import current_spreadsheet
+
+# Total bytes of cached tables kept across every spreadsheet in this process.
+# Can be changed at runtime from the Cache Status page.
+CACHE_BUDGET_MB = float(os.environ.get("HS_CACHE_BUDGET_MB", "512"))
+
+# Containers with more items than this are sized from a sample of them
+SIZE_SAMPLE = 200
+
+
+def nbytes(obj):
+    """Approximate in-memory size of a cached value. Frames mapped from the
+    shared directory count only the bytes this process holds itself; the
+    mapped pages belong to the OS page cache, not to this replica."""
+    if isinstance(obj, pd.DataFrame):
+        owned = owned_nbytes(obj)
+        if owned is not None:
+            return owned
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, sqlite3.Connection):
+        # An in-memory database: its pages
+        pages = obj.execute("PRAGMA page_count").fetchone()[0]
+        return pages * obj.execute("PRAGMA page_size").fetchone()[0]
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + _sampled(obj.items(), len(obj), lambda kv: nbytes(kv[0]) + nbytes(kv[1]))
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + _sampled(obj, len(obj), nbytes)
+    return sys.getsizeof(obj)
+
+
+def _sampled(items, n, size):
+    # Big containers (e.g. a search index's postings) are measured on an
+    # evenly spaced sample and scaled; walking every item takes seconds
+    if n <= SIZE_SAMPLE:
+        return sum(size(v) for v in items)
+    step = n // SIZE_SAMPLE
+    sample = [size(v) for v in itertools.islice(items, 0, None, step)]
+    return int(sum(sample) / len(sample) * n)
+
+
+def _label(key):
+    # ("data_loader", "load_clean_data", args, kwargs) -> "load_clean_data"
+    # ("derived", "comp_index", version)               -> "derived:comp_index"
+    # ("chunks", "Scrim Stats", player)                 -> "chunks:Scrim Stats/player"
+    if key[0] == "derived":
+        return f"derived:{key[1]}"
+    if key[0] == "chunks":
+        return "chunks:" + "/".join(str(k) for k in key[1:])
+    args = ", ".join(str(a) for a in key[2])
+    return f"{key[1]}({args})"
+
+
+class BudgetedCache:
+    """Cached values partitioned by spreadsheet, with one byte budget shared by
+    all partitions and hit/miss/eviction counters.
+
+    Values are returned as-is (not copied like st.cache_data), so callers must
+    not modify cached frames in place. When over budget, the least recently
+    used spreadsheet is dropped first; inside the last remaining one, the least
+    recently used entry goes."""
+
+    def __init__(self, budget_bytes):
+        self.budget = budget_bytes
+        self.partitions = OrderedDict()   # spreadsheet -> OrderedDict(key -> entry)
+        self.total = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def get(self, spreadsheet, key, build, ttl=None):
+        now = time.time()
+
+        with self.lock:
+            part = self.partitions.get(spreadsheet)
+            entry = part.get(key) if part is not None else None
+
+            if entry is not None and entry["expires"] is not None and entry["expires"] < now:
+                self._drop(spreadsheet, key)
+                self.expired += 1
+                entry = None
+
+            if entry is not None:
+                self.partitions.move_to_end(spreadsheet)
+                part.move_to_end(key)
+                entry["hits"] += 1
+                self.hits += 1
+                return entry["value"]
+
+            self.misses += 1
+
+        started = time.perf_counter()
+        value = build()
+        return self.put(spreadsheet, key, value, ttl, (time.perf_counter() - started) * 1000)
+
+    def put(self, spreadsheet, key, value, ttl=None, build_ms=0.0):
+        """Store a value built elsewhere (e.g. parsed in a worker process)."""
+        size = nbytes(value)
+        with self.lock:
+            self._insert(spreadsheet, key, value, size, ttl, build_ms)
+        return value
+
+    def peek(self, spreadsheet, key):
+        """The cached value, or None, without counting a hit or a miss."""
+        with self.lock:
+            entry = (self.partitions.get(spreadsheet) or {}).get(key)
+            return entry["value"] if entry is not None else None
+
+    def replace(self, spreadsheet, key, expected, value, ttl=None):
+        """Put `value` only if the entry still holds `expected` (or was
+        dropped), so an undo can't clobber a newer value. Returns whether it
+        did."""
+        size = nbytes(value)
+        with self.lock:
+            part = self.partitions.get(spreadsheet) or {}
+            entry = part.get(key)
+            if entry is not None and entry["value"] is not expected:
+                return False
+            self._insert(spreadsheet, key, value, size, ttl, 0.0)
+        return True
+
+    def _insert(self, spreadsheet, key, value, size, ttl, build_ms):
+        now = time.time()
+        part = self.partitions.setdefault(spreadsheet, OrderedDict())
+        if key in part:
+            self.total -= part[key]["size"]
+        part[key] = {
+            "value": value,
+            "size": size,
+            "created": now,
+            "expires": now + ttl if ttl else None,
+            "build_ms": build_ms,
+            "hits": 0,
+        }
+        self.partitions.move_to_end(spreadsheet)
+        self.total += size
+        self._evict(spreadsheet, key)
+
+    def _drop(self, spreadsheet, key):
+        part = self.partitions[spreadsheet]
+        self.total -= part.pop(key)["size"]
+        if not part:
+            del self.partitions[spreadsheet]
+
+    def _evict(self, keep_spreadsheet, keep_key):
+        while self.total > self.budget and len(self.partitions) > 1:
+            spreadsheet, part = next(iter(self.partitions.items()))
+            if spreadsheet == keep_spreadsheet:
+                self.partitions.move_to_end(spreadsheet)
+                continue
+            freed = sum(e["size"] for e in part.values())
+            self.total -= freed
+            self.evictions += len(part)
+            self.evicted_bytes += freed
+            del self.partitions[spreadsheet]
+
+        part = self.partitions.get(keep_spreadsheet, {})
+        while self.total > self.budget and len(part) > 1:
+            key = next(iter(part))
+            if key == keep_key:
+                part.move_to_end(key)
+                continue
+            size = part.pop(key)["size"]
+            self.total -= size
+            self.evictions += 1
+            self.evicted_bytes += size
+
+    def set_budget(self, budget_bytes):
+        with self.lock:
+            self.budget = budget_bytes
+            newest = next(reversed(self.partitions), None)
+            if newest is not None:
+                self._evict(newest, next(reversed(self.partitions[newest])))
+
+    def clear(self, spreadsheet=None):
+        with self.lock:
+            if spreadsheet is None:
+                self.partitions.clear()
+                self.total = 0
+            elif spreadsheet in self.partitions:
+                part = self.partitions.pop(spreadsheet)
+                self.total -= sum(e["size"] for e in part.values())
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "entries": sum(len(p) for p in self.partitions.values()),
+                "size_bytes": self.total,
+                "budget_bytes": self.budget,
+            }
+
+    def entries(self):
+        now = time.time()
+        with self.lock:
+            rows = [
+                {
+                    "Spreadsheet": spreadsheet,
+                    "Entry": _label(key),
+                    "Size (KB)": e["size"] / 1024,
+                    "Hits": e["hits"],
+                    "Build (ms)": e["build_ms"],
+                    "Age (s)": now - e["created"],
+                }
+                for spreadsheet, part in self.partitions.items()
+                for key, e in part.items()
+            ]
+        return pd.DataFrame(rows, columns=["Spreadsheet", "Entry", "Size (KB)", "Hits", "Build (ms)", "Age (s)"])
+
+
+@st.cache_resource
+def get_cache():
+    return BudgetedCache(int(CACHE_BUDGET_MB * 1024 * 1024))
+
+
+def cached(func=None, ttl=None):
+    """Cache a loader per spreadsheet. The wrapped function must accept a
+    `spreadsheet` keyword; callers may omit it to use the session's choice.
+    `ttl` (seconds) makes entries expire."""
+    if func is None:
+        return functools.partial(cached, ttl=ttl)
+
+    @functools.wraps(func)
+    def wrapper(*args, spreadsheet=None, **kwargs):
+        spreadsheet = spreadsheet or current_spreadsheet()
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return get_cache().get(
+            spreadsheet, key,
+            lambda: func(*args, spreadsheet=spreadsheet, **kwargs),
+            ttl
+        )
+
+    def prime(value, *args, spreadsheet=None, **kwargs):
+        """Put an already loaded value in the cache, as if wrapper(*args) had
+        returned it."""
+        spreadsheet = spreadsheet or current_spreadsheet()
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        get_cache().put(spreadsheet, key, value, ttl)
+
+    def peek(*args, spreadsheet=None, **kwargs):
+        """wrapper(*args)'s cached value, or None, without loading it."""
+        spreadsheet = spreadsheet or current_spreadsheet()
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return get_cache().peek(spreadsheet, key)
+
+    def replace(expected, value, *args, spreadsheet=None, **kwargs):
+        """BudgetedCache.replace for wrapper(*args)'s entry."""
+        spreadsheet = spreadsheet or current_spreadsheet()
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return get_cache().replace(spreadsheet, key, expected, value, ttl)
+
+    wrapper.prime = prime
+    wrapper.peek = peek
+    wrapper.replace = replace
+    return wrapper
+
+
+def derived(name, data_version, build):
+    """Cache a table or index derived from a loaded frame, in the current
+    spreadsheet's partition, keyed by the source frame's data version."""
+    return get_cache().get(current_spreadsheet(), ("derived", name, data_version), build)
+
+
+def prime_derived(name, data_version, value, spreadsheet=None):
+    """Store a derived value computed ahead of time (e.g. updated in place of
+    a rebuild) under its data version."""
+    get_cache().put(spreadsheet or current_spreadsheet(), ("derived", name, data_version), value)
+
+
+def resource(name, build, spreadsheet=None):
+    """A long-lived value updated in place (an index, a database) in the
+    spreadsheet's partition, so it counts against the budget and goes when
+    the partition is evicted or cleared. Call `resize` after changing it."""
+    return get_cache().get(spreadsheet or current_spreadsheet(), ("derived", name, None), build)
+
+
+def resize(name, value, spreadsheet=None):
+    """Re-measure a resource after an in-place update."""
+    get_cache().replace(spreadsheet or current_spreadsheet(), ("derived", name, None), value, value)
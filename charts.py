@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+BG = "#0d0f12"
+GOLD = "#d4af37"
+RED = "#ff4d4d"
+ORANGE = "#ff9933"
+YELLOW = "#f7d774"
+
+# Caps that keep a chart's payload the same size however long the history
+# gets: bars beyond MAX_BARS fold into one "Other" bar, and line charts are
+# bucketed down to MAX_POINTS points in total
+MAX_BARS = 15
+MAX_POINTS = 2000
+OTHER = "Other"
+
+
+# ---------------------------------------------------------
+# SERVER-SIDE REDUCTION BEFORE ANYTHING IS SENT
+# ---------------------------------------------------------
+def top_k(df, label_col, value_col, k=MAX_BARS, other=OTHER):
+    """The k largest rows by `value_col`, plus one "Other (n)" row summing
+    the rest. Only the two columns are kept."""
+    ordered = df[[label_col, value_col]].sort_values(value_col, ascending=False)
+    if len(ordered) <= k:
+        return ordered
+
+    rest = ordered.iloc[k:]
+    other_row = pd.DataFrame({label_col: [f"{other} ({len(rest)})"], value_col: [rest[value_col].sum()]})
+    return pd.concat([ordered.iloc[:k], other_row], ignore_index=True)
+
+
+def downsample(df, x, y, color=None, max_points=MAX_POINTS):
+    """At most `max_points` rows across all lines. A longer line is cut into
+    equal buckets, each drawn as its mean `y` at the bucket's last `x`."""
+    groups = list(df.groupby(color, sort=False)) if color else [(None, df)]
+    per_line = max(max_points // max(len(groups), 1), 2)
+
+    parts = []
+    for key, g in groups:
+        g = g.sort_values(x)
+        if len(g) <= per_line:
+            parts.append(g[[c for c in [x, y, color] if c]])
+            continue
+        bucket = np.arange(len(g)) * per_line // len(g)
+        part = g.groupby(bucket).agg({x: "last", y: "mean"})
+        if color:
+            part[color] = key
+        parts.append(part)
+
+    if not parts:
+        return df[[c for c in [x, y, color] if c]]
+    return pd.concat(parts, ignore_index=True)
+
+
+# ---------------------------------------------------------
+# CHART BUILDERS SHARED BY THE PAGES AND THE BATCH REPORT
+# ---------------------------------------------------------
+def map_win_rate_bar(df, map_col="Maps", rate_col="Map Win%"):
+    chart_df = df[[map_col, rate_col]].sort_values(rate_col, ascending=True)
+
+    fig = px.bar(
+        chart_df,
+        x=rate_col,
+        y=map_col,
+        orientation="h",
+        text=rate_col,
+        color=rate_col,
+        color_continuous_scale=[RED, ORANGE, YELLOW, GOLD],
+    )
+
+    fig.update_layout(
+        plot_bgcolor=BG,
+        paper_bgcolor=BG,
+        font=dict(color="white", size=14),
+        coloraxis_showscale=False,
+    )
+
+    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    return fig
+
+
+def pick_rate_bar(comp_stats, k=MAX_BARS):
+    return px.bar(
+        top_k(comp_stats, "Comp", "Pick Rate %", k),
+        x="Comp", y="Pick Rate %",
+        labels={'Comp': 'Composition'},
+        text_auto=".1f"
+    )
+
+
+def agent_frequency_bar(agent_freq, k=MAX_BARS):
+    return px.bar(top_k(agent_freq, "Agent", "Count", k), x="Agent", y="Count", text_auto=True)
+
+
+def line_chart(df, x, y, color=None, markers=False, max_points=MAX_POINTS):
+    """WebGL line chart over at most `max_points` points."""
+    return px.line(
+        downsample(df, x, y, color, max_points),
+        x=x, y=y, color=color, markers=markers, render_mode="webgl"
+    )
+
+
+def pair_heatmap(pairs, value_col="Win Rate"):
+    """Agent × agent heatmap of one pair_table column, most played agents
+    first. The matrix is symmetric; pairs below the table's min_games are
+    left blank."""
+    both = pd.concat([
+        pairs,
+        pairs.rename(columns={"Agent A": "Agent B", "Agent B": "Agent A"}),
+    ])
+    order = both.groupby("Agent A")["Games"].sum().sort_values(ascending=False).index
+    grid = both.pivot(index="Agent A", columns="Agent B", values=value_col).reindex(index=order, columns=order)
+    games = both.pivot(index="Agent A", columns="Agent B", values="Games").reindex(index=order, columns=order)
+
+    diverging = value_col == "Synergy"
+    fig = go.Figure(go.Heatmap(
+        z=grid.to_numpy(dtype=float),
+        x=list(order),
+        y=list(order),
+        customdata=games.to_numpy(dtype=float),
+        colorscale=[[0, RED], [0.5, BG], [1, GOLD]] if diverging else [[0, BG], [0.5, ORANGE], [1, GOLD]],
+        zmid=0 if diverging else None,
+        hovertemplate=f"%{{y}} + %{{x}}<br>{value_col}: %{{z:{'.0f' if value_col == 'Games' else '.1f'}}}"
+                      "<br>Games: %{customdata:.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        plot_bgcolor=BG,
+        paper_bgcolor=BG,
+        font=dict(color="white", size=13),
+        yaxis=dict(autorange="reversed"),
+        height=max(350, 28 * len(order) + 120),
+    )
+    return fig
+
+
+def benchmark_radar(metrics, player_vals, bench_vals, player, role):
+    fig = go.Figure()
+
+    # --- VCT Benchmark polygon ---
+    fig.add_trace(go.Scatterpolar(
+        r=bench_vals,
+        theta=metrics,
+        name=f"VCT {role} Avg",
+        line=dict(color="rgba(130,130,130,0.9)", width=3),
+        fill='toself',
+        fillcolor="rgba(100,100,100,0.35)"
+    ))
+
+    # --- Player polygon ---
+    fig.add_trace(go.Scatterpolar(
+        r=player_vals,
+        theta=metrics,
+        name=player,
+        line=dict(color="rgba(212,175,55,1)", width=3),
+        fill='toself',
+        fillcolor="rgba(212,175,55,0.45)"
+    ))
+
+    # --- Layout styling ---
+    fig.update_layout(
+        polar=dict(
+            bgcolor="#0f1113",
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1],
+                tickvals=[0, 0.25, 0.50, 0.75, 1.00],
+                tickfont=dict(size=12, color="rgba(255,255,255,0.5)"),
+                gridcolor="rgba(255,255,255,0.06)",
+                linecolor="rgba(255,255,255,0.08)"
+            ),
+            angularaxis=dict(
+                tickfont=dict(size=15, color="#d4af37"),
+                gridcolor="rgba(255,255,255,0.08)",
+                linecolor="rgba(255,255,255,0.08)"
+            )
+        ),
+        showlegend=True,
+        legend=dict(
+            font=dict(color="white", size=13),
+            bgcolor="rgba(0,0,0,0)"
+        ),
+        paper_bgcolor="#0f1113",
+        plot_bgcolor="#0f1113",
+        margin=dict(l=60, r=60, t=60, b=60)
+    )
+
+    return fig
@@ -0,0 +1,274 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# AGENT ROSTER → BIT POSITIONS
+# ---------------------------------------------------------
+# Bit i of a comp mask is set when AGENT_ROSTER[i] is in the comp. Keep new
+# agents at the end so existing masks stay valid.
+AGENT_ROSTER = [
+    "Astra", "Breach", "Brimstone", "Chamber", "Cypher", "Fade", "Gekko",
+    "Harbor", "Jett", "KAY/O", "Killjoy", "Neon", "Omen", "Phoenix", "Raze",
+    "Reyna", "Sage", "Skye", "Sova", "Viper", "Yoru", "Deadlock", "Iso",
+    "Clove", "Vyse", "Tejo", "Waylay",
+]
+
+MAX_AGENTS = 63  # masks are int64
+
+AGENT_ROLES = {
+    "Duelist": ["Iso", "Jett", "Neon", "Phoenix", "Raze", "Reyna", "Waylay", "Yoru"],
+    "Controller": ["Astra", "Brimstone", "Clove", "Harbor", "Omen", "Viper"],
+    "Initiator": ["Breach", "Fade", "Gekko", "KAY/O", "Skye", "Sova", "Tejo"],
+    "Sentinel": ["Chamber", "Cypher", "Deadlock", "Killjoy", "Sage", "Vyse"],
+}
+
+
+def agent_roster(names):
+    """AGENT_ROSTER plus any unknown agent names in `names`, in sorted order,
+    so the same data always produces the same bit layout."""
+    known = set(AGENT_ROSTER)
+    extra = sorted({n for n in names if n and n not in known})
+    roster = AGENT_ROSTER + extra
+
+    if len(roster) > MAX_AGENTS:
+        raise ValueError(f"Too many distinct agents for an int64 mask: {len(roster)}")
+    return roster
+
+
+def encode_comps(df, agent_cols, roster=None):
+    """Encode each row's agents as an order-independent int64 bitmask.
+
+    Returns (masks, roster)."""
+    if roster is None:
+        names = pd.unique(df[agent_cols].to_numpy().ravel()) if agent_cols else []
+        roster = agent_roster([str(n).strip() for n in names if isinstance(n, str)])
+
+    index = {agent: i for i, agent in enumerate(roster)}
+    masks = np.zeros(len(df), dtype=np.int64)
+
+    for c in agent_cols:
+        pos = df[c].map(index)
+        valid = pos.notna().to_numpy()
+        masks[valid] |= np.int64(1) << pos[valid].to_numpy(dtype=np.int64)
+
+    return masks, roster
+
+
+def decode_comp(mask, roster=AGENT_ROSTER):
+    mask = int(mask)
+    return [agent for i, agent in enumerate(roster) if mask >> i & 1]
+
+
+def comp_label(mask, roster=AGENT_ROSTER):
+    return " | ".join(decode_comp(mask, roster))
+
+
+# ---------------------------------------------------------
+# VECTORIZED COUNTS
+# ---------------------------------------------------------
+def popcount(masks):
+    masks = np.asarray(masks, dtype=np.int64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int64)
+
+    counts = np.zeros(masks.shape, dtype=np.int64)
+    for i in range(MAX_AGENTS):
+        counts += (masks >> i) & 1
+    return counts
+
+
+def agent_bits(masks, roster=AGENT_ROSTER):
+    """rows × agents 0/1 matrix of the masks."""
+    masks = np.asarray(masks, dtype=np.int64)
+    shifts = np.arange(len(roster), dtype=np.int64)
+    return ((masks[:, None] >> shifts) & 1).astype(np.int64)
+
+
+def agent_counts(masks, roster=AGENT_ROSTER):
+    """How many comps each agent appears in, most picked first.
+
+    Identical comps are counted once and weighted by how often they occur;
+    each agent's count is then a popcount of the distinct masks AND-ed with
+    its bit."""
+    uniq, times = np.unique(np.asarray(masks, dtype=np.int64), return_counts=True)
+    agent_bit = np.int64(1) << np.arange(len(roster), dtype=np.int64)
+    counts = times @ popcount(uniq[:, None] & agent_bit)
+    s = pd.Series(counts, index=roster, name="Count")
+    return s[s > 0].sort_values(ascending=False)
+
+
+# ---------------------------------------------------------
+# AGENT PAIRS (CO-OCCURRENCE AND PAIR WIN RATES)
+# ---------------------------------------------------------
+def pair_stats(masks, wins, groups=None, roster=AGENT_ROSTER):
+    """Pair counts and pair wins for every two agents, by matrix products.
+
+    With X the rows × agents one-hot matrix (agent_bits), XᵀX counts the
+    comps each pair shared (its diagonal is each agent's own count) and
+    Xᵀ·diag(wins)·X the ones won. With `groups` (e.g. each row's map) the
+    products are taken per group. Returns {"agents": roster, "groups":
+    [labels], "games": groups × agents × agents, "wins": same shape}."""
+    x = agent_bits(masks, roster).astype(np.float64)
+    w = np.asarray(wins, dtype=np.float64)
+
+    if groups is None:
+        codes, labels = np.zeros(len(x), dtype=np.int64), [None]
+    else:
+        codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+        labels = list(uniques)
+
+    # Rows sorted by group, so each group's rows are one contiguous block
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+
+    games = np.zeros((len(labels), len(roster), len(roster)), dtype=np.int64)
+    won = np.zeros_like(games)
+    for g in range(len(labels)):
+        rows = order[bounds[g]:bounds[g + 1]]
+        xg = x[rows]
+        games[g] = np.rint(xg.T @ xg)
+        won[g] = np.rint(xg.T @ (xg * w[rows, None]))
+
+    return {"agents": list(roster), "groups": labels, "games": games, "wins": won}
+
+
+def pair_table(stats, group=None, min_games=1):
+    """One row per agent pair seen at least `min_games` times in `group`:
+    Games, Wins, Win Rate, and Synergy (pair win rate minus the mean of the
+    two agents' own win rates), most played first."""
+    columns = ["Agent A", "Agent B", "Games", "Wins", "Win Rate", "Synergy"]
+    if group not in stats["groups"]:
+        return pd.DataFrame(columns=columns)
+
+    g = stats["groups"].index(group)
+    games, wins = stats["games"][g], stats["wins"][g]
+    solo = np.diag(wins) / np.maximum(np.diag(games), 1) * 100
+
+    i, j = np.triu_indices(len(stats["agents"]), k=1)
+    keep = games[i, j] >= max(min_games, 1)
+    i, j = i[keep], j[keep]
+
+    agents = np.asarray(stats["agents"], dtype=object)
+    rate = wins[i, j] / games[i, j] * 100
+    out = pd.DataFrame({
+        "Agent A": agents[i],
+        "Agent B": agents[j],
+        "Games": games[i, j],
+        "Wins": wins[i, j],
+        "Win Rate": rate,
+        "Synergy": rate - (solo[i] + solo[j]) / 2,
+    }, columns=columns)
+    return out.sort_values(["Games", "Win Rate"], ascending=False, ignore_index=True)
+
+
+# ---------------------------------------------------------
+# PER-COMP AGGREGATES
+# ---------------------------------------------------------
+def comp_stats_table(df_map, roster=AGENT_ROSTER, result_col="Result"):
+    """Per-comp record and side win rates, grouped by exact agent set."""
+    total = df_map.shape[0]
+
+    comp_stats = (
+        df_map.assign(
+            _win=(df_map[result_col] == "Win").astype(int),
+            _loss=(df_map[result_col] == "Loss").astype(int),
+            _tie=(df_map[result_col] == "Tie").astype(int),
+        )
+        .groupby("Comp Mask")
+        .agg(
+            Games=("Comp Mask", "size"),
+            Wins=("_win", "sum"),
+            Losses=("_loss", "sum"),
+            Ties=("_tie", "sum"),
+            ATK_W=("ATK W", "sum"),
+            ATK_L=("ATK L", "sum"),
+            DEF_W=("DEF W", "sum"),
+            DEF_L=("DEF L", "sum")
+        )
+        .reset_index()
+    )
+    comp_stats.insert(0, "Comp", [comp_label(m, roster) for m in comp_stats["Comp Mask"]])
+
+    # Win rates
+    comp_stats["Win Rate"] = (comp_stats["Wins"] / comp_stats["Games"]) * 100
+    comp_stats["ATK WR"] = comp_stats["ATK_W"] / \
+        (comp_stats["ATK_W"] + comp_stats["ATK_L"] + 1e-9) * 100
+    comp_stats["DEF WR"] = comp_stats["DEF_W"] / \
+        (comp_stats["DEF_W"] + comp_stats["DEF_L"] + 1e-9) * 100
+
+    # Side bias
+    comp_stats["Side Bias"] = comp_stats["ATK WR"] - comp_stats["DEF WR"]
+
+    # Round differential
+    comp_stats["Round Diff"] = (comp_stats["ATK_W"] + comp_stats["DEF_W"]) - \
+        (comp_stats["ATK_L"] + comp_stats["DEF_L"])
+
+    # Strength score
+    comp_stats["Strength Score"] = (
+        comp_stats["Win Rate"] * 0.7 +
+        ((comp_stats["Games"] / max(total, 1)) * 100) * 0.3
+    )
+
+    return comp_stats
+
+
+# ---------------------------------------------------------
+# QUERY INDEX: AGENT → ROWS, MAP → ROWS
+# ---------------------------------------------------------
+def _postings(values):
+    """{value: sorted row positions} for a 1-D array."""
+    values = np.asarray(values)
+    order = np.argsort(values, kind="stable")
+    uniq, starts = np.unique(values[order], return_index=True)
+    return dict(zip(uniq.tolist(), np.split(order, starts[1:])))
+
+
+def build_comp_index(df, roster=AGENT_ROSTER, map_col="Map"):
+    """Inverted index over the comp rows: each agent and each map maps to the
+    sorted row positions that contain it."""
+    bits = agent_bits(df["Comp Mask"].to_numpy(), roster).astype(bool)
+
+    return {
+        "rows": len(df),
+        "agents": {a: np.flatnonzero(bits[:, i]) for i, a in enumerate(roster) if bits[:, i].any()},
+        "maps": _postings(df[map_col].to_numpy()) if map_col in df.columns else {},
+    }
+
+
+def query_comps(index, include=(), exclude=(), maps=()):
+    """Row positions of comps containing every agent in `include`, none of the
+    agents in `exclude`, and played on one of `maps` (all maps if empty)."""
+    empty = np.array([], dtype=np.int64)
+    postings = []
+
+    for a in include:
+        rows = index["agents"].get(a)
+        if rows is None:
+            return empty
+        postings.append(rows)
+
+    if maps:
+        rows = [index["maps"][m] for m in maps if m in index["maps"]]
+        if not rows:
+            return empty
+        postings.append(np.sort(np.concatenate(rows)))
+
+    if postings:
+        # Intersect smallest lists first so the working set only shrinks
+        postings.sort(key=len)
+        result = postings[0]
+        for rows in postings[1:]:
+            result = np.intersect1d(result, rows, assume_unique=True)
+    else:
+        result = np.arange(index["rows"])
+
+    for a in exclude:
+        rows = index["agents"].get(a)
+        if rows is not None and len(result):
+            result = np.setdiff1d(result, rows, assume_unique=True)
+
+    return result
+
+
+def role_agents(roles):
+    return [a for r in roles for a in AGENT_ROLES.get(r, [])]
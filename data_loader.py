@@ -1,10 +1,88 @@
+import csv
+import hashlib
+import os
+
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
 import streamlit as st
 
-SPREADSHEET_NAME = "HS SPREADSHEET NEW ROSTER"
+from comps import encode_comps, comp_label
+from cache import cached, get_cache
+from shared_cache import SHARED_TTL, shared_table
+from tenants import current_spreadsheet
+
 WORKSHEET_NAME = "All Match History"
+COMP_WORKSHEET_NAME = "Comp Stats"
+PLAYER_WORKSHEET_NAME = "Scrim Stats"
+MAP_WL_WORKSHEET_NAME = "Map W/L Rate"
+
+MATCH_COLUMNS = [
+    "Opponent", "DATE", "TIME (SGT)", "Played", "Differential",
+    "Won", "Lost", "ATK W", "ATK L", "DEF W", "DEF L",
+    "Type of Match", "Map", "Result", "Game Level",
+    "Scrim Quality", "VOD Link", "Notes",
+    "Rosters", "Pistols (ATK)", "Pistols (DEF)", "Comp"
+]
+
+# Columns that hold counts in the match history; coerced to numbers on load
+MATCH_NUMERIC_COLUMNS = [
+    "Played", "Differential", "Won", "Lost",
+    "ATK W", "ATK L", "DEF W", "DEF L",
+    "Pistols (ATK)", "Pistols (DEF)"
+]
+
+COMP_NUMERIC_COLUMNS = ["ATK W", "ATK L", "DEF W", "DEF L"]
+
+# Scrim Stats: one 8-column block per player, found by its header pattern
+# somewhere in the first PLAYER_SEARCH_ROWS rows; the player's name sits in
+# the row above the block headers
+PLAYER_SEARCH_ROWS = 10
+PLAYER_BLOCK_HEADERS = ["KDA", "Kills", "Deaths", "Assists", "ACS", "FK", "FD", "Agent"]
+PLAYER_NUMERIC_COLUMNS = ["KDA", "Kills", "Deaths", "Assists", "ACS", "FK", "FD"]
+
+# Rows per fingerprinted chunk; a refetch re-parses only chunks whose raw
+# values changed
+CHUNK_ROWS = 500
+
+MAP_WL_COLUMNS = [
+    "Maps", "Total Games Played", "Map Win%", "Atk Win%", "Def Win%",
+    "Pistol Win% (ATK)", "Pistol Win% (DEF)"
+]
+
+# ---------------------------------------------------------
+# WORKSHEET LAYOUTS
+# ---------------------------------------------------------
+# Where the data sits in each worksheet, so loads fetch only those A1 ranges
+# instead of get_all_values(). Rows and columns are 0-based.
+#   header_rows:  (first, last) rows holding headers; data follows `last`
+#   columns:      header names to keep
+#   patterns:     keep any header containing one of these (case-insensitive)
+#   col_span:     fixed (first, last) column range instead of picking by name
+#   find_header:  header row isn't fixed; it's the first row within
+#                 `search_rows` that has a cell equal to this text
+SHEET_LAYOUTS = {
+    WORKSHEET_NAME: {
+        "header_rows": (2, 2),
+        "columns": MATCH_COLUMNS + ["TIME(SGT)"],
+        "patterns": ["roster", "pink", "cyan"],
+    },
+    COMP_WORKSHEET_NAME: {
+        "header_rows": (0, 2),
+        "columns": ["Map", "Result"] + COMP_NUMERIC_COLUMNS,
+        "patterns": ["agent"],
+    },
+    # Header row and column spans come from load_player_layout()
+    PLAYER_WORKSHEET_NAME: {
+        "search_rows": PLAYER_SEARCH_ROWS,
+    },
+    MAP_WL_WORKSHEET_NAME: {
+        "find_header": "Maps",
+        "search_rows": 30,
+        "columns": MAP_WL_COLUMNS,
+    },
+}
 
 
 def get_gspread_client():
@@ -13,43 +91,560 @@ def get_gspread_client():
         "https://www.googleapis.com/auth/drive"
     ]
 
-    creds = Credentials.from_service_account_info(st.secrets, scopes=scope)
+    # Streamlit Cloud keeps the key under [gcp_service_account]; local runs
+    # may put it at the top level of secrets.toml
+    info = st.secrets["gcp_service_account"] if "gcp_service_account" in st.secrets else st.secrets
+    creds = Credentials.from_service_account_info(info, scopes=scope)
     return gspread.authorize(creds)
 
 
-def load_clean_data():
+# ---------------------------------------------------------
+# LOCAL DATA STAND-IN
+# ---------------------------------------------------------
+# With HS_LOCAL_DATA set, worksheets are read from CSV exports instead of
+# Google Sheets: <dir>/<spreadsheet>/<worksheet>.csv, or <dir>/<worksheet>.csv
+# ("/" in worksheet names becomes "_"). Used by report.py and load tests.
+def local_data_dir():
+    return os.environ.get("HS_LOCAL_DATA")
+
+
+def local_worksheet_path(data_dir, spreadsheet, worksheet_name):
+    file_name = worksheet_name.replace("/", "_") + ".csv"
+    nested = os.path.join(data_dir, spreadsheet, file_name)
+    return nested if os.path.exists(nested) else os.path.join(data_dir, file_name)
+
+
+class LocalWorksheet:
+    """The subset of gspread.Worksheet the loaders use, over a CSV grid."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, newline="", encoding="utf-8") as f:
+            self.grid = [row for row in csv.reader(f)]
+
+    def get_all_values(self):
+        width = max((len(r) for r in self.grid), default=0)
+        return [r + [""] * (width - len(r)) for r in self.grid]
+
+    def get(self, a1):
+        g = gspread.utils.a1_range_to_grid_range(a1)
+        rows = self.grid[g.get("startRowIndex", 0):g.get("endRowIndex", len(self.grid))]
+        start, end = g.get("startColumnIndex", 0), g.get("endColumnIndex")
+        out = [r[start:end] for r in rows]
+        while out and not any(out[-1]):
+            out.pop()
+        return out
+
+    def batch_get(self, ranges):
+        return [self.get(r) for r in ranges]
+
+    def append_row(self, values, **kwargs):
+        # After the last non-empty row, like the Sheets append API
+        while self.grid and not any(self.grid[-1]):
+            self.grid.pop()
+        self.grid.append([str(v) for v in values])
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self.grid)
+
+
+def open_worksheet(worksheet_name, spreadsheet=None):
+    spreadsheet = spreadsheet or current_spreadsheet()
+
+    data_dir = local_data_dir()
+    if data_dir:
+        return LocalWorksheet(local_worksheet_path(data_dir, spreadsheet, worksheet_name))
 
     client = get_gspread_client()
-    sheet = client.open(SPREADSHEET_NAME).worksheet(WORKSHEET_NAME)
+    return client.open(spreadsheet).worksheet(worksheet_name)
+
+
+def col_letter(col):
+    return gspread.utils.rowcol_to_a1(1, col + 1)[:-1]
+
+
+def column_runs(cols):
+    """Group sorted column indexes into contiguous (first, last) runs."""
+    runs = []
+    for c in sorted(cols):
+        if runs and c == runs[-1][1] + 1:
+            runs[-1][1] = c
+        else:
+            runs.append([c, c])
+    return [tuple(r) for r in runs]
+
+
+def header_names(header_block):
+    """Name of every column across the header rows: last non-empty cell."""
+    width = max((len(r) for r in header_block), default=0)
+    names = []
+    for i in range(width):
+        cells = [r[i].strip() for r in header_block if i < len(r) and r[i].strip()]
+        names.append(cells[-1] if cells else "")
+    return names
+
+
+def pick_columns(names, layout):
+    wanted = set(layout.get("columns", []))
+    patterns = [p.lower() for p in layout.get("patterns", [])]
+    return [
+        i for i, n in enumerate(names)
+        if n in wanted or any(p in n.lower() for p in patterns)
+    ]
+
+
+def fetch_layout(worksheet_name, layout=None, spreadsheet=None):
+    """Fetch only the header rows and used column ranges of a worksheet.
+
+    The returned grid keeps the header at the same row index the cleaners
+    expect (rows above it are empty) and holds just the projected columns,
+    in sheet order. Pass `layout` to override SHEET_LAYOUTS."""
+    layout = layout or SHEET_LAYOUTS[worksheet_name]
+    ws = open_worksheet(worksheet_name, spreadsheet)
 
-    raw = sheet.get_all_values()
+    if "find_header" in layout:
+        top = ws.get(f"1:{layout['search_rows']}")
+        target = layout["find_header"].lower()
+        first = next(
+            (i for i, row in enumerate(top) if any(str(c).strip().lower() == target for c in row)),
+            None
+        )
+        if first is None:
+            raise ValueError(f"Could not find a '{layout['find_header']}' header in {worksheet_name}.")
+        last = first
+        header_block = [top[first]]
+    else:
+        first, last = layout["header_rows"]
+        header_block = None
+
+    col_span = layout.get("col_span")
+    if col_span:
+        runs = [col_span]
+    else:
+        if header_block is None:
+            header_block = ws.get(f"{first + 1}:{last + 1}")
+        cols = pick_columns(header_names(header_block), layout)
+        if not cols:
+            raise ValueError(f"No known columns in the {worksheet_name} header.")
+        runs = column_runs(cols)
+
+    ranges = [f"{col_letter(a)}{first + 1}:{col_letter(b)}" for a, b in runs]
+    parts = ws.batch_get(ranges)
+
+    grid = [[] for _ in range(first)]
+    for r in range(max((len(p) for p in parts), default=0)):
+        row = []
+        for (a, b), part in zip(runs, parts):
+            values = list(part[r]) if r < len(part) else []
+            row.extend(values + [""] * (b - a + 1 - len(values)))
+        grid.append(row)
+
+    # Sheets trim trailing empty rows, so a header-only sheet can come back
+    # shorter than its header block
+    width = sum(b - a + 1 for a, b in runs)
+    grid.extend([""] * width for _ in range(last + 1 - len(grid)))
+    return grid
+
+
+def fingerprint(rows, *extra):
+    """Short content hash of raw rows (plus anything identifying the chunk)."""
+    h = hashlib.blake2b(digest_size=8)
+    for e in extra:
+        h.update(repr(e).encode("utf-8"))
+        h.update(b"\x1d")
+    for row in rows:
+        h.update("\x1f".join(row).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def grid_version(raw):
+    """Short content hash of a raw worksheet grid. Derived tables and indexes
+    are cached per version, so they are rebuilt only when the sheet changes."""
+    return fingerprint(raw)
+
+
+def row_chunks(rows, size=CHUNK_ROWS):
+    return [((), rows[i:i + size]) for i in range(0, len(rows), size)] or [((), [])]
+
+
+def coerce_numeric(df, columns):
+    """Convert count columns to numbers, leaving a column alone if that would
+    throw away non-empty text (e.g. a pistol column filled with W/L)."""
+    for c in columns:
+        if c not in df.columns:
+            continue
+        converted = pd.to_numeric(df[c], errors="coerce")
+        filled = df[c].notna() & (df[c].astype(str) != "")
+        if converted[filled].notna().all():
+            df[c] = converted
+    return df
+
+
+# ---------------------------------------------------------
+# CONTENT FINGERPRINTS (REUSE UNCHANGED CHUNKS)
+# ---------------------------------------------------------
+def parse_chunked(key, header, chunks, parse_chunk, finish):
+    """Parse a raw grid chunk by chunk, reusing chunks whose fingerprint was
+    seen in the previous parse under the same `key`.
+
+    `key` is (spreadsheet, worksheet[, player]). The parsed chunks are kept in
+    that spreadsheet's partition of the budgeted cache, so they count against
+    the byte budget and go when the partition is evicted; the frame itself is
+    not kept there (the loader's own entry holds it). A worker process, which
+    can't reach the cache, passes a dict instead: the chunks are read from and
+    written back to it, for the caller to ship home and `store_chunks`.
+
+    `chunks` is a list of (args, rows); `parse_chunk(rows, *args)` cleans one
+    chunk and `finish(parts)` combines them into the final frame. The data
+    version is a hash of the header and chunk fingerprints, so it stays the
+    same when nothing changed. With `key=None` nothing is stored or reused."""
+    header_id = fingerprint(header)
+    digests = [fingerprint(rows, *args) for args, rows in chunks]
+    version = fingerprint([[header_id] + digests])
+
+    if isinstance(key, dict):
+        prev = key or None
+    else:
+        prev = get_cache().peek(key[0], chunk_key(key)) if key is not None else None
+
+    seen = prev["chunks"] if prev is not None and prev["header"] == header_id else {}
+    parsed = {}
+    parts = []
+    for digest, (args, rows) in zip(digests, chunks):
+        if digest not in parsed:
+            parsed[digest] = seen[digest] if digest in seen else parse_chunk(rows, *args)
+        parts.append(parsed[digest])
+
+    df = finish(parts)
+    df.attrs["data_version"] = version
+
+    store = {"version": version, "header": header_id, "chunks": parsed}
+    if isinstance(key, dict):
+        key.clear()
+        key.update(store)
+    elif key is not None:
+        store_chunks(key, store)
+    return df
+
+
+def chunk_key(key):
+    # (spreadsheet, worksheet[, player]) -> cache key inside that spreadsheet
+    return ("chunks",) + tuple(key[1:])
+
+
+def store_chunks(key, store):
+    """Keep a parse's chunks under `key`, e.g. ones parsed in a worker."""
+    get_cache().put(key[0], chunk_key(key), store)
+
+
+def versioned(df, raw):
+    """Tag a freshly parsed frame with its raw grid's version, so a later
+    refresh can keep it when the sheet hashes the same."""
+    df.attrs["grid_version"] = grid_version(raw)
+    return df
+
+
+def concat_parts(parts, columns=None):
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+
+# ---------------------------------------------------------
+# MATCH HISTORY
+# ---------------------------------------------------------
+def clean_match_history(raw, key=None):
 
     HEADER_ROW = 2
     headers = raw[HEADER_ROW]
-    rows = raw[HEADER_ROW + 1:]
 
-    df = pd.DataFrame(rows, columns=headers)
+    def parse_chunk(rows):
+        df = pd.DataFrame(rows, columns=headers)
 
-    df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    df = df[df["Opponent"].notna() & (df["Opponent"] != "")]
+        df = df.loc[:, df.columns != ""]
+        df = df.loc[:, ~df.columns.duplicated()]
 
-    # Combine 3 roster columns → 1
-    roster_cols = [c for c in df.columns if "Roster" in c or "Pink" in c or "Cyan" in c]
-    if roster_cols:
-        df["Rosters"] = df[roster_cols].apply(
-            lambda r: " | ".join([v for v in r if v.strip()]),
-            axis=1
-        )
-        df = df.drop(columns=roster_cols)
-
-    final_columns = [
-        "Opponent", "DATE", "TIME (SGT)", "Played", "Differential",
-        "Won", "Lost", "ATK W", "ATK L", "DEF W", "DEF L",
-        "Type of Match", "Map", "Result", "Game Level",
-        "Scrim Quality", "VOD Link", "Notes",
-        "Rosters", "Pistols (ATK)", "Pistols (DEF)", "Comp"
-    ]
+        df = df.apply(lambda x: x.str.strip())
+        df = df[df["Opponent"].notna() & (df["Opponent"] != "")]
+
+        # Combine 3 roster columns → 1
+        roster_cols = [c for c in df.columns if "Roster" in c or "Pink" in c or "Cyan" in c]
+        if roster_cols:
+            rosters = pd.Series("", index=df.index, dtype=df[roster_cols[0]].dtype)
+            for c in roster_cols:
+                v = df[c].fillna("")
+                rosters = rosters.where(v == "", rosters.where(rosters == "", rosters + " | ") + v)
+            df["Rosters"] = rosters
+            df = df.drop(columns=roster_cols)
+        return df
+
+    def finish(parts):
+        # A header-only sheet still gets every cleaned column
+        df = concat_parts(parts, list(parse_chunk([]).columns))
+
+        df = df.rename(columns={"TIME(SGT)": "TIME (SGT)"})
+
+        df = df.reindex(columns=[c for c in MATCH_COLUMNS if c in df.columns])
+
+        # Numbers and dates over the whole column: one bad cell anywhere keeps
+        # the column as text, as before chunking
+        df = coerce_numeric(df, MATCH_NUMERIC_COLUMNS)
+        if "DATE" in df.columns:
+            df["DATE"] = pd.to_datetime(df["DATE"], errors="coerce", dayfirst=True)
+        return df
+
+    return parse_chunked(key, raw[:HEADER_ROW + 1], row_chunks(raw[HEADER_ROW + 1:]), parse_chunk, finish)
+
+
+@cached(ttl=SHARED_TTL)
+@shared_table
+def load_clean_data(spreadsheet=None):
+    raw = fetch_layout(WORKSHEET_NAME, spreadsheet=spreadsheet)
+    return versioned(clean_match_history(raw, key=(spreadsheet, WORKSHEET_NAME)), raw)
+
+
+# ---------------------------------------------------------
+# COMP STATS
+# ---------------------------------------------------------
+def clean_comp_sheet(raw, key=None):
+    row1 = [x.strip() for x in raw[0]]
+    row3 = [x.strip() for x in raw[2]]
+
+    final_headers = []
+    for h1, h3 in zip(row1, row3):
+        final_headers.append(h3 if h3 else h1 if h1 else "Unknown")
+
+    def parse_chunk(rows):
+        df = pd.DataFrame(rows, columns=final_headers)
+        df = df.apply(lambda col: col.str.strip())
+
+        for c in COMP_NUMERIC_COLUMNS:
+            if c in df.columns:
+                df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+        return df
+
+    def finish(parts):
+        df = concat_parts(parts, final_headers)
+
+        # Encode each comp as a bitmask over the agent roster, so the same five
+        # agents group together whatever column they were typed into. The
+        # roster depends on every row, so this runs over the whole frame.
+        agent_cols = sorted([c for c in df.columns if "agent" in c.lower()])
+        masks, roster = encode_comps(df, agent_cols)
+
+        df["Comp Mask"] = masks
+        labels = {m: comp_label(m, roster) for m in np.unique(masks)}
+        df["Comp"] = df["Comp Mask"].map(labels)
+        df.attrs["agent_roster"] = roster
+        return df
+
+    return parse_chunked(key, raw[:3], row_chunks(raw[3:]), parse_chunk, finish)
+
+
+@cached(ttl=SHARED_TTL)
+@shared_table
+def load_comp_data(spreadsheet=None):
+    raw = fetch_layout(COMP_WORKSHEET_NAME, spreadsheet=spreadsheet)
+    return versioned(clean_comp_sheet(raw, key=(spreadsheet, COMP_WORKSHEET_NAME)), raw)
+
+
+# ---------------------------------------------------------
+# PLAYER STATS (LONG FORMAT: ONE ROW PER PLAYER PER SCRIM)
+# ---------------------------------------------------------
+def discover_player_blocks(rows):
+    """Find the block header row and every player's column span.
+
+    A block is eight consecutive headers matching PLAYER_BLOCK_HEADERS (the
+    last may read "Agent Played"). Returns {"header_row": r, "blocks":
+    {player: (first_col, last_col)}} or None if no block is found."""
+    expected = [h.lower() for h in PLAYER_BLOCK_HEADERS]
+    width = len(expected)
+
+    for r, row in enumerate(rows):
+        cells = [str(c).strip().lower() for c in row]
+        starts = [
+            i for i in range(len(cells) - width + 1)
+            if cells[i:i + width - 1] == expected[:-1] and cells[i + width - 1].startswith("agent")
+        ]
+        if not starts:
+            continue
+
+        names_row = rows[r - 1] if r > 0 else []
+        blocks = {}
+        for n, start in enumerate(starts):
+            name = next(
+                (names_row[c].strip() for c in range(start, start + width)
+                 if c < len(names_row) and names_row[c].strip()),
+                f"Player {n + 1}"
+            )
+            blocks[name] = (start, start + width - 1)
+
+        return {"header_row": r, "blocks": blocks}
+
+    return None
+
+
+@cached(ttl=600)
+def load_player_layout(spreadsheet=None):
+    rows = open_worksheet(PLAYER_WORKSHEET_NAME, spreadsheet).get(
+        f"1:{SHEET_LAYOUTS[PLAYER_WORKSHEET_NAME]['search_rows']}"
+    )
+    layout = discover_player_blocks(rows)
+    if layout is None:
+        raise ValueError(f"No player blocks found in {PLAYER_WORKSHEET_NAME}.")
+    return layout
+
+
+def extract_player_block(grid, player, start_col, end_col, header_row, first_col=0):
+    start_col -= first_col
+    end_col += 1 - first_col
+
+    headers = grid.iloc[header_row, start_col:end_col].tolist()
+    headers = [h if h != "" else f"Col{i}" for i, h in enumerate(headers)]
+
+    if len(headers) == 8:
+        headers = PLAYER_BLOCK_HEADERS
+
+    data = []
+    r = header_row + 1
+
+    while r < len(grid):
+        row = grid.iloc[r, start_col:end_col].tolist()
+
+        if all(str(x).strip() == "" for x in row):
+            break
+
+        if all(str(x).strip() in ["", "N/A"] for x in row):
+            r += 1
+            continue
+
+        data.append(row)
+        r += 1
+
+    if not data:
+        return None
+
+    player_df = pd.DataFrame(data, columns=headers)
+    player_df["Player"] = player
+    player_df["Scrim"] = np.arange(1, len(player_df) + 1)
+    player_df = player_df.replace(["", "N/A"], np.nan)
+
+    for c in PLAYER_NUMERIC_COLUMNS:
+        if c in player_df.columns:
+            player_df[c] = pd.to_numeric(player_df[c], errors="coerce")
+
+    return player_df
+
+
+def clean_player_stats(raw, layout=None, first_col=0, key=None):
+    """Long-format stats for every block in `layout` (discovered from raw
+    when not given). `first_col` is the sheet column of raw's column 0 when
+    only part of the sheet was fetched. Each player's block is one
+    fingerprinted chunk."""
+    layout = layout or discover_player_blocks(raw)
+    header_row = layout["header_row"] if layout else 0
+    width = max((len(r) for r in raw), default=0)
+
+    chunks = []
+    for player, (start_col, end_col) in (layout["blocks"] if layout else {}).items():
+        if end_col - first_col >= width or start_col < first_col:
+            continue
+        a, b = start_col - first_col, end_col - first_col + 1
+        block = [(list(r[a:b]) + [""] * (b - a))[:b - a] for r in raw[header_row:]]
+        chunks.append(((player, start_col, end_col), block))
+
+    def parse_chunk(block, player, start_col, end_col):
+        grid = pd.DataFrame(block).fillna("")
+        return extract_player_block(grid, player, start_col, end_col, 0, start_col)
+
+    def finish(parts):
+        return concat_parts(parts, PLAYER_BLOCK_HEADERS + ["Player", "Scrim"])
+
+    return parse_chunked(key, raw[:header_row], chunks, parse_chunk, finish)
+
+
+def fetch_player_columns(layout, col_span, spreadsheet=None):
+    header_row = layout["header_row"]
+    return fetch_layout(
+        PLAYER_WORKSHEET_NAME,
+        {"header_rows": (header_row, header_row), "col_span": col_span},
+        spreadsheet
+    )
+
+
+@cached(ttl=SHARED_TTL)
+@shared_table
+def load_player_block(player, spreadsheet=None):
+    """One player's scrim rows; fetches only that player's column range."""
+    layout = load_player_layout(spreadsheet=spreadsheet)
+    span = layout["blocks"][player]
+    sub = {"header_row": layout["header_row"], "blocks": {player: span}}
+    return clean_player_stats(
+        fetch_player_columns(layout, span, spreadsheet), sub, span[0],
+        key=(spreadsheet, PLAYER_WORKSHEET_NAME, player)
+    )
+
+
+def roster_span(layout):
+    """First and last column covering every player block."""
+    spans = layout["blocks"].values()
+    return min(a for a, _ in spans), max(b for _, b in spans)
+
+
+@cached(ttl=SHARED_TTL)
+@shared_table
+def load_player_stats(spreadsheet=None):
+    """Every player's rows, for views that compare across the roster."""
+    layout = load_player_layout(spreadsheet=spreadsheet)
+    span = roster_span(layout)
+    raw = fetch_player_columns(layout, span, spreadsheet)
+    return versioned(clean_player_stats(raw, layout, span[0], key=(spreadsheet, PLAYER_WORKSHEET_NAME)), raw)
+
+
+# ---------------------------------------------------------
+# MAP W/L RATE
+# ---------------------------------------------------------
+def clean_map_wl_rate(raw, key=None):
+    header_row_index = None
+    for i, row in enumerate(raw):
+        if any(str(cell).strip().lower() == "maps" for cell in row):
+            header_row_index = i
+            break
+
+    if header_row_index is None:
+        raise ValueError("Could not find a 'Maps' header in any row.")
+
+    headers = [h.strip() for h in raw[header_row_index]]
+
+    def parse_chunk(rows):
+        df = pd.DataFrame(rows, columns=headers)
+
+        df = df.loc[:, df.columns != ""]
+        df = df.loc[:, ~df.columns.duplicated()]
+        df = df.apply(lambda x: x.str.strip())
+
+        if "Maps" not in df.columns:
+            raise ValueError("No usable Maps column found.")
+
+        return df[df["Maps"].notna() & (df["Maps"] != "")]
+
+    def finish(parts):
+        df = concat_parts(parts, list(parse_chunk([]).columns))
+
+        # Percent cells come through formatted ("55.00%")
+        numeric_cols = [c for c in df.columns if c != "Maps"]
+        for c in numeric_cols:
+            df[c] = df[c].str.rstrip("%")
+        return coerce_numeric(df, numeric_cols)
+
+    return parse_chunked(
+        key, raw[:header_row_index + 1], row_chunks(raw[header_row_index + 1:]), parse_chunk, finish
+    )
 
-    df = df.reindex(columns=[c for c in final_columns if c in df.columns])
 
-    return df.reset_index(drop=True)
+@cached(ttl=SHARED_TTL)
+@shared_table
+def load_map_wl_rate(spreadsheet=None):
+    raw = fetch_layout(MAP_WL_WORKSHEET_NAME, spreadsheet=spreadsheet)
+    return versioned(clean_map_wl_rate(raw, key=(spreadsheet, MAP_WL_WORKSHEET_NAME)), raw)
@@ -1,19 +1,337 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+"""Debugging helpers.
 
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
+    python debug.py                        list the spreadsheets the service account can see
+    python debug.py profile comp_stats     cProfile + tracemalloc for one full rerun of a page
+    python debug.py profile comp_stats --set "Select Map=Bind"
+    python debug.py compare profiles/a.json profiles/b.json
+    python debug.py rerun comp_stats "Select Map" --port 8501
 
-creds = ServiceAccountCredentials.from_json_keyfile_name(
-    "service_account.json", scope
-)
+`rerun` talks to a running `streamlit run` server over its websocket, as a
+browser would: it changes one selectbox several times and reports the
+median latency and bytes sent back per change, once as a fragment rerun
+(what the browser sends for a widget inside an st.fragment) and once as a
+full-script rerun, for comparison. It needs the `websockets` package, which
+the app itself doesn't (pip install websockets).
 
-client = gspread.authorize(creds)
+`profile` runs the page headless with Streamlit's AppTest (against
+HS_LOCAL_DATA if set) and writes <out>/<page>-<time>.pstats, loadable in
+pstats / snakeviz, plus a .json summary: wall time, peak traced memory, the
+top functions by cumulative time and the biggest allocation sites still held
+at the end of the run. By default the first load is profiled; --warm or
+--set profile a rerun instead, once caches are filled. tracemalloc slows
+every allocation, so use --no-memory for timings closest to production.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
 
-print("Listing all spreadsheets the service account can see:\n")
-files = client.list_spreadsheet_files()
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.path.join(APP_DIR, "profiles")
 
-for f in files:
-    print(f["name"])
+# Session state key the profiled script reads its output path from
+PROFILE_KEY = "_debug_profile"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 20
+
+
+# ---------------------------------------------------------
+# SPREADSHEETS VISIBLE TO THE SERVICE ACCOUNT
+# ---------------------------------------------------------
+def list_spreadsheets():
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+
+    creds = ServiceAccountCredentials.from_json_keyfile_name(
+        "service_account.json", scope
+    )
+
+    client = gspread.authorize(creds)
+
+    print("Listing all spreadsheets the service account can see:\n")
+    files = client.list_spreadsheet_files()
+
+    for f in files:
+        print(f["name"])
+
+
+# ---------------------------------------------------------
+# PROFILING ONE RERUN
+# ---------------------------------------------------------
+def page_path(page):
+    """"comp_stats", "pages/comp_stats.py" or "Home" -> path of the script."""
+    for candidate in (page, f"{page}.py", os.path.join("pages", page), os.path.join("pages", f"{page}.py")):
+        path = os.path.join(APP_DIR, candidate)
+        if os.path.isfile(path):
+            return path
+    raise SystemExit(f"No page named {page}.")
+
+
+def _short(filename):
+    # Repo files relative to the app, library files from their package down
+    if filename.startswith(APP_DIR):
+        return os.path.relpath(filename, APP_DIR)
+    marker = "site-packages" + os.sep
+    return filename.split(marker, 1)[1] if marker in filename else filename
+
+
+def profile_script(path, out_base, memory=True):
+    """Run a page script under cProfile (and tracemalloc) in the current
+    script thread, then write out_base.pstats and out_base.json."""
+    import cProfile
+    import pstats
+    import runpy
+    import time
+    import tracemalloc
+
+    if memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        runpy.run_path(path, run_name="__main__")
+    finally:
+        profiler.disable()
+        wall = time.perf_counter() - started
+
+        summary = {
+            "page": os.path.relpath(path, APP_DIR),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "wall_s": wall,
+            "pstats": out_base + ".pstats",
+        }
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+            tracemalloc.stop()
+            summary["peak_alloc_bytes"] = peak
+            summary["end_alloc_bytes"] = current
+            summary["allocations"] = [
+                {"site": f"{_short(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                 "bytes": s.size, "blocks": s.count}
+                for s in top
+            ]
+
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(out_base + ".pstats")
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_FUNCTIONS]
+        summary["functions"] = [
+            {"function": f"{_short(filename)}:{line}({name})", "calls": nc, "tottime": tt, "cumtime": ct}
+            for (filename, line, name), (_, nc, tt, ct, _) in rows
+        ]
+
+        with open(out_base + ".json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+def _profiled_page(path, memory):
+    # Its source runs as the AppTest script, so it can't use this module's
+    # globals. Profiles only the run the CLI asked for.
+    import streamlit as st
+
+    from debug import profile_script
+    import runpy
+
+    out_base = st.session_state.get("_debug_profile")
+    if out_base:
+        del st.session_state["_debug_profile"]
+        profile_script(path, out_base, memory)
+    else:
+        runpy.run_path(path, run_name="__main__")
+
+
+def profile_page(page, out_dir=PROFILE_DIR, warm=False, changes=(), memory=True, timeout=120):
+    """Profile one full rerun of `page`. `changes` is [(widget label, value)]
+    applied before the profiled rerun. Returns the summary dict."""
+    from streamlit.testing.v1 import AppTest
+
+    path = page_path(page)
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    out_base = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(path))[0]}-{stamp}")
+
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+    at = AppTest.from_function(_profiled_page, args=(path, memory), default_timeout=timeout)
+
+    if warm or changes:
+        at.run()
+        for label, value in changes:
+            widget = next((w for kind in ("selectbox", "multiselect", "slider", "text_input", "radio")
+                           for w in getattr(at, kind) if w.label == label), None)
+            if widget is None:
+                raise SystemExit(f"No widget labelled {label!r} on {page}.")
+            if isinstance(widget.value, (int, float)) and not isinstance(value, (int, float)):
+                value = type(widget.value)(value)
+            widget.set_value(value)
+
+    at.session_state[PROFILE_KEY] = out_base
+    at.run()
+    for e in at.exception:
+        print(f"Page raised: {e.value}", file=sys.stderr)
+
+    with open(out_base + ".json") as f:
+        summary = json.load(f)
+    summary["run"] = "rerun" if changes else "warm" if warm else "cold"
+    summary["changes"] = [list(c) for c in changes]
+    with open(out_base + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+# ---------------------------------------------------------
+# BEFORE / AFTER
+# ---------------------------------------------------------
+def compare(before_path, after_path, top=20):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"wall     {before['wall_s'] * 1000:9.1f} ms → {after['wall_s'] * 1000:9.1f} ms")
+    if "peak_alloc_bytes" in before and "peak_alloc_bytes" in after:
+        print(f"peak mem {before['peak_alloc_bytes'] / 1e6:9.1f} MB → {after['peak_alloc_bytes'] / 1e6:9.1f} MB")
+
+    b = {r["function"]: r["cumtime"] for r in before["functions"]}
+    a = {r["function"]: r["cumtime"] for r in after["functions"]}
+    rows = sorted(set(a) | set(b), key=lambda k: abs(a.get(k, 0) - b.get(k, 0)), reverse=True)[:top]
+    print(f"\n{'cumulative ms':>22} {'delta':>9}  function")
+    for k in rows:
+        print(f"{b.get(k, 0) * 1000:10.1f} → {a.get(k, 0) * 1000:9.1f} {(a.get(k, 0) - b.get(k, 0)) * 1000:+9.1f}  {k}")
+
+
+# ---------------------------------------------------------
+# FRAGMENT VS FULL RERUN COST (AGAINST A RUNNING SERVER)
+# ---------------------------------------------------------
+async def _rerun(ws, page, states=(), fragment_id=""):
+    """One rerun request; returns (seconds, bytes received, deltas, selectboxes)."""
+    import time
+
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = BackMsg()
+    msg.rerun_script.page_name = page
+    msg.rerun_script.widget_states.widgets.extend(states)
+    if fragment_id:
+        msg.rerun_script.fragment_id = fragment_id
+
+    started = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+    received, deltas, selectboxes = 0, 0, {}
+    done = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+    while True:
+        raw = await ws.recv()
+        fm = ForwardMsg()
+        fm.ParseFromString(raw)
+        received += len(raw)
+        if fm.HasField("delta"):
+            deltas += 1
+            if fm.delta.new_element.WhichOneof("type") == "selectbox":
+                w = fm.delta.new_element.selectbox
+                selectboxes[w.label] = (w.id, list(w.options), fm.delta.fragment_id)
+        if fm.HasField("script_finished") and fm.script_finished in done:
+            return time.perf_counter() - started, received, deltas, selectboxes
+
+
+async def _rerun_cost(port, page, label, rounds):
+    import statistics
+
+    try:
+        import websockets
+    except ImportError as e:
+        raise ImportError("`debug.py rerun` needs websockets (pip install websockets).") from e
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    results = {}
+    async with websockets.connect(f"ws://localhost:{port}/_stcore/stream", max_size=None) as ws:
+        _, _, _, selectboxes = await _rerun(ws, page)
+        if label not in selectboxes:
+            raise SystemExit(f"No selectbox labelled {label!r} on {page}.")
+        widget_id, options, fragment_id = selectboxes[label]
+        await _rerun(ws, page)  # caches warm
+
+        for mode, fragment in (("fragment", fragment_id), ("full", "")):
+            if mode == "fragment" and not fragment:
+                continue
+            runs = []
+            for i in range(rounds):
+                state = WidgetState(id=widget_id, string_value=options[(i + 1) % len(options)])
+                runs.append(await _rerun(ws, page, [state], fragment))
+            results[mode] = {
+                "latency_ms": statistics.median(r[0] for r in runs) * 1000,
+                "payload_kb": statistics.median(r[1] for r in runs) / 1024,
+                "deltas": statistics.median(r[2] for r in runs),
+            }
+    return results
+
+
+def rerun_cost(page, label, port=8501, rounds=10):
+    """{"fragment": {...}, "full": {...}} medians for changing `label` on `page`."""
+    import asyncio
+
+    return asyncio.run(_rerun_cost(port, page, label, rounds))
+
+
+def _print_summary(summary):
+    print(f"{summary['page']} ({summary['run']}): {summary['wall_s'] * 1000:.0f} ms", end="")
+    if "peak_alloc_bytes" in summary:
+        print(f", peak traced memory {summary['peak_alloc_bytes'] / 1e6:.1f} MB", end="")
+    print(f"\n{summary['pstats']}\n")
+    for r in summary["functions"][:15]:
+        print(f"{r['cumtime'] * 1000:9.1f} ms {r['calls']:>8}  {r['function']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Debugging helpers.")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("sheets", help="list the spreadsheets the service account can see")
+
+    prof = sub.add_parser("profile", help="profile one full rerun of a page")
+    prof.add_argument("page", help='page name, e.g. "comp_stats" or "Home"')
+    prof.add_argument("--set", action="append", default=[], metavar="LABEL=VALUE",
+                      help="change a widget, then profile the rerun (repeatable)")
+    prof.add_argument("--warm", action="store_true", help="profile a second, cache-warm run")
+    prof.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    prof.add_argument("--out", default=PROFILE_DIR)
+    prof.add_argument("--data-dir", default=None, help="local data stand-in (sets HS_LOCAL_DATA)")
+
+    rerun = sub.add_parser("rerun", help="fragment vs full rerun cost of one selectbox, on a running server")
+    rerun.add_argument("page", help='page name as in the URL, e.g. "comp_stats"')
+    rerun.add_argument("label", help="selectbox label")
+    rerun.add_argument("--port", type=int, default=8501)
+    rerun.add_argument("--rounds", type=int, default=10)
+
+    comp = sub.add_parser("compare", help="compare two profile summaries")
+    comp.add_argument("before")
+    comp.add_argument("after")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "profile":
+        if args.data_dir:
+            os.environ["HS_LOCAL_DATA"] = os.path.abspath(args.data_dir)
+        changes = [tuple(c.split("=", 1)) for c in args.set if "=" in c]
+        summary = profile_page(args.page, os.path.abspath(args.out), args.warm, changes, not args.no_memory)
+        _print_summary(summary)
+    elif args.command == "compare":
+        compare(args.before, args.after)
+    elif args.command == "rerun":
+        for mode, r in rerun_cost(args.page, args.label, args.port, args.rounds).items():
+            print(f"{mode:9} {r['latency_ms']:8.0f} ms {r['payload_kb']:9.1f} KB {r['deltas']:6.0f} deltas")
+    else:
+        list_spreadsheets()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+
+from data_loader import load_clean_data, load_comp_data, load_player_stats
+
+# Cleaned tables that can be exported, keyed by the name used in file names
+EXPORT_TABLES = {
+    "match_history": load_clean_data,
+    "comp_stats": load_comp_data,
+    "player_stats": load_player_stats,
+}
+
+EXPORT_FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def apply_filters(df, filters=None, date_col="DATE", start=None, end=None):
+    """Keep rows whose columns match `filters` ({column: value or list of
+    values}) and whose `date_col` falls inside [start, end]."""
+    mask = pd.Series(True, index=df.index)
+
+    for col, wanted in (filters or {}).items():
+        if col not in df.columns or wanted is None:
+            continue
+        if isinstance(wanted, (list, tuple, set)):
+            if not wanted:
+                continue
+            mask &= df[col].isin(list(wanted))
+        else:
+            mask &= df[col] == wanted
+
+    if date_col in df.columns:
+        if start is not None:
+            mask &= df[date_col] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df[date_col] <= pd.Timestamp(end)
+
+    return df[mask]
+
+
+def to_arrow(df):
+    # Typed columns go across as-is; only leftover text columns become strings
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def export_bytes(df, fmt="parquet"):
+    table = to_arrow(df)
+    buf = io.BytesIO()
+
+    if fmt == "parquet":
+        pq.write_table(table, buf, compression="zstd")
+    elif fmt == "arrow":
+        feather.write_feather(table, buf, compression="zstd")
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    return buf.getvalue()
+
+
+def export_table(name, fmt="parquet", filters=None, start=None, end=None):
+    if name not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {name}")
+
+    df = apply_filters(EXPORT_TABLES[name](), filters, start=start, end=end)
+    return export_bytes(df, fmt)
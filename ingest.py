@@ -0,0 +1,205 @@
+"""Parallel ingest: worksheets and archived seasons parsed in worker processes.
+
+Fetching stays in the calling thread (it waits on the network or disk). The
+cleaning (header fixing, roster merging, numeric coercion, player block
+extraction) runs in a process pool, one job per worksheet or archive file.
+Each worker hands its table back as a zstd-compressed Arrow IPC stream
+rather than a pickled DataFrame: the buffer is a fraction of the frame's
+size and decodes straight into columns. Frame attrs (data_version,
+agent_roster) ride along in the schema metadata.
+
+The pool is opt-in: only refresh_worksheets (the Cache Status page's
+refresh) and archive ingest use it. A loader cache miss in a
+session parses its one worksheet inline, where a pool has nothing to spread.
+Workers also send back their parsed chunks, which are put in the loaders'
+chunk store so a later inline load still reuses unchanged chunks.
+
+HS_INGEST_WORKERS sets the pool size (default: CPU count). With one worker,
+or one job, everything runs inline.
+
+    python ingest.py --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import pyarrow as pa
+import streamlit as st
+
+from data_loader import (
+    WORKSHEET_NAME, COMP_WORKSHEET_NAME, PLAYER_WORKSHEET_NAME, MAP_WL_WORKSHEET_NAME,
+    clean_match_history, clean_comp_sheet, clean_player_stats, clean_map_wl_rate,
+    fetch_layout, fetch_player_columns, grid_version, roster_span, store_chunks,
+    load_clean_data, load_comp_data, load_player_layout, load_player_stats, load_map_wl_rate,
+)
+from exports import to_arrow
+from tenants import current_spreadsheet
+
+INGEST_WORKERS = int(os.environ.get("HS_INGEST_WORKERS", os.cpu_count() or 1))
+
+ATTRS_KEY = b"hs_attrs"
+
+# Worksheet -> (cleaner, loader whose cache entry the result fills)
+WORKSHEETS = {
+    WORKSHEET_NAME: (clean_match_history, load_clean_data),
+    COMP_WORKSHEET_NAME: (clean_comp_sheet, load_comp_data),
+    MAP_WL_WORKSHEET_NAME: (clean_map_wl_rate, load_map_wl_rate),
+    PLAYER_WORKSHEET_NAME: (clean_player_stats, load_player_stats),
+}
+
+
+# ---------------------------------------------------------
+# ARROW IPC BUFFERS
+# ---------------------------------------------------------
+def to_ipc(df):
+    """DataFrame -> Arrow IPC stream bytes, attrs kept in the schema metadata."""
+    table = to_arrow(df)
+    meta = dict(table.schema.metadata or {})
+    meta[ATTRS_KEY] = json.dumps(df.attrs).encode()
+    table = table.replace_schema_metadata(meta)
+
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc(buf):
+    table = pa.ipc.open_stream(buf).read_all()
+    df = table.to_pandas()
+    df.attrs = json.loads((table.schema.metadata or {}).get(ATTRS_KEY, b"{}"))
+    return df
+
+
+# ---------------------------------------------------------
+# PROCESS POOL
+# ---------------------------------------------------------
+@st.cache_resource
+def get_pool(workers):
+    # Spawned, not forked: forking a process that runs Streamlit's server
+    # threads can copy held locks into the child.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+
+def run_parallel(fn, jobs, workers=None):
+    """[fn(*args) for args in jobs], spread over the process pool. `fn` must be
+    a module-level function; results come back in job order."""
+    workers = INGEST_WORKERS if workers is None else workers
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(*args) for args in jobs]
+
+    try:
+        futures = [get_pool(workers).submit(fn, *args) for args in jobs]
+        return [f.result() for f in futures]
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); drop the pool and finish inline
+        get_pool.clear()
+        return [fn(*args) for args in jobs]
+
+
+# ---------------------------------------------------------
+# WORKSHEETS
+# ---------------------------------------------------------
+def parse_worksheet(worksheet_name, raw, *args):
+    """Worker: clean one raw worksheet grid. Returns the frame as Arrow IPC
+    bytes and its chunk store, each parsed chunk as IPC bytes too."""
+    chunks = {}
+    df = WORKSHEETS[worksheet_name][0](raw, *args, key=chunks)
+    # A chunk can parse to None (e.g. a player block with no scrims)
+    chunks["chunks"] = {d: part if part is None else to_ipc(part) for d, part in chunks["chunks"].items()}
+    return to_ipc(df), chunks
+
+
+def fetch_worksheets(spreadsheet):
+    """(worksheet, raw grid, cleaner args) for every worksheet, fetched here."""
+    layout = load_player_layout(spreadsheet=spreadsheet)
+    span = roster_span(layout)
+    return [
+        (WORKSHEET_NAME, fetch_layout(WORKSHEET_NAME, spreadsheet=spreadsheet), ()),
+        (COMP_WORKSHEET_NAME, fetch_layout(COMP_WORKSHEET_NAME, spreadsheet=spreadsheet), ()),
+        (MAP_WL_WORKSHEET_NAME, fetch_layout(MAP_WL_WORKSHEET_NAME, spreadsheet=spreadsheet), ()),
+        (PLAYER_WORKSHEET_NAME, fetch_player_columns(layout, span, spreadsheet), (layout, span[0])),
+    ]
+
+
+def refresh_worksheets(spreadsheet=None, workers=None):
+    """Refetch every worksheet, parse the changed ones in parallel and prime the
+    loaders' cache entries with the results. A worksheet whose raw grid hashes
+    the same as the one behind the loader's cached frame (attrs
+    "grid_version") keeps that frame. Returns ({worksheet: frame}, timings in
+    seconds)."""
+    spreadsheet = spreadsheet or current_spreadsheet()
+
+    started = time.perf_counter()
+    fetched = fetch_worksheets(spreadsheet)
+    fetch_s = time.perf_counter() - started
+
+    frames, todo = {}, []
+    for name, raw, args in fetched:
+        version = grid_version(raw)
+        prev = WORKSHEETS[name][1].peek(spreadsheet=spreadsheet)
+        if prev is not None and prev.attrs.get("grid_version") == version:
+            frames[name] = prev
+        else:
+            todo.append((name, raw, args, version))
+
+    started = time.perf_counter()
+    results = run_parallel(parse_worksheet, [(name, raw, *args) for name, raw, args, _ in todo], workers)
+    for (name, _, _, version), (buf, chunks) in zip(todo, results):
+        frames[name] = from_ipc(buf)
+        frames[name].attrs["grid_version"] = version
+        chunks["chunks"] = {d: part if part is None else from_ipc(part) for d, part in chunks["chunks"].items()}
+        store_chunks((spreadsheet, name), chunks)
+    parse_s = time.perf_counter() - started
+
+    # Reused frames too: the reload restarts their TTL
+    for name, df in frames.items():
+        WORKSHEETS[name][1].prime(df, spreadsheet=spreadsheet)
+        WORKSHEETS[name][1].share(df, spreadsheet=spreadsheet)
+
+    return frames, {"fetch": fetch_s, "parse": parse_s, "parsed": len(todo), "reused": len(frames) - len(todo)}
+
+
+# ---------------------------------------------------------
+# CLI: SERIAL VS PARALLEL WALL TIME
+# ---------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time a full worksheet + archive parse, serial vs parallel.")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--spreadsheet", default=None, help="spreadsheet name (default: first configured)")
+    parser.add_argument("--archive-dir", default=None)
+    args = parser.parse_args(argv)
+
+    from archive import archive_files, ingest_archives
+    from tenants import configured_spreadsheets
+    spreadsheet = args.spreadsheet or next(iter(configured_spreadsheets().values()))
+    fetched = fetch_worksheets(spreadsheet)
+    jobs = [(name, raw, *extra) for name, raw, extra in fetched]
+    paths = archive_files(spreadsheet, args.archive_dir)
+
+    for workers in sorted({1, max(args.workers, 1)}):
+        if workers > 1:
+            # Worker start-up is paid once per process, not per refresh
+            run_parallel(parse_worksheet, jobs, workers)
+        started = time.perf_counter()
+        frames = [from_ipc(b) for b, _ in run_parallel(parse_worksheet, jobs, workers)]
+        sheets_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        ingest_archives(paths, workers)
+        archive_s = time.perf_counter() - started
+
+        rows = sum(len(df) for df in frames)
+        print(f"{workers} worker(s): {len(jobs)} worksheets ({rows} rows) {sheets_s:.2f}s, "
+              f"{len(paths)} archive files {archive_s:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""Concurrent-session load test.
+
+Simulates N viewers opening Home.py and every page with Streamlit's AppTest,
+changing selectboxes/sliders like a person would, against the local data
+stand-in (HS_LOCAL_DATA). Synthetic data comes with one archived season
+(HS_ARCHIVE_DIR) for All-Time Stats. Reports per-rerun latency percentiles,
+CPU time and memory.
+
+    python loadtest.py --sessions 20 --changes 3
+    python loadtest.py --sessions 50 --matches 5000 --json loadtest.json
+    python loadtest.py --sessions 1 --matches 0      # header-only match sheet
+
+Exits non-zero if any rerun raised or showed an error.
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Page -> widgets a viewer changes: (widget type, label, values or "cycle").
+# "component" drives a custom component through its session state key.
+# Pages with no entries are only loaded: Cache Status's buttons clear or
+# reload every session's cache, and Add Match would write to the data.
+SCENARIOS = {
+    "Home.py": [],
+    "pages/overview.py": [("selectbox", "Select Map:", "cycle")],
+    "pages/comp_stats.py": [("selectbox", "Select Map", "cycle")],
+    "pages/match_history.py": [
+        ("multiselect", "Map", "cycle"),
+        ("multiselect", "Result", "cycle"),
+        ("component", "history_search", ["retake", "jett om", "team 1"]),
+    ],
+    "pages/player_stats.py": [("selectbox", "Select Player", "cycle")],
+    "pages/comparision.py": [("selectbox", "Select Player", "cycle"), ("selectbox", "Role", "cycle")],
+    "pages/form_trends.py": [("slider", "Rolling window (last N scrims)", [5, 20])],
+    "pages/head_to_head.py": [("selectbox", "Opponent", "cycle")],
+    "pages/all_time.py": [],
+    "pages/export.py": [("selectbox", "Table", "cycle"), ("selectbox", "Format", "cycle")],
+    "pages/sql_query.py": [("selectbox", "Saved queries", "cycle")],
+    "pages/cache_status.py": [],
+    "pages/add_match.py": [],
+}
+
+
+# ---------------------------------------------------------
+# SYNTHETIC LOCAL DATA STAND-IN
+# ---------------------------------------------------------
+AGENTS = ["Jett", "Raze", "Omen", "Viper", "Killjoy", "Sova", "Skye", "Cypher",
+          "Brimstone", "Neon", "Fade", "Breach", "Clove", "Tejo", "Vyse"]
+MAPS = ["Ascent", "Lotus", "Split", "Icebox", "Haven", "Bind", "Sunset"]
+PLAYERS = ["Rus", "Solo", "Jayloh", "Slash", "Jfz", "Synzera"]
+
+
+def synthetic_grids(matches=300, scrims=60, seed=7):
+    """Raw grids laid out like the real worksheets."""
+    rng = random.Random(seed)
+    opponents = [f"Team {i:02d}" for i in range(40)]
+
+    header = ["Opponent", "DATE", "TIME(SGT)", "Played", "Differential", "Won", "Lost",
+              "ATK W", "ATK L", "DEF W", "DEF L", "Type of Match", "Map", "Result",
+              "Game Level", "Scrim Quality", "VOD Link", "Notes", "Roster", "Pink", "Cyan",
+              "Pistols (ATK)", "Pistols (DEF)", "Comp"]
+    history = [["MATCH HISTORY"], [], header]
+    comp_sheet = [["Map", "Result", "ATK W", "ATK L", "DEF W", "DEF L"] + [f"Agent {i}" for i in range(1, 6)], [], []]
+    start = datetime.date(2024, 1, 1)
+
+    for i in range(matches):
+        won, lost = rng.randint(3, 13), rng.randint(3, 13)
+        atk_w, atk_l = rng.randint(0, won), rng.randint(0, lost)
+        result = "Win" if won > lost else "Loss" if lost > won else "Tie"
+        m = rng.choice(MAPS)
+        agents = rng.sample(AGENTS, 5)
+        history.append([
+            rng.choice(opponents), (start + datetime.timedelta(days=i // 3)).strftime("%d/%m/%Y"), "20:00",
+            str(won + lost), str(won - lost), str(won), str(lost),
+            str(atk_w), str(atk_l), str(won - atk_w), str(lost - atk_l),
+            rng.choice(["Scrim", "Official"]), m, result, rng.choice(["T1", "T2"]),
+            rng.choice(["Good", "Average", "Bad"]), f"https://vod.example/{i}",
+            rng.choice(["retake issues", "good mid control", "lost pistols", "eco wins", ""]),
+            "Main", "", "", str(rng.randint(0, 1)), str(rng.randint(0, 1)), " | ".join(agents),
+        ])
+        comp_sheet.append([m, result, str(atk_w), str(atk_l), str(won - atk_w), str(lost - atk_l)] + agents)
+
+    width = 14 + 8 * len(PLAYERS)
+    scrim_sheet = [[""] * width for _ in range(6 + scrims)]
+    for b, name in enumerate(PLAYERS):
+        c = 14 + 8 * b
+        scrim_sheet[4][c] = name
+        scrim_sheet[5][c:c + 8] = ["KDA", "Kills", "Deaths", "Assists", "ACS", "FK", "FD", "Agent"]
+        for r in range(scrims):
+            k, d, a = rng.randint(5, 25), rng.randint(5, 20), rng.randint(0, 10)
+            scrim_sheet[6 + r][c:c + 8] = [
+                f"{(k + a) / d:.2f}", str(k), str(d), str(a), str(rng.randint(120, 320)),
+                str(rng.randint(0, 5)), str(rng.randint(0, 5)), rng.choice(AGENTS),
+            ]
+
+    map_wl = [["MAP W/L"], [], ["Maps", "Total Games Played", "Map Win%", "Atk Win%", "Def Win%",
+                                "Pistol Win% (ATK)", "Pistol Win% (DEF)"]]
+    for m in MAPS:
+        map_wl.append([m, str(rng.randint(5, 40))] + [f"{rng.uniform(30, 70):.2f}%" for _ in range(5)])
+
+    return {
+        "All Match History": history,
+        "Comp Stats": comp_sheet,
+        "Scrim Stats": scrim_sheet,
+        "Map W/L Rate": map_wl,
+    }
+
+
+def write_synthetic_data(data_dir, **kwargs):
+    os.makedirs(data_dir, exist_ok=True)
+    for worksheet, grid in synthetic_grids(**kwargs).items():
+        path = os.path.join(data_dir, worksheet.replace("/", "_") + ".csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(grid)
+
+
+def write_synthetic_archive(archive_dir, **kwargs):
+    """One archived season (an All Match History export) for All-Time Stats."""
+    os.makedirs(archive_dir, exist_ok=True)
+    grid = synthetic_grids(seed=8, **kwargs)["All Match History"]
+    with open(os.path.join(archive_dir, "season_1.csv"), "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(grid)
+
+
+# ---------------------------------------------------------
+# SESSIONS
+# ---------------------------------------------------------
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def keep_apptest_runtime():
+    """AppTest puts a mock Runtime in a process-wide slot for each run and
+    empties it when the run ends. With sessions in threads, one run ending
+    can empty it under another mid-script ("Runtime hasn't been created!",
+    or Runtime.exists() briefly False). Keep answering with the last mock."""
+    from streamlit.runtime import Runtime
+
+    last = [None]
+
+    def current(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        return last[0]
+
+    def instance(cls):
+        if current(cls) is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: current(cls) is not None)
+
+
+def find_widget(at, kind, label):
+    return next((w for w in getattr(at, kind) if w.label == label), None)
+
+
+def page_errors(at):
+    # Uncaught exceptions plus the st.error messages pages show when a load fails
+    return len(at.exception) + len(at.error)
+
+
+def run_session(session_id, pages, changes, timeout, results, lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    for page in pages:
+        samples = []
+        at = AppTest.from_file(os.path.join(APP_DIR, page), default_timeout=timeout)
+
+        started = time.perf_counter()
+        at.run()
+        samples.append(("load", time.perf_counter() - started, page_errors(at)))
+
+        for kind, label, values in SCENARIOS.get(page, []):
+            for _ in range(changes):
+                if kind == "component":
+                    started = time.perf_counter()
+                    at.session_state[label] = {"value": rng.choice(values)}
+                    at.run()
+                    samples.append((label, time.perf_counter() - started, page_errors(at)))
+                    continue
+                widget = find_widget(at, kind, label)
+                if widget is None:
+                    break
+                options = widget.options if values == "cycle" else values
+                if not options:
+                    break
+                value = rng.choice(list(options))
+                started = time.perf_counter()
+                widget.set_value([value] if kind == "multiselect" else value).run()
+                samples.append((label, time.perf_counter() - started, page_errors(at)))
+
+        with lock:
+            for action, seconds, errors in samples:
+                results.append({"session": session_id, "page": page, "action": action,
+                                "seconds": seconds, "errors": errors})
+
+
+def percentiles(values):
+    values = np.asarray(values)
+    return {
+        "n": int(len(values)),
+        "p50_ms": float(np.percentile(values, 50) * 1000),
+        "p90_ms": float(np.percentile(values, 90) * 1000),
+        "p99_ms": float(np.percentile(values, 99) * 1000),
+        "max_ms": float(values.max() * 1000),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--changes", type=int, default=3, help="widget changes per widget per page")
+    parser.add_argument("--pages", nargs="*", default=list(SCENARIOS), help="pages to visit")
+    parser.add_argument("--data-dir", default=None, help="local data stand-in (default: synthetic, in a temp dir)")
+    parser.add_argument("--matches", type=int, default=300, help="synthetic match rows (0: header only)")
+    parser.add_argument("--scrims", type=int, default=60, help="synthetic scrims per player")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", default=None, help="write the summary here")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix="hs-loadtest-")
+        write_synthetic_data(data_dir, matches=args.matches, scrims=args.scrims)
+        os.environ["HS_ARCHIVE_DIR"] = os.path.join(data_dir, "archive")
+        write_synthetic_archive(os.environ["HS_ARCHIVE_DIR"], matches=args.matches)
+    os.environ["HS_LOCAL_DATA"] = os.path.abspath(data_dir)
+    # Pages open the logo by a relative path
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    keep_apptest_runtime()
+    results, lock = [], threading.Lock()
+    peak_rss = [rss_bytes()]
+    stop = threading.Event()
+
+    def sample_memory():
+        while not stop.wait(0.05):
+            peak_rss[0] = max(peak_rss[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+
+    start_rss = rss_bytes()
+    cpu0, wall0 = os.times(), time.perf_counter()
+
+    threads = [
+        threading.Thread(target=run_session, args=(i, args.pages, args.changes, args.timeout, results, lock))
+        for i in range(args.sessions)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    wall = time.perf_counter() - wall0
+    cpu1 = os.times()
+    stop.set()
+    cpu = (cpu1.user - cpu0.user) + (cpu1.system - cpu0.system)
+
+    summary = {
+        "sessions": args.sessions,
+        "reruns": len(results),
+        "errors": sum(r["errors"] > 0 for r in results),
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_cores_used": cpu / wall if wall else 0.0,
+        "rss_start_mb": start_rss / 1024 / 1024,
+        "rss_peak_mb": peak_rss[0] / 1024 / 1024,
+        "overall": percentiles([r["seconds"] for r in results]) if results else {},
+        "pages": {},
+    }
+    for page in args.pages:
+        rows = [r for r in results if r["page"] == page]
+        if rows:
+            summary["pages"][page] = {
+                "load": percentiles([r["seconds"] for r in rows if r["action"] == "load"]),
+                "interactions": percentiles([r["seconds"] for r in rows if r["action"] != "load"])
+                if any(r["action"] != "load" for r in rows) else None,
+            }
+
+    print(f"{args.sessions} sessions · {len(results)} reruns · {summary['errors']} with errors · "
+          f"{wall:.1f}s wall · {cpu:.1f}s CPU ({summary['cpu_cores_used']:.2f} cores) · "
+          f"RSS {summary['rss_start_mb']:.0f} → {summary['rss_peak_mb']:.0f} MB peak")
+    print(f"{'page':28} {'action':12} {'n':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for page, stats in summary["pages"].items():
+        for action in ["load", "interactions"]:
+            s = stats[action]
+            if s:
+                print(f"{page:28} {action:12} {s['n']:>5} {s['p50_ms']:>7.0f}ms {s['p90_ms']:>7.0f}ms "
+                      f"{s['p99_ms']:>7.0f}ms {s['max_ms']:>7.0f}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# BITMAP INDEX OVER THE MATCH HISTORY
+# ---------------------------------------------------------
+# One bitmap per distinct value of each filter column, packed 64 rows to a
+# uint64 word (row r is bit r % 64 of word r // 64). A filter is the OR of
+# the chosen values' bitmaps within a column and the AND across columns, so
+# no string column is scanned after the store is built.
+
+FILTER_COLUMNS = ["Map", "Result", "Opponent", "Type of Match", "Game Level", "Scrim Quality"]
+
+
+def _words(n):
+    return (n + 63) // 64
+
+
+def _bitmap(rows, n):
+    words = np.zeros(_words(n), dtype=np.uint64)
+    np.bitwise_or.at(words, rows >> 6, np.uint64(1) << (rows & 63).astype(np.uint64))
+    return words
+
+
+def build_match_store(df, columns=FILTER_COLUMNS):
+    """{"n": rows, "values": {col: [values]}, "bitmaps": {col: {value: words}}}
+    for the columns of `columns` present in df. Blank cells are not indexed."""
+    n = len(df)
+    store = {"n": n, "values": {}, "bitmaps": {}}
+
+    for col in columns:
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col], sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        bitmaps = {}
+        for k, value in enumerate(uniques):
+            if value == "":
+                continue
+            bitmaps[value] = _bitmap(order[bounds[k]:bounds[k + 1]].astype(np.int64), n)
+
+        store["values"][col] = list(bitmaps)
+        store["bitmaps"][col] = bitmaps
+
+    return store
+
+
+def extend_match_store(store, new_rows):
+    """The store for the old rows plus `new_rows` appended after them. Old
+    bitmaps are copied and widened rather than rebuilt from the columns, and
+    the given store is left untouched (it may be shared from the cache)."""
+    n0 = store["n"]
+    n = n0 + len(new_rows)
+    out = {"n": n, "values": {}, "bitmaps": {}}
+
+    for col, bitmaps in store["bitmaps"].items():
+        merged = {}
+        for value, words in bitmaps.items():
+            merged[value] = np.zeros(_words(n), dtype=np.uint64)
+            merged[value][:len(words)] = words
+
+        if col in new_rows.columns:
+            codes, uniques = pd.factorize(new_rows[col])
+            for k, value in enumerate(uniques):
+                if value == "":
+                    continue
+                rows = n0 + np.flatnonzero(codes == k).astype(np.int64)
+                words = merged.setdefault(value, np.zeros(_words(n), dtype=np.uint64))
+                np.bitwise_or.at(words, rows >> 6, np.uint64(1) << (rows & 63).astype(np.uint64))
+
+        out["bitmaps"][col] = {v: merged[v] for v in sorted(merged)}
+        out["values"][col] = list(out["bitmaps"][col])
+
+    return out
+
+
+def all_rows(store):
+    words = np.full(_words(store["n"]), np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+    tail = store["n"] % 64
+    if tail:
+        words[-1] = np.uint64((1 << tail) - 1)
+    return words
+
+
+def filter_bitmap(store, filters):
+    """AND of each column's filter; a filter is one value or a list of values
+    (OR-ed). Empty lists / None mean no filter on that column; a value that
+    never occurs matches nothing."""
+    result = None
+    for col, wanted in filters.items():
+        if wanted is None:
+            continue
+        if isinstance(wanted, (str, int, float)):
+            wanted = [wanted]
+        if len(wanted) == 0:
+            continue
+
+        bitmaps = store["bitmaps"].get(col)
+        if bitmaps is None:
+            raise KeyError(f"{col} is not indexed.")
+
+        col_words = np.zeros(_words(store["n"]), dtype=np.uint64)
+        for value in wanted:
+            if value in bitmaps:
+                col_words |= bitmaps[value]
+
+        result = col_words if result is None else result & col_words
+
+    return all_rows(store) if result is None else result
+
+
+def bitmap_rows(store, words):
+    """Row positions set in a bitmap, ascending. This is O(rows); use
+    bitmap_count / count_by when only totals are needed."""
+    return np.flatnonzero(bitmap_mask(store, words))
+
+
+def bitmap_count(words):
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def filter_rows(store, filters):
+    return bitmap_rows(store, filter_bitmap(store, filters))
+
+
+def count_by(store, words, col):
+    """{value: rows in the bitmap with that value of `col`}, by popcount."""
+    return {value: bitmap_count(words & b) for value, b in store["bitmaps"][col].items()}
+
+
+def bitmap_mask(store, words):
+    """The bitmap as a boolean array over rows."""
+    return np.unpackbits(words.view(np.uint8), bitorder="little")[:store["n"]].astype(bool)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# OPPONENT INDEX
+# ---------------------------------------------------------
+# Built once per match-history data version: every opponent's row positions
+# plus its record, per-map and per-side totals, so switching opponent is a
+# dict lookup.
+
+SIDE_COLUMNS = ["ATK W", "ATK L", "DEF W", "DEF L"]
+
+
+def _side_rates(t):
+    atk = t["ATK W"] + t["ATK L"]
+    dfn = t["DEF W"] + t["DEF L"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t["ATK WR"] = np.where(atk > 0, t["ATK W"] / atk * 100, np.nan)
+        t["DEF WR"] = np.where(dfn > 0, t["DEF W"] / dfn * 100, np.nan)
+    t["Round Diff"] = (t["ATK W"] + t["DEF W"]) - (t["ATK L"] + t["DEF L"])
+    return t
+
+
+def build_opponent_index(df, opponent_col="Opponent", map_col="Map", result_col="Result"):
+    """{"rows": {opp: row positions}, "summary": per-opponent totals,
+    "maps": per opponent×map totals}."""
+    sides = [c for c in SIDE_COLUMNS if c in df.columns]
+    work = pd.DataFrame({
+        "Opponent": df[opponent_col].to_numpy(),
+        "Map": df[map_col].to_numpy() if map_col in df.columns else "",
+        "Games": 1,
+        "Wins": (df[result_col] == "Win").to_numpy().astype(int),
+        "Losses": (df[result_col] == "Loss").to_numpy().astype(int),
+        "Ties": (df[result_col] == "Tie").to_numpy().astype(int),
+    })
+    for c in SIDE_COLUMNS:
+        work[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).to_numpy() if c in sides else 0
+
+    agg_cols = ["Games", "Wins", "Losses", "Ties"] + SIDE_COLUMNS
+
+    summary = _side_rates(work.groupby("Opponent")[agg_cols].sum())
+    summary["Win Rate"] = summary["Wins"] / summary["Games"] * 100
+    if "DATE" in df.columns:
+        dates = pd.Series(df["DATE"].to_numpy(), name="DATE").groupby(work["Opponent"])
+        summary["First Played"] = dates.min()
+        summary["Last Played"] = dates.max()
+
+    by_map = _side_rates(work.groupby(["Opponent", "Map"])[agg_cols].sum())
+    by_map["Win Rate"] = by_map["Wins"] / by_map["Games"] * 100
+    by_map["Pick Share"] = by_map["Games"] / by_map.groupby(level=0)["Games"].transform("sum") * 100
+
+    return {
+        "rows": work.groupby("Opponent").indices,
+        "summary": summary,
+        "maps": {opp: g.droplevel(0) for opp, g in by_map.groupby(level=0)},
+    }
+
+
+def opponents(index):
+    """Opponents ordered by how often we've played them."""
+    return index["summary"].sort_values("Games", ascending=False).index.tolist()
+
+
+def head_to_head(index, opponent):
+    """(summary row, per-map table, row positions) for one opponent."""
+    return (
+        index["summary"].loc[opponent],
+        index["maps"].get(opponent, pd.DataFrame()),
+        index["rows"].get(opponent, np.array([], dtype=np.int64)),
+    )
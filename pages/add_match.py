@@ -0,0 +1,103 @@
+import datetime
+
+import streamlit as st
+
+from comps import AGENT_ROSTER
+from data_loader import WORKSHEET_NAME, load_clean_data
+from tenants import spreadsheet_selector
+from writeback import CacheSyncError, add_match
+
+st.set_page_config(page_title="Add Match", layout="wide")
+spreadsheet_selector()
+
+GOLD = "#d4af37"
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>Add Match</h1>", unsafe_allow_html=True)
+
+try:
+    df = load_clean_data()
+except Exception as e:
+    st.error(f"❌ Error loading Match History sheet: {e}")
+    st.stop()
+
+
+def choices(col):
+    """Values already in the sheet, most used first; new ones can be typed."""
+    if col not in df.columns:
+        return []
+    values = df[col].dropna().astype(str)
+    return values[values != ""].value_counts().index.tolist()
+
+
+# =========================
+# ENTRY FORM (ONE SHEET WRITE ON SUBMIT)
+# =========================
+st.caption(f"Appends one row to {WORKSHEET_NAME}. Every page shows it straight away; "
+           "nothing is refetched.")
+
+with st.form("add_match", clear_on_submit=True):
+    a, b, c, d = st.columns(4)
+    opponent = a.selectbox("Opponent", choices("Opponent"), index=None, accept_new_options=True)
+    date = b.date_input("Date", datetime.date.today(), format="DD/MM/YYYY")
+    time_sgt = c.text_input("Time (SGT)", placeholder="20:00")
+    map_name = d.selectbox("Map", choices("Map"), index=None, accept_new_options=True)
+
+    a, b, c, d = st.columns(4)
+    match_type = a.selectbox("Type of Match", choices("Type of Match"), index=None, accept_new_options=True)
+    level = b.selectbox("Game Level", choices("Game Level"), index=None, accept_new_options=True)
+    quality = c.selectbox("Scrim Quality", choices("Scrim Quality"), index=None, accept_new_options=True)
+    roster = d.selectbox("Roster", choices("Rosters"), index=None, accept_new_options=True)
+
+    st.markdown(f"<h3 style='color:{GOLD};'>Rounds</h3>", unsafe_allow_html=True)
+    r = st.columns(6)
+    won = r[0].number_input("Won", min_value=0, value=13)
+    lost = r[1].number_input("Lost", min_value=0, value=0)
+    atk_w = r[2].number_input("ATK W", min_value=0, value=0)
+    atk_l = r[3].number_input("ATK L", min_value=0, value=0)
+    def_w = r[4].number_input("DEF W", min_value=0, value=0)
+    def_l = r[5].number_input("DEF L", min_value=0, value=0)
+
+    a, b = st.columns(2)
+    pistol_atk = a.selectbox("Pistols (ATK)", choices("Pistols (ATK)"), index=None, accept_new_options=True)
+    pistol_def = b.selectbox("Pistols (DEF)", choices("Pistols (DEF)"), index=None, accept_new_options=True)
+
+    comp = st.multiselect("Comp", AGENT_ROSTER, max_selections=5)
+    vod = st.text_input("VOD Link")
+    notes = st.text_area("Notes")
+
+    submitted = st.form_submit_button("Add match")
+
+if submitted:
+    entry = {
+        "Opponent": opponent or "",
+        "DATE": date,
+        "TIME (SGT)": time_sgt,
+        "Map": map_name or "",
+        "Type of Match": match_type or "",
+        "Game Level": level or "",
+        "Scrim Quality": quality or "",
+        "Rosters": roster or "",
+        "Won": won, "Lost": lost,
+        "ATK W": atk_w, "ATK L": atk_l, "DEF W": def_w, "DEF L": def_l,
+        "Pistols (ATK)": pistol_atk or "",
+        "Pistols (DEF)": pistol_def or "",
+        "Comp": " | ".join(comp),
+        "VOD Link": vod,
+        "Notes": notes,
+    }
+    try:
+        updated = add_match(entry)
+    except CacheSyncError as e:
+        updated = e.frame
+        st.warning(f"⚠️ {e} Don't add it again.")
+    except Exception as e:
+        st.error(f"❌ Match not saved (the dashboard is unchanged): {e}")
+        updated = None
+
+    if updated is not None:
+        st.success(f"Added {entry['Opponent']} on {entry['Map'] or 'unknown map'} · "
+                   f"{len(updated)} matches now.")
@@ -0,0 +1,75 @@
+import streamlit as st
+
+from archive import ARCHIVE_DIR, all_time_tables
+from charts import map_win_rate_bar, line_chart
+from data_loader import load_clean_data
+from tenants import spreadsheet_selector
+
+st.set_page_config(page_title="All-Time Stats", layout="wide")
+spreadsheet_selector()
+
+BG = "#0d0f12"
+GOLD = "#d4af37"
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>All-Time Stats</h1>", unsafe_allow_html=True)
+
+
+# =========================
+# LIVE SHEET + ARCHIVED SEASONS (STREAMED, ONLY TOTALS KEPT)
+# =========================
+try:
+    live = load_clean_data()
+except Exception as e:
+    st.error(f"❌ Error loading Match History sheet: {e}")
+    st.stop()
+
+try:
+    with st.spinner("Reading archived seasons..."):
+        tables, files = all_time_tables(live)
+except Exception as e:
+    st.error(f"❌ Error reading archives in {ARCHIVE_DIR}: {e}")
+    st.stop()
+
+if files.empty:
+    st.caption(f"No archived seasons found. Put CSV/XLSX exports of All Match History in {ARCHIVE_DIR}/ "
+               "(or set HS_ARCHIVE_DIR).")
+else:
+    st.caption(f"{len(live)} live matches + {files['Matches'].sum()} archived matches "
+               f"from {len(files)} files")
+    with st.expander("Archived files"):
+        st.dataframe(files, use_container_width=True)
+
+RATE_FORMAT = {"Win Rate": "{:.1f}%", "ATK WR": "{:.1f}%", "DEF WR": "{:.1f}%", "Round Diff": "{:+.0f}"}
+SHOWN = ["Games", "Wins", "Losses", "Ties", "Win Rate", "ATK WR", "DEF WR", "Round Diff"]
+
+
+# =========================
+# TABLES
+# =========================
+by_map, by_opp, by_month, by_type = st.tabs(["Maps", "Opponents", "Months", "Maps × Match Type"])
+
+with by_map:
+    t = tables["by_map"]
+    if not t.empty:
+        st.plotly_chart(map_win_rate_bar(t, "Map", "Win Rate"), use_container_width=True)
+    st.dataframe(t[["Map"] + SHOWN].style.format(RATE_FORMAT), use_container_width=True)
+
+with by_opp:
+    t = tables["by_opponent"].sort_values("Games", ascending=False)
+    st.dataframe(t[["Opponent"] + SHOWN].style.format(RATE_FORMAT), use_container_width=True)
+
+with by_month:
+    t = tables["by_month"]
+    if not t.empty:
+        fig = line_chart(t, "Month", "Win Rate", markers=True)
+        fig.update_layout(plot_bgcolor=BG, paper_bgcolor=BG, font=dict(color="white", size=14))
+        st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(t[["Month"] + SHOWN].style.format(RATE_FORMAT), use_container_width=True)
+
+with by_type:
+    t = tables["by_map_type"]
+    st.dataframe(t[["Map", "Type of Match"] + SHOWN].style.format(RATE_FORMAT), use_container_width=True)
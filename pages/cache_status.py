@@ -0,0 +1,101 @@
+import streamlit as st
+
+from cache import get_cache
+from ingest import INGEST_WORKERS, refresh_worksheets
+from shared_cache import SHARED_DIR, SHARED_TTL, enabled as shared_enabled, status as shared_status
+from tenants import spreadsheet_selector
+
+st.set_page_config(page_title="Cache Status", layout="wide")
+spreadsheet_selector()
+
+GOLD = "#d4af37"
+CARD = "#16181d"
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>Cache Status</h1>", unsafe_allow_html=True)
+
+cache = get_cache()
+
+
+def card(col, title, value):
+    col.markdown(
+        f"""
+        <div style='background:{CARD}; padding:18px; border-radius:12px;'>
+            <p style='color:{GOLD}; margin:0; font-size:16px; font-weight:600;'>{title}</p>
+            <p style='color:white; margin:0; font-size:30px; font-weight:800;'>{value}</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+# ---------------------------------------------------------
+# BUDGET
+# ---------------------------------------------------------
+budget_mb = st.number_input(
+    "Memory budget (MB)", min_value=16, value=int(cache.budget / 1024 / 1024), step=16
+)
+if budget_mb * 1024 * 1024 != cache.budget:
+    cache.set_budget(int(budget_mb * 1024 * 1024))
+
+stats = cache.stats()
+
+# ---------------------------------------------------------
+# COUNTERS
+# ---------------------------------------------------------
+top1, top2, top3, top4 = st.columns(4)
+card(top1, "Hits", stats["hits"])
+card(top2, "Misses", stats["misses"])
+card(top3, "Hit Rate", f"{stats['hit_rate'] * 100:.1f}%")
+card(top4, "Evictions", stats["evictions"])
+
+entries = cache.entries()
+chunk_kb = entries.loc[entries["Entry"].str.startswith("chunks:"), "Size (KB)"].sum()
+
+bot1, bot2, bot3, bot4 = st.columns(4)
+card(bot1, "Entries", stats["entries"])
+card(bot2, "Size", f"{stats['size_bytes'] / 1024 / 1024:.1f} MB")
+card(bot3, "Parsed Chunks", f"{chunk_kb / 1024:.1f} MB")
+card(bot4, "Budget Used", f"{stats['size_bytes'] / max(stats['budget_bytes'], 1) * 100:.1f}%")
+
+# ---------------------------------------------------------
+# ENTRIES
+# ---------------------------------------------------------
+st.markdown(f"<h3 style='color:{GOLD}; margin-top:25px;'>Cached Entries</h3>", unsafe_allow_html=True)
+
+st.dataframe(entries.style.format({
+    "Size (KB)": "{:.1f}",
+    "Build (ms)": "{:.0f}",
+    "Age (s)": "{:.0f}"
+}), use_container_width=True)
+
+if not entries.empty:
+    st.markdown(f"<h3 style='color:{GOLD};'>Size per Spreadsheet</h3>", unsafe_allow_html=True)
+    st.dataframe(entries.groupby("Spreadsheet")["Size (KB)"].sum().reset_index(), use_container_width=True)
+
+if st.button("Clear cache"):
+    cache.clear()
+    st.rerun()
+
+if st.button(f"Reload all worksheets ({INGEST_WORKERS} worker processes)"):
+    with st.spinner("Fetching and parsing worksheets..."):
+        _, timings = refresh_worksheets()
+    st.caption(
+        f"Fetched in {timings['fetch']:.1f}s, parsed {timings['parsed']} changed worksheets "
+        f"in {timings['parse']:.1f}s ({timings['reused']} unchanged)"
+    )
+
+# ---------------------------------------------------------
+# SHARED TABLES (HS_SHARED_CACHE)
+# ---------------------------------------------------------
+if shared_enabled():
+    st.markdown(f"<h3 style='color:{GOLD};'>Shared Tables</h3>", unsafe_allow_html=True)
+    st.caption(f"Memory-mapped from {SHARED_DIR}; refreshed by one replica every {SHARED_TTL:.0f}s")
+    st.dataframe(shared_status().style.format({"Age (s)": "{:.0f}", "Size (KB)": "{:.1f}"}),
+                 use_container_width=True)
+
+with st.expander("Raw counters (JSON)"):
+    st.json(stats)
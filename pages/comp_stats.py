@@ -1,15 +1,23 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import plotly.express as px
 import html
 import requests
 
+from cache import derived
+from charts import pick_rate_bar, agent_frequency_bar, pair_heatmap
+from comps import (
+    AGENT_ROSTER, AGENT_ROLES, comp_stats_table,
+    build_comp_index, query_comps, role_agents, pair_stats, pair_table
+)
+from data_loader import load_comp_data
+from match_store import build_match_store, filter_rows
+from tenants import spreadsheet_selector
+from views import comp_view
+
 # ---------------------------------------------------------
 # PAGE CONFIG
 # ---------------------------------------------------------
 st.set_page_config(page_title="HS Composition Stats", layout="wide")
+spreadsheet_selector()
 
 LOGO = "heaven_sent_logo.png"
 
@@ -30,10 +38,14 @@ def render():
 # ---------------------------------------------------------
 # AGENT ICONS (LIVE FROM VALORANT API)
 # ---------------------------------------------------------
-@st.cache_data
+@st.cache_data(ttl=3600)
 def load_agent_icons():
     url = "https://valorant-api.com/v1/agents?isPlayableCharacter=true"
-    data = requests.get(url).json()
+    try:
+        data = requests.get(url, timeout=5).json()
+    except (requests.RequestException, ValueError):
+        # Offline (or API down): comps fall back to agent names
+        return {}
 
     mapping = {}
     for agent in data["data"]:
@@ -56,207 +68,193 @@ def comp_to_icons(comp):
     return html_icons
 
 
-# ---------------------------------------------------------
-# GOOGLE SHEETS LOAD
-# ---------------------------------------------------------
-SPREADSHEET_NAME = "HS SPREADSHEET NEW ROSTER"
-
-@st.cache_data
-def load_comp_sheet():
-    try:
-        service_info = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(service_info, scope)
-        client = gspread.authorize(creds)
-
-        sheet = client.open(SPREADSHEET_NAME).worksheet("Comp Stats")
-        raw = sheet.get_all_values()
-
-        row1 = [x.strip() for x in raw[0]]
-        row3 = [x.strip() for x in raw[2]]
-
-        final_headers = []
-        for h1, h3 in zip(row1, row3):
-            final_headers.append(h3 if h3 else h1 if h1 else "Unknown")
-
-        df = pd.DataFrame(raw[3:], columns=final_headers)
-
-        df = df.apply(lambda col: col.str.strip()
-                      if col.dtype == "object" else col)
-
-        # Convert numeric columns
-        numeric_cols = ["ATK W", "ATK L", "DEF W", "DEF L"]
-        for c in numeric_cols:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
-
-        return df
-
-    except Exception as e:
-        st.error(f"Error loading Comp Stats sheet: {e}")
-        return None
-
-
 # ---------------------------------------------------------
 # LOAD DATA
 # ---------------------------------------------------------
-df = load_comp_sheet()
-if df is None:
+try:
+    df = load_comp_data()
+except Exception as e:
+    st.error(f"Error loading Comp Stats sheet: {e}")
     st.stop()
 
-# Detect agent columns
-agent_cols = sorted([c for c in df.columns if "agent" in c.lower()])
-
-
-def build_comp(row):
-    return " | ".join([row[c] for c in agent_cols if row.get(c, "").strip() != ""])
-
-
-df["Comp"] = df.apply(build_comp, axis=1)
+roster = df.attrs.get("agent_roster", AGENT_ROSTER)
 
 # Map list
 map_col = "Map"
 result_col = "Result"
 
-maps = sorted(df[map_col].unique())
-
-selected_map = st.selectbox("Select Map", maps)
-
-df_map = df[df[map_col] == selected_map]
-
-# ---------------------------------------------------------
-# MAIN COMPOSITION STATS (EXPANDED)
-# ---------------------------------------------------------
-comp_stats = (
-    df_map.groupby("Comp")
-    .agg(
-        Games=("Comp", "count"),
-        Wins=(result_col, lambda x: (x == "Win").sum()),
-        Losses=(result_col, lambda x: (x == "Loss").sum()),
-        Ties=(result_col, lambda x: (x == "Tie").sum()),
-        ATK_W=("ATK W", "sum"),
-        ATK_L=("ATK L", "sum"),
-        DEF_W=("DEF W", "sum"),
-        DEF_L=("DEF L", "sum")
+# Per-map rows come from a bitmap store built once per data version
+comp_store = derived(
+    "comp_store", df.attrs.get("data_version"),
+    lambda: build_match_store(df, [map_col, result_col])
+)
+maps = comp_store["values"].get(map_col, [])
+
+# Agent pair counts and wins for every map, from one-hot matrix products
+agent_pairs = derived(
+    "agent_pairs", df.attrs.get("data_version"),
+    lambda: pair_stats(
+        df["Comp Mask"].to_numpy(), (df[result_col] == "Win").to_numpy(),
+        df[map_col].to_numpy(), roster
     )
-    .reset_index()
 )
 
-# Win rates
-comp_stats["Win Rate"] = (comp_stats["Wins"] / comp_stats["Games"]) * 100
-comp_stats["ATK WR"] = comp_stats["ATK_W"] / \
-    (comp_stats["ATK_W"] + comp_stats["ATK_L"] + 1e-9) * 100
-comp_stats["DEF WR"] = comp_stats["DEF_W"] / \
-    (comp_stats["DEF_W"] + comp_stats["DEF_L"] + 1e-9) * 100
+PAIR_METRICS = {"Pair Win Rate": "Win Rate", "Synergy": "Synergy", "Co-occurrence": "Games"}
 
-# Side bias
-comp_stats["Side Bias"] = comp_stats["ATK WR"] - comp_stats["DEF WR"]
+display_cols = [
+    "Comp", "Games", "Wins", "Losses", "Win Rate",
+    "ATK WR", "DEF WR", "Side Bias", "Round Diff",
+    "Strength Score"
+]
 
-# Round differential
-comp_stats["Round Diff"] = (comp_stats["ATK_W"] + comp_stats["DEF_W"]) - \
-    (comp_stats["ATK_L"] + comp_stats["DEF_L"])
+STATS_FORMAT = {
+    "Win Rate": "{:.1f}%",
+    "ATK WR": "{:.1f}%",
+    "DEF WR": "{:.1f}%",
+    "Side Bias": "{:.1f}",
+    "Strength Score": "{:.1f}"
+}
 
-# Strength score
-comp_stats["Strength Score"] = (
-    comp_stats["Win Rate"] * 0.7 +
-    ((comp_stats["Games"] / df_map.shape[0]) * 100) * 0.3
-)
 
 # ---------------------------------------------------------
-# VISUAL DISPLAY WITH ICONS (FINAL FIX)
+# PER-MAP SECTION (FRAGMENT: A MAP CHANGE RERUNS ONLY THIS)
 # ---------------------------------------------------------
-st.markdown(f"<h2 style='color:#d4af37;'>Top Compositions on {selected_map}</h2>", unsafe_allow_html=True)
+@st.fragment
+def map_section(df, roster, maps):
+    selected_map = st.selectbox("Select Map", maps)
 
-if comp_stats.empty:
-    st.warning("No compositions for this map.")
-else:
-    for _, row in comp_stats.sort_values("Win Rate", ascending=False).iterrows():
+    df_map = df.iloc[filter_rows(comp_store, {map_col: selected_map})]
 
-        icons_html = comp_to_icons(row["Comp"])
-        winrate = float(row["Win Rate"])
+    # MAIN COMPOSITION STATS (EXPANDED)
+    comp_stats, agent_freq = comp_view(df_map, roster, result_col)
 
-        html_lines = [
-            "<div style='display:flex; align-items:center; margin-bottom:18px;'>",
+    # VISUAL DISPLAY WITH ICONS
+    st.markdown(f"<h2 style='color:#d4af37;'>Top Compositions on {selected_map}</h2>", unsafe_allow_html=True)
 
-            # ICONS
-            f"<div style='width:260px;'>{icons_html}</div>",
+    if comp_stats.empty:
+        st.warning("No compositions for this map.")
+    else:
+        for _, row in comp_stats.sort_values("Win Rate", ascending=False).iterrows():
 
-            # BAR
-            "<div style='flex-grow:1; margin:0 12px;'>",
-            "<div style='background:#252525; height:14px; border-radius:7px;'>",
-            f"<div style='width:{winrate}%; background:#d4af37; height:14px; border-radius:7px;'></div>",
-            "</div>",
-            "</div>",
+            icons_html = comp_to_icons(row["Comp"])
+            winrate = float(row["Win Rate"])
 
-            # LABEL
-            f"<div style='color:white; width:75px; text-align:right;'>{winrate:.1f}%</div>",
+            html_lines = [
+                "<div style='display:flex; align-items:center; margin-bottom:18px;'>",
 
-            "</div>"
-        ]
+                # ICONS
+                f"<div style='width:260px;'>{icons_html}</div>",
 
-        html_block = "\n".join(html_lines)
-        st.markdown(html_block, unsafe_allow_html=True)
+                # BAR
+                "<div style='flex-grow:1; margin:0 12px;'>",
+                "<div style='background:#252525; height:14px; border-radius:7px;'>",
+                f"<div style='width:{winrate}%; background:#d4af37; height:14px; border-radius:7px;'></div>",
+                "</div>",
+                "</div>",
 
+                # LABEL
+                f"<div style='color:white; width:75px; text-align:right;'>{winrate:.1f}%</div>",
 
+                "</div>"
+            ]
 
+            html_block = "\n".join(html_lines)
+            st.markdown(html_block, unsafe_allow_html=True)
 
+    # PICK RATE PER MAP
+    st.markdown(
+        "<h3 style='color:#d4af37;'>Composition Pick Rate</h3>",
+        unsafe_allow_html=True
+    )
 
+    st.plotly_chart(pick_rate_bar(comp_stats), use_container_width=True)
 
-# ---------------------------------------------------------
-# PICK RATE PER MAP
-# ---------------------------------------------------------
-st.markdown(
-    "<h3 style='color:#d4af37;'>Composition Pick Rate</h3>",
-    unsafe_allow_html=True
-)
+    # AGENT FREQUENCY CHART
+    st.markdown(
+        "<h3 style='color:#d4af37;'>Agent Frequency on This Map</h3>",
+        unsafe_allow_html=True
+    )
 
-pick_rate = comp_stats.copy()
-pick_rate["Pick Rate %"] = (pick_rate["Games"] / df_map.shape[0]) * 100
+    st.plotly_chart(agent_frequency_bar(agent_freq), use_container_width=True)
 
-fig = px.bar(
-    pick_rate.sort_values("Pick Rate %", ascending=False),
-    x="Comp", y="Pick Rate %",
-    labels={'Comp': 'Composition'},
-    text_auto=".1f"
-)
-st.plotly_chart(fig, use_container_width=True)
+    # AGENT PAIRINGS (CO-OCCURRENCE / SYNERGY)
+    st.markdown(f"<h3 style='color:#d4af37;'>Agent Pairings on {selected_map}</h3>",
+                unsafe_allow_html=True)
 
-# ---------------------------------------------------------
-# AGENT FREQUENCY CHART
-# ---------------------------------------------------------
-st.markdown(
-    "<h3 style='color:#d4af37;'>Agent Frequency on This Map</h3>",
-    unsafe_allow_html=True
-)
+    p1, p2 = st.columns([3, 1])
+    with p1:
+        pair_metric = st.radio("Show", list(PAIR_METRICS), horizontal=True)
+    with p2:
+        min_games = st.number_input("Min games per pair", min_value=1, value=3)
+
+    pairs = pair_table(agent_pairs, selected_map, min_games)
+    if pairs.empty:
+        st.info("No agent pair has been played that often on this map.")
+    else:
+        st.caption("Synergy: the pair's win rate minus the average of the two agents' own win rates.")
+        st.plotly_chart(pair_heatmap(pairs, PAIR_METRICS[pair_metric]), use_container_width=True)
+        with st.expander("Pair table"):
+            st.dataframe(pairs.style.format({"Win Rate": "{:.1f}%", "Synergy": "{:+.1f}"}),
+                         use_container_width=True)
 
-agent_list = []
+    # FULL DATA TABLE
+    st.markdown("<h3 style='color:#d4af37;'>Full Composition Breakdown</h3>",
+                unsafe_allow_html=True)
 
-for comp in df_map["Comp"]:
-    for agent in comp.split("|"):
-        agent_list.append(agent.strip())
+    st.dataframe(comp_stats[display_cols].style.format(STATS_FORMAT), use_container_width=True)
 
-agent_freq = pd.Series(agent_list).value_counts().reset_index()
-agent_freq.columns = ["Agent", "Count"]
 
-fig2 = px.bar(agent_freq, x="Agent", y="Count", text_auto=True)
-st.plotly_chart(fig2, use_container_width=True)
+map_section(df, roster, maps)
+
 
 # ---------------------------------------------------------
-# FULL DATA TABLE
+# COMPOSITION QUERY (ALL MAPS; ITS OWN FRAGMENT)
 # ---------------------------------------------------------
-st.markdown("<h3 style='color:#d4af37;'>Full Composition Breakdown</h3>",
-            unsafe_allow_html=True)
+@st.fragment
+def query_section(df, roster, maps):
+    st.markdown("<h3 style='color:#d4af37;'>Composition Query</h3>",
+                unsafe_allow_html=True)
+
+    comp_index = derived(
+        "comp_index", df.attrs.get("data_version"),
+        lambda: build_comp_index(df, roster, map_col)
+    )
+    indexed_agents = [a for a in roster if a in comp_index["agents"]]
+
+    q1, q2, q3, q4 = st.columns(4)
+    with q1:
+        q_include = st.multiselect("Comps with", indexed_agents)
+    with q2:
+        q_exclude = st.multiselect("Without agents", indexed_agents)
+    with q3:
+        q_roles = st.multiselect("Without role", list(AGENT_ROLES.keys()))
+    with q4:
+        q_maps = st.multiselect("Maps (all if empty)", maps)
+
+    rows = query_comps(
+        comp_index,
+        include=q_include,
+        exclude=list(q_exclude) + role_agents(q_roles),
+        maps=q_maps
+    )
+    df_query = df.iloc[rows]
 
-display_cols = [
-    "Comp", "Games", "Wins", "Losses", "Win Rate",
-    "ATK WR", "DEF WR", "Side Bias", "Round Diff",
-    "Strength Score"
-]
+    if df_query.empty:
+        st.warning("No compositions match this query.")
+        return
+
+    q_wins = (df_query[result_col] == "Win").sum()
+    st.markdown(
+        f"<p style='color:white;'>{len(df_query)} games · {q_wins} wins · "
+        f"{q_wins / len(df_query) * 100:.1f}% win rate</p>",
+        unsafe_allow_html=True
+    )
+
+    query_stats = comp_stats_table(df_query, roster, result_col)
+    st.dataframe(
+        query_stats[display_cols].sort_values("Games", ascending=False).style.format(STATS_FORMAT),
+        use_container_width=True
+    )
 
-st.dataframe(comp_stats[display_cols].style.format({
-    "Win Rate": "{:.1f}%",
-    "ATK WR": "{:.1f}%",
-    "DEF WR": "{:.1f}%",
-    "Side Bias": "{:.1f}",
-    "Strength Score": "{:.1f}"
-}), use_container_width=True)
 
+query_section(df, roster, maps)
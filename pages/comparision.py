@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
+
+from benchmarks import ROLES, PRO_STATS_PATH, find, load_distribution
+from charts import benchmark_radar
+from data_loader import load_player_layout, load_player_block, load_player_stats
+from tenants import spreadsheet_selector
+from views import player_view, roster_view
 
 st.set_page_config(page_title="Player vs VCT Benchmark", layout="wide")
+spreadsheet_selector()
 LOGO = "heaven_sent_logo.png"
 
 
@@ -18,266 +22,100 @@ with col2:
 
 
 # ---------------------------------------------------------
-# LOAD PLAYER DATA FROM SESSION STATE
-# ---------------------------------------------------------
-if "player_stats_df" not in st.session_state:
-    st.error("⚠ Player data not loaded. Please open the Player Stats page first.")
-    st.stop()
-
-df = st.session_state["player_stats_df"].copy()
-
-
-# ---------------------------------------------------------
-# HELPER: FIND COLUMN BY NAMES
-# ---------------------------------------------------------
-def find(df, names):
-    for c in df.columns:
-        if c.lower() in [n.lower() for n in names]:
-            return c
-    for c in df.columns:
-        for n in names:
-            if n.lower() in c.lower():
-                return c
-    return None
-
-
-# ---------------------------------------------------------
-# DETECT SHEET COLUMNS
+# PLAYER LIST FROM THE SCRIM STATS LAYOUT
 # ---------------------------------------------------------
-player_col  = find(df, ["player", "name"])
-kills_col   = find(df, ["kills"])
-deaths_col  = find(df, ["deaths"])
-assists_col = find(df, ["assists"])
-acs_col     = find(df, ["acs"])
-fk_col      = find(df, ["fk", "first kill"])
-
-if player_col is None:
-    st.error("❌ Could not detect a 'Player' column.")
+try:
+    layout = load_player_layout()
+except Exception as e:
+    st.error(f"❌ Error reading Scrim Stats layout: {e}")
     st.stop()
 
-players = sorted(df[player_col].dropna().unique().tolist())
-
-
-# ---------------------------------------------------------
-# UI CONTROLS
-# ---------------------------------------------------------
-left, right = st.columns([2, 1])
-with left:
-    selected_player = st.selectbox("Select Player", players)
-
-with right:
-    selected_role = st.selectbox("Role", ["Duelist", "Controller", "Initiator", "Sentinel"])
+players = list(layout["blocks"].keys())
 
 
 # ---------------------------------------------------------
-# FILTER FOR SELECTED PLAYER
+# PRO STAT DISTRIBUTION (FALLS BACK TO VCT AVERAGES)
 # ---------------------------------------------------------
-df_p = df[df[player_col] == selected_player].copy()
+try:
+    dist = load_distribution()
+except Exception as e:
+    st.warning(f"Could not read pro stats ({PRO_STATS_PATH}): {e}")
+    dist = None
 
-if df_p.empty:
-    st.error("No stats found for this player.")
-    st.stop()
+if dist is None:
+    st.caption(f"Benchmarks are static VCT averages. Put pro stat lines in {PRO_STATS_PATH} "
+               "(or set HS_PRO_STATS) for percentiles.")
+else:
+    st.caption(f"Benchmarks are pro medians; percentiles against {PRO_STATS_PATH}.")
 
 
 # ---------------------------------------------------------
-# CALCULATE PLAYER METRICS (NEW SYSTEM)
+# COMPARISON (FRAGMENT: A PLAYER / ROLE CHANGE RERUNS ONLY THIS)
 # ---------------------------------------------------------
-def safe_sum(col):
-    return pd.to_numeric(df_p[col], errors="coerce").fillna(0).sum() if col else 0
-
-def safe_mean(col):
-    return pd.to_numeric(df_p[col], errors="coerce").dropna().mean() if col else np.nan
-
+@st.fragment
+def comparison_section(players):
+    left, right = st.columns([2, 1])
+    with left:
+        selected_player = st.selectbox("Select Player", players)
 
-# 1️⃣ Rounds = scrims × 24
-scrim_count = len(df_p)
-total_rounds = scrim_count * 24
+    with right:
+        selected_role = st.selectbox("Role", ROLES)
 
-# 2️⃣ Base values
-total_kills   = safe_sum(kills_col)
-total_assists = safe_sum(assists_col)
-total_fk      = safe_sum(fk_col)
+    df = load_player_block(selected_player)
 
-# 3️⃣ Metrics
-player_acs  = safe_mean(acs_col)
-player_kpr  = total_kills / total_rounds if total_rounds > 0 else np.nan
-player_fkpr = total_fk / total_rounds if total_rounds > 0 else np.nan
-player_kapr = (total_kills + total_assists) / total_rounds if total_rounds > 0 else np.nan
+    # DETECT SHEET COLUMNS
+    player_col  = find(df, ["player", "name"])
 
-PLAYER_METRICS = {
-    "ACS": player_acs,
-    "KPR": player_kpr,
-    "FK per Round": player_fkpr,
-    "K+A per Round": player_kapr
-}
+    if player_col is None:
+        st.error("❌ Could not detect a 'Player' column.")
+        return
 
+    # FILTER FOR SELECTED PLAYER
+    df_p = df[df[player_col] == selected_player]
 
-# ---------------------------------------------------------
-# STATIC VCT BENCHMARK SET
-# ---------------------------------------------------------
-VCT_BENCHMARKS = {
-    "controller": {
-        "ACS": 199,
-        "KPR": 0.70,
-        "FK per Round": 0.10,
-        "K+A per Round": 0.92
-    },
-    "duelist": {
-        "ACS": 232,
-        "KPR": 0.83,
-        "FK per Round": 0.18,
-        "K+A per Round": 1.05
-    },
-    "initiator": {
-        "ACS": 209,
-        "KPR": 0.74,
-        "FK per Round": 0.11,
-        "K+A per Round": 1.06
-    },
-    "sentinel": {
-        "ACS": 183,
-        "KPR": 0.63,
-        "FK per Round": 0.08,
-        "K+A per Round": 0.78
-    }
-}
+    if df_p.empty:
+        st.error("No stats found for this player.")
+        return
 
-bench = VCT_BENCHMARKS[selected_role.lower()]
+    # CALCULATE PLAYER METRICS (NEW SYSTEM)
+    PLAYER_METRICS, comp_df = player_view(df_p, selected_role, dist)
 
+    # NORMALIZE VALUES (THIS FIXES THE RADAR CHART)
+    metrics = comp_df["Metric"].tolist()
+    player_vals = comp_df["Player"].tolist()
+    bench_vals = comp_df["VCT Bench"].tolist()   # VCT benchmark becomes a perfect 1.0 shape
 
-# ---------------------------------------------------------
-# LOAD VCT BENCHMARKS
-# ---------------------------------------------------------
-@st.cache_data
-def load_benchmarks(role):
-    role = role.lower()
+    # RADAR CHART (Ominous 1:1 Style - FIXED)
+    fig = benchmark_radar(metrics, player_vals, bench_vals, selected_player, selected_role)
 
-    benchmarks = {
-        "controller": {
-            "ACS": 199,
-            "KPR": 0.70,
-            "FK per Round": 0.10,
-            "K+A per Round": 0.92
-        },
-        "duelist": {
-            "ACS": 232,
-            "KPR": 0.83,
-            "FK per Round": 0.18,
-            "K+A per Round": 1.05
-        },
-        "initiator": {
-            "ACS": 209,
-            "KPR": 0.74,
-            "FK per Round": 0.11,
-            "K+A per Round": 1.06
-        },
-        "sentinel": {
-            "ACS": 183,
-            "KPR": 0.63,
-            "FK per Round": 0.08,
-            "K+A per Round": 0.78
-        }
-    }
+    st.plotly_chart(fig, use_container_width=True)
 
-    return benchmarks.get(
-        role,
-        {"ACS": np.nan, "KPR": np.nan, "FK per Round": np.nan, "K+A per Round": np.nan}
+    # DATA TABLE + DOWNLOAD
+    st.subheader("Full Numeric Comparison")
+    st.dataframe(
+        comp_df.style.format({"Player": "{:.2f}", "VCT Bench": "{:.2f}", "Delta": "{:.2f}", "Percentile": "{:.0f}"}),
+        use_container_width=True
     )
 
-# ---------------------------------------------------------
-# NORMALIZE VALUES (THIS FIXES THE RADAR CHART)
-# ---------------------------------------------------------
-
-metrics = list(PLAYER_METRICS.keys())
-
-player_vals_raw = [PLAYER_METRICS[m] for m in metrics]
-bench_vals_raw = [bench[m] for m in metrics]
-
-# Avoid division errors
-def norm(p, b):
-    if b is None or b == 0 or b == np.nan:
-        return 0
-    return p / b
-
-player_vals = [norm(player_vals_raw[i], bench_vals_raw[i]) for i in range(len(metrics))]
-bench_vals = [1 for _ in metrics]   # VCT benchmark becomes a perfect 1.0 shape
-
-# ---------------------------------------------------------
-# RADAR CHART (Ominous 1:1 Style - FIXED)
-# ---------------------------------------------------------
-fig = go.Figure()
-
-# --- VCT Benchmark polygon ---
-fig.add_trace(go.Scatterpolar(
-    r=bench_vals,
-    theta=metrics,
-    name=f"VCT {selected_role} Avg",
-    line=dict(color="rgba(130,130,130,0.9)", width=3),
-    fill='toself',
-    fillcolor="rgba(100,100,100,0.35)"
-))
-
-# --- Player polygon ---
-fig.add_trace(go.Scatterpolar(
-    r=player_vals,
-    theta=metrics,
-    name=selected_player,
-    line=dict(color="rgba(212,175,55,1)", width=3),
-    fill='toself',
-    fillcolor="rgba(212,175,55,0.45)"
-))
-
-# --- Layout styling ---
-fig.update_layout(
-    polar=dict(
-        bgcolor="#0f1113",
-        radialaxis=dict(
-            visible=True,
-            range=[0, 1],
-            tickvals=[0, 0.25, 0.50, 0.75, 1.00],
-            tickfont=dict(size=12, color="rgba(255,255,255,0.5)"),
-            gridcolor="rgba(255,255,255,0.06)",
-            linecolor="rgba(255,255,255,0.08)"
-        ),
-        angularaxis=dict(
-            tickfont=dict(size=15, color="#d4af37"),
-            gridcolor="rgba(255,255,255,0.08)",
-            linecolor="rgba(255,255,255,0.08)"
-        )
-    ),
-    showlegend=True,
-    legend=dict(
-        font=dict(color="white", size=13),
-        bgcolor="rgba(0,0,0,0)"
-    ),
-    paper_bgcolor="#0f1113",
-    plot_bgcolor="#0f1113",
-    margin=dict(l=60, r=60, t=60, b=60)
-)
+    st.download_button(
+        "Download CSV",
+        comp_df.to_csv(index=False),
+        file_name=f"{selected_player}_benchmark.csv",
+        mime="text/csv"
+    )
 
-st.plotly_chart(fig, use_container_width=True)
 
+comparison_section(players)
 
 
 # ---------------------------------------------------------
-# DATA TABLE + DOWNLOAD
+# WHOLE ROSTER VS PRO DISTRIBUTION
 # ---------------------------------------------------------
-comp_df = pd.DataFrame({
-    "Metric": metrics,
-    "Player": player_vals,
-    "VCT Bench": bench_vals
-})
-comp_df["Delta"] = comp_df["Player"] - comp_df["VCT Bench"]
-
-st.subheader("Full Numeric Comparison")
-st.dataframe(
-    comp_df.style.format({"Player": "{:.2f}", "VCT Bench": "{:.2f}", "Delta": "{:.2f}"}),
-    use_container_width=True
-)
-
-st.download_button(
-    "Download CSV",
-    comp_df.to_csv(index=False),
-    file_name=f"{selected_player}_benchmark.csv",
-    mime="text/csv"
-)
+if dist is not None:
+    st.subheader("Roster Percentiles (by main role)")
+    roster = roster_view(load_player_stats(), dist)
+    st.dataframe(
+        roster.style.format({c: "{:.0f}" for c in roster.columns if c.endswith(" pct")}
+                            | {"ACS": "{:.0f}", "KPR": "{:.2f}", "FK per Round": "{:.2f}", "K+A per Round": "{:.2f}"}),
+        use_container_width=True
+    )
@@ -0,0 +1,67 @@
+import streamlit as st
+
+from exports import EXPORT_TABLES, EXPORT_FORMATS, apply_filters, export_bytes
+from tenants import spreadsheet_selector
+
+
+# -----------------------------------------------------------
+# PAGE CONFIG
+# -----------------------------------------------------------
+st.set_page_config(page_title="Export — Heaven Sent", layout="wide")
+spreadsheet_selector()
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown("<h1 style='color:#d4af37;'>Export Cleaned Data</h1>", unsafe_allow_html=True)
+
+
+# -----------------------------------------------------------
+# TABLE + FORMAT
+# -----------------------------------------------------------
+left, right = st.columns([2, 1])
+with left:
+    table_name = st.selectbox("Table", list(EXPORT_TABLES.keys()))
+with right:
+    fmt = st.selectbox("Format", list(EXPORT_FORMATS.keys()))
+
+try:
+    df = EXPORT_TABLES[table_name]()
+except Exception as e:
+    st.error(f"❌ Error loading {table_name}: {e}")
+    st.stop()
+
+
+# -----------------------------------------------------------
+# OPTIONAL FILTERS
+# -----------------------------------------------------------
+filters = {}
+start = end = None
+
+filter_cols = [c for c in ["Map", "Opponent", "Result", "Type of Match", "Player", "Agent"] if c in df.columns]
+if filter_cols:
+    cols = st.columns(len(filter_cols))
+    for c, col in zip(filter_cols, cols):
+        with col:
+            filters[c] = st.multiselect(c, sorted(df[c].dropna().unique().tolist()))
+
+if "DATE" in df.columns and df["DATE"].notna().any():
+    d1, d2 = st.columns(2)
+    with d1:
+        start = st.date_input("From", df["DATE"].min())
+    with d2:
+        end = st.date_input("To", df["DATE"].max())
+
+out = apply_filters(df, filters, start=start, end=end)
+
+st.caption(f"{len(out)} of {len(df)} rows selected")
+st.dataframe(out.head(50), use_container_width=True)
+
+ext, mime = EXPORT_FORMATS[fmt]
+st.download_button(
+    f"Download {fmt.title()}",
+    export_bytes(out, fmt),
+    file_name=f"{table_name}.{ext}",
+    mime=mime
+)
@@ -0,0 +1,90 @@
+import streamlit as st
+
+from charts import line_chart
+from data_loader import load_clean_data, load_player_stats
+from cache import derived
+from tenants import spreadsheet_selector
+from trends import (
+    build_map_trends, rolling_map_form,
+    build_player_trends, rolling_player_form
+)
+
+st.set_page_config(page_title="Form Trends", layout="wide")
+spreadsheet_selector()
+LOGO = "heaven_sent_logo.png"
+GOLD = "#d4af37"
+BG = "#0d0f12"
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image(LOGO, width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>Form Trends</h1>", unsafe_allow_html=True)
+
+
+def style(fig):
+    fig.update_layout(
+        plot_bgcolor=BG,
+        paper_bgcolor=BG,
+        font=dict(color="white", size=14),
+    )
+    return fig
+
+
+window = st.slider("Rolling window (last N scrims)", 1, 30, 10)
+
+
+# ---------------------------------------------------------
+# MAP FORM
+# ---------------------------------------------------------
+try:
+    matches = load_clean_data()
+except Exception as e:
+    st.error(f"❌ Error loading Match History sheet: {e}")
+    st.stop()
+
+# Prefix-sum tables are built once per data version
+map_table = derived("map_trends", matches.attrs.get("data_version"), lambda: build_map_trends(matches))
+
+st.markdown(f"<h3 style='color:{GOLD};'>Map Win Rate — last {window}</h3>", unsafe_allow_html=True)
+selected_maps = st.multiselect("Maps", sorted(map_table.keys()), default=sorted(map_table.keys()))
+map_form = rolling_map_form(map_table, window, selected_maps)
+
+if not selected_maps:
+    st.info("Select at least one map.")
+elif map_form.empty:
+    st.warning("No dated matches for these maps.")
+else:
+    st.plotly_chart(style(line_chart(map_form, "DATE", "Win Rate", "Map", markers=True)),
+                    use_container_width=True)
+
+    st.markdown(f"<h3 style='color:{GOLD};'>ATK / DEF Round Share — last {window}</h3>", unsafe_allow_html=True)
+    side_map = st.selectbox("Map", selected_maps)
+    side = map_form[map_form["Map"] == side_map].melt(
+        id_vars="DATE", value_vars=["ATK Round %", "DEF Round %"], var_name="Side", value_name="Round %"
+    )
+    st.plotly_chart(style(line_chart(side, "DATE", "Round %", "Side", markers=True)),
+                    use_container_width=True)
+
+
+# ---------------------------------------------------------
+# PLAYER FORM
+# ---------------------------------------------------------
+try:
+    players_df = load_player_stats()
+except Exception as e:
+    st.error(f"❌ Error loading Scrim Stats sheet: {e}")
+    st.stop()
+
+if players_df.empty:
+    st.stop()
+
+player_table = derived("player_trends", players_df.attrs.get("data_version"),
+                       lambda: build_player_trends(players_df))
+
+st.markdown(f"<h3 style='color:{GOLD};'>Player Form — last {window}</h3>", unsafe_allow_html=True)
+metric = st.radio("Metric", ["ACS", "KPR"], horizontal=True)
+player_form = rolling_player_form(player_table, window)
+
+st.plotly_chart(style(line_chart(player_form, "Scrim", metric, "Player")),
+                use_container_width=True)
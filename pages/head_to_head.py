@@ -0,0 +1,118 @@
+import streamlit as st
+import plotly.express as px
+
+from cache import derived
+from data_loader import load_clean_data
+from opponents import build_opponent_index, opponents, head_to_head
+from tenants import spreadsheet_selector
+
+st.set_page_config(page_title="Head-to-Head", layout="wide")
+spreadsheet_selector()
+
+BG = "#0d0f12"
+CARD = "#16181d"
+GOLD = "#d4af37"
+RED = "#ff4d4d"
+ORANGE = "#ff9933"
+YELLOW = "#f7d774"
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>Head-to-Head</h1>", unsafe_allow_html=True)
+
+
+# =========================
+# LOAD + OPPONENT INDEX (ONCE PER DATA VERSION)
+# =========================
+try:
+    df = load_clean_data()
+except Exception as e:
+    st.error(f"❌ Error loading Match History sheet: {e}")
+    st.stop()
+
+if df.empty:
+    st.warning("No matches logged yet.")
+    st.stop()
+
+index = derived("opponent_index", df.attrs.get("data_version"), lambda: build_opponent_index(df))
+
+selected = st.selectbox("Opponent", opponents(index))
+summary, by_map, rows = head_to_head(index, selected)
+
+
+# =========================
+# RECORD CARDS
+# =========================
+def card(col, title, value):
+    col.markdown(
+        f"""
+        <div style='background:{CARD}; padding:18px; border-radius:12px;'>
+            <p style='color:{GOLD}; margin:0; font-size:16px; font-weight:600;'>{title}</p>
+            <p style='color:white; margin:0; font-size:30px; font-weight:800;'>{value}</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def pct(v):
+    return "—" if v != v else f"{v:.1f}%"
+
+
+st.markdown(f"<h3 style='color:{GOLD}; margin-top:20px;'>⚔️ vs {selected}</h3>", unsafe_allow_html=True)
+
+top1, top2, top3, top4 = st.columns(4)
+card(top1, "Record (W-L-T)", f"{summary['Wins']:.0f}-{summary['Losses']:.0f}-{summary['Ties']:.0f}")
+card(top2, "Win %", pct(summary["Win Rate"]))
+card(top3, "Round Diff", f"{summary['Round Diff']:+.0f}")
+card(top4, "Games", f"{summary['Games']:.0f}")
+
+bot1, bot2 = st.columns(2)
+card(bot1, "Atk Round Win %", pct(summary["ATK WR"]))
+card(bot2, "Def Round Win %", pct(summary["DEF WR"]))
+
+
+# =========================
+# MAPS AGAINST THIS OPPONENT
+# =========================
+st.markdown(f"<h3 style='color:{GOLD}; margin-top:35px;'>🗺️ Maps Played</h3>", unsafe_allow_html=True)
+
+if not by_map.empty:
+    chart_df = by_map.reset_index().sort_values("Games", ascending=True)
+    fig = px.bar(
+        chart_df,
+        x="Games",
+        y="Map",
+        orientation="h",
+        text="Win Rate",
+        color="Win Rate",
+        color_continuous_scale=[RED, ORANGE, YELLOW, GOLD],
+        range_color=[0, 100],
+    )
+    fig.update_layout(
+        plot_bgcolor=BG,
+        paper_bgcolor=BG,
+        font=dict(color="white", size=14),
+        coloraxis_showscale=False,
+    )
+    fig.update_traces(texttemplate="%{text:.0f}% WR", textposition="outside")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(by_map[[
+        "Games", "Pick Share", "Wins", "Losses", "Ties", "Win Rate", "ATK WR", "DEF WR", "Round Diff"
+    ]].style.format({
+        "Pick Share": "{:.1f}%",
+        "Win Rate": "{:.1f}%",
+        "ATK WR": "{:.1f}%",
+        "DEF WR": "{:.1f}%",
+        "Round Diff": "{:+.0f}"
+    }), use_container_width=True)
+
+
+# =========================
+# MATCH LOG
+# =========================
+st.markdown(f"<h3 style='color:{GOLD};'>📘 Matches vs {selected}</h3>", unsafe_allow_html=True)
+st.dataframe(df.iloc[rows], use_container_width=True)
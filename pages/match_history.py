@@ -1,7 +1,11 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+
+from cache import derived
+from data_loader import load_clean_data
+from match_store import build_match_store, filter_bitmap, bitmap_rows, bitmap_count, bitmap_mask, count_by
+from search import SEARCH_FIELDS, refresh_search_index, search_frame
+from tenants import spreadsheet_selector
+from widgets import search_box
 
 
 # -----------------------------------------------------------
@@ -11,93 +15,7 @@ st.set_page_config(
     page_title="Match History — Heaven Sent",
     layout="wide"
 )
-
-SPREADSHEET_NAME = "HS SPREADSHEET NEW ROSTER"
-WORKSHEET_NAME = "All Match History"
-
-# -----------------------------------------------------------
-# LOAD DATA FROM GOOGLE SHEETS
-# -----------------------------------------------------------
-@st.cache_data
-def load_match_history():
-    try:
-        service_info = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(service_info, scope)
-        client = gspread.authorize(creds)
-
-        sheet = client.open(SPREADSHEET_NAME).worksheet(WORKSHEET_NAME)
-        raw = sheet.get_all_values()
-
-        HEADER_ROW = 2  # Your sheet's header row
-        headers = raw[HEADER_ROW]
-        rows = raw[HEADER_ROW + 1:]
-
-        df = pd.DataFrame(rows, columns=headers)
-
-        # Remove useless/duplicate columns
-        df = df.loc[:, df.columns.notna()]
-        df = df.loc[:, df.columns != ""]
-        df = df.loc[:, ~df.columns.duplicated()]
-
-        # Drop empty Opponent rows
-        if "Opponent" in df.columns:
-            df = df[df["Opponent"].notna() & (df["Opponent"] != "")]
-
-        return df
-
-    except Exception as e:
-        st.error(f"❌ Error loading Match History sheet: {e}")
-        return None
-
-# -----------------------------------------------------------
-# CLEAN + FORMAT DATAFRAME
-# -----------------------------------------------------------
-def clean_history(df):
-    df = df.copy()
-
-    # Trim whitespace
-    df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-
-    # Roster column auto-detection
-    roster_cols = [
-        col
-        for col in df.columns
-        if "oster" in col.lower() or "pink" in col.lower() or "cyan" in col.lower()
-    ]
-
-    if roster_cols:
-        df["Rosters"] = df[roster_cols].apply(
-            lambda x: " | ".join([v for v in x if v.strip() != ""]),
-            axis=1
-        )
-        df = df.drop(columns=roster_cols)
-
-    # Automated renaming corrections
-    rename_map = {
-        "TIME(SGT)": "TIME (SGT)",
-        "Pistols (ATK)": "Pistols (ATK)",
-        "Pistols (DEF)": "Pistols (DEF)",
-        "Game Level": "Game Level",
-        "Scrim Quality": "Scrim Quality",
-        "VOD Link": "VOD Link",
-    }
-    df = df.rename(columns=rename_map)
-
-    # Ordered table
-    desired_order = [
-        "Opponent", "DATE", "TIME (SGT)", "Played", "Differential",
-        "Won", "Lost",
-        "ATK W", "ATK L", "DEF W", "DEF L",
-        "Type of Match", "Map", "Result",
-        "Game Level", "Scrim Quality",
-        "VOD Link", "Notes", "Rosters",
-        "Pistols (ATK)", "Pistols (DEF)",
-        "Comp"
-    ]
-
-    df = df.reindex(columns=[c for c in desired_order if c in df.columns])
-
-    return df.reset_index(drop=True)
+spreadsheet_selector()
 
 # -----------------------------------------------------------
 # PAGE UI
@@ -108,19 +26,58 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-raw_df = load_match_history()
-if raw_df is None:
-    st.stop()
-
 try:
-    df = clean_history(raw_df)
+    df = load_clean_data()
     st.success("Match History Loaded Successfully!")
 except Exception as e:
-    st.error(f"❌ Error processing match history: {e}")
+    st.error(f"❌ Error loading Match History sheet: {e}")
     st.stop()
 
 # -----------------------------------------------------------
-# DISPLAY TABLE
+# FILTERS (BITMAP STORE) + SEARCH (INVERTED INDEX); BOTH ARE
+# BUILT ONCE PER DATA VERSION AND A CHANGE RERUNS ONLY THIS SECTION
 # -----------------------------------------------------------
-st.subheader("📘 Cleaned Match History")
-st.dataframe(df, use_container_width=True)
+store = derived("match_store", df.attrs.get("data_version"), lambda: build_match_store(df))
+index, reindexed = refresh_search_index(df)
+
+
+@st.fragment
+def history_section(df):
+    filter_cols = list(store["values"])
+    filters = {}
+    for col, widget_col in zip(filter_cols, st.columns(max(len(filter_cols), 1))):
+        with widget_col:
+            filters[col] = st.multiselect(col, store["values"][col])
+
+    # Results follow the typing: each pause reruns just this fragment
+    query = search_box(
+        "🔎 Search " + " / ".join(SEARCH_FIELDS),
+        key="history_search",
+        placeholder="e.g. retake lotus, viper, team name"
+    )
+
+    words = filter_bitmap(store, filters)
+
+    if query.strip():
+        results = search_frame(index, df, query, limit=200, allowed=bitmap_mask(store, words))
+        if results.empty:
+            st.warning("No matches.")
+            return
+        st.caption(f"{len(results)} best matches")
+        st.dataframe(results, use_container_width=True, column_config={
+            "Score": st.column_config.NumberColumn(format="%.2f")
+        })
+        return
+
+    games = bitmap_count(words)
+    results = count_by(store, words, "Result") if "Result" in store["bitmaps"] else {}
+    st.caption(
+        f"{games} matches · {results.get('Win', 0)}W - {results.get('Loss', 0)}L - {results.get('Tie', 0)}T"
+    )
+
+    st.subheader("📘 Cleaned Match History")
+    st.dataframe(df if games == store["n"] else df.iloc[bitmap_rows(store, words)],
+                 use_container_width=True)
+
+
+history_section(df)
@@ -1,11 +1,13 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import plotly.express as px
 import os
 
+from charts import map_win_rate_bar
+from data_loader import load_map_wl_rate
+from tenants import spreadsheet_selector
+from views import map_cards
+
 st.set_page_config(page_title="Overview — Map Performance", layout="wide")
+spreadsheet_selector()
 
 # =========================
 # THEME COLORS
@@ -52,78 +54,12 @@ with col_r:
     )
 
 # =========================
-# LOAD GOOGLE SHEET — AUTO HEADER DETECTION
+# LOAD MAP W/L RATE (HEADER ROW + USED COLUMNS ONLY)
 # =========================
-def load_map_wl_rate():
-    try:
-        service_info = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(service_info, scope)
-        client = gspread.authorize(creds)
-
-        sheet = client.open("HS SPREADSHEET NEW ROSTER").worksheet("Map W/L Rate")
-        raw = sheet.get_all_values()
-
-        # -------- auto-detect header row (first row containing "Maps") --------
-        header_row_index = None
-        for i, row in enumerate(raw):
-            if any(str(cell).strip().lower() == "maps" for cell in row):
-                header_row_index = i
-                break
-
-        if header_row_index is None:
-            raise Exception("Could not find a 'Maps' header in any row.")
-
-        headers = raw[header_row_index]
-        data = raw[header_row_index + 1 :]
-
-        df = pd.DataFrame(data, columns=headers)
-
-        # --- UNIVERSAL-SAFE COLUMN DEDUPE ---
-        def dedupe_columns(cols):
-            seen = {}
-            new_cols = []
-            for c in cols:
-                if c not in seen:
-                    seen[c] = 0
-                    new_cols.append(c)
-                else:
-                    seen[c] += 1
-                    new_cols.append(f"{c}.{seen[c]}")
-            return new_cols
-
-        df.columns = dedupe_columns(df.columns)
-
-        # drop empty columns
-        df = df.loc[:, df.columns.notnull()]
-        df = df.loc[:, df.columns != ""]
-
-        # locate actual 'Maps' column (even if renamed 'Maps.1')
-        maps_col = None
-        for c in df.columns:
-            if c.strip().lower() == "maps":
-                maps_col = c
-                break
-
-        if maps_col is None:
-            raise Exception("No usable Maps column found, even after dedupe.")
-
-        df = df[df[maps_col].notna() & (df[maps_col] != "")]
-
-        # convert numeric columns
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="ignore")
-
-        return df
-
-    except Exception as e:
-        st.error(f"❌ Error loading Map W/L Rate sheet: {e}")
-        return None
-
-
-
-
-df = load_map_wl_rate()
-if df is None:
+try:
+    df = load_map_wl_rate()
+except Exception as e:
+    st.error(f"❌ Error loading Map W/L Rate sheet: {e}")
     st.stop()
 
 st.success("✅ Map W/L Rate loaded successfully!")
@@ -140,17 +76,7 @@ st.dataframe(df, use_container_width=True, height=350)
 st.markdown("---")
 
 map_options = df["Maps"].unique()
-selected_map = st.selectbox("Select Map:", map_options)
 
-row = df[df["Maps"] == selected_map].iloc[0]
-
-# =========================
-# STAT CARDS
-# =========================
-st.markdown(
-    f"<h3 style='color:{GOLD}; margin-top:20px;'>📍 Performance for {selected_map}</h3>",
-    unsafe_allow_html=True,
-)
 
 def card(col, title, value):
     col.markdown(
@@ -163,15 +89,31 @@ def card(col, title, value):
         unsafe_allow_html=True,
     )
 
-top1, top2, top3, top4 = st.columns(4)
-card(top1, "Total Games Played", int(row["Total Games Played"]))
-card(top2, "Map Win %", f"{row['Map Win%']:.2f}%")
-card(top3, "Atk Win %", f"{row['Atk Win%']:.2f}%")
-card(top4, "Def Win %", f"{row['Def Win%']:.2f}%")
 
-bot1, bot2 = st.columns(2)
-card(bot1, "Pistol Win % (ATK)", f"{row['Pistol Win% (ATK)']:.2f}%")
-card(bot2, "Pistol Win % (DEF)", f"{row['Pistol Win% (DEF)']:.2f}%")
+# =========================
+# STAT CARDS (FRAGMENT: A MAP CHANGE RERUNS ONLY THE CARDS)
+# =========================
+@st.fragment
+def map_performance(df, map_options):
+    selected_map = st.selectbox("Select Map:", map_options)
+
+    row = df[df["Maps"] == selected_map].iloc[0]
+
+    st.markdown(
+        f"<h3 style='color:{GOLD}; margin-top:20px;'>📍 Performance for {selected_map}</h3>",
+        unsafe_allow_html=True,
+    )
+
+    cards = map_cards(row)
+
+    for col, (title, value) in zip(st.columns(4), cards[:4]):
+        card(col, title, value)
+
+    for col, (title, value) in zip(st.columns(2), cards[4:]):
+        card(col, title, value)
+
+
+map_performance(df, map_options)
 
 # =========================
 # MAP WIN RATE BAR GRAPH
@@ -181,25 +123,6 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-chart_df = df[["Maps", "Map Win%"]].sort_values("Map Win%", ascending=True)
-
-fig = px.bar(
-    chart_df,
-    x="Map Win%",
-    y="Maps",
-    orientation="h",
-    text="Map Win%",
-    color="Map Win%",
-    color_continuous_scale=[RED, ORANGE, YELLOW, GOLD],
-)
-
-fig.update_layout(
-    plot_bgcolor=BG,
-    paper_bgcolor=BG,
-    font=dict(color="white", size=14),
-    coloraxis_showscale=False,
-)
-
-fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+fig = map_win_rate_bar(df)
 
 st.plotly_chart(fig, use_container_width=True)
@@ -1,12 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import altair as alt
 
+from charts import top_k
+from data_loader import load_player_layout, load_player_block
+from tenants import spreadsheet_selector
+
 
 st.set_page_config(page_title="Player Agent Stats", layout="wide")
+spreadsheet_selector()
 LOGO = "heaven_sent_logo.png"
 
 col1, col2 = st.columns([1, 8])
@@ -17,120 +18,45 @@ with col2:
 
 
 # ---------------------------------------------------------
-# GOOGLE SHEETS LOADER
+# PLAYER LAYOUT (DISCOVERED FROM THE HEADER ROW)
 # ---------------------------------------------------------
-@st.cache_data
-def load_sheet():
-    service_info = st.secrets["gcp_service_account"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(service_info, scope)
-    client = gspread.authorize(creds)
-
-    sheet = client.open("HS SPREADSHEET NEW ROSTER").worksheet("Scrim Stats")
-    return sheet.get_all_values()
-
-raw = load_sheet()
-df = pd.DataFrame(raw)
-
-
-# ---------------------------------------------------------
-# FIXED PLAYER COLUMN MAPPING
-# ---------------------------------------------------------
-PLAYER_BLOCKS = {
-    "Rus":      (14, 21),
-    "Solo":     (22, 29),
-    "Jayloh":   (30, 37),
-    "Slash":    (38, 45),
-    "Jfz":      (46, 53),
-    "Synzera":  (54, 61),
-}
-
-players = list(PLAYER_BLOCKS.keys())
-selected = st.selectbox("Select Player", players)
+try:
+    layout = load_player_layout()
+except Exception as e:
+    st.error(f"❌ Error reading Scrim Stats layout: {e}")
+    st.stop()
 
-HEADER_ROW = 5
-DATA_START_ROW = 6
+players = list(layout["blocks"].keys())
 
 
 # ---------------------------------------------------------
-# BLOCK EXTRACTOR
+# UI FOR SELECTED PLAYER (FRAGMENT: A PLAYER CHANGE RERUNS ONLY THIS;
+# ONLY THIS PLAYER'S COLUMNS ARE FETCHED)
 # ---------------------------------------------------------
-def extract_player_block(player):
-    start_col, end_col = PLAYER_BLOCKS[player]
-    end_col += 1
+@st.fragment
+def player_section(players):
+    selected = st.selectbox("Select Player", players)
 
-    headers = df.iloc[HEADER_ROW, start_col:end_col].tolist()
-    headers = [h if h != "" else f"Col{i}" for i, h in enumerate(headers)]
+    player_df = load_player_block(selected)
 
-    EXPECTED_HEADERS = ["KDA","Kills","Deaths","Assists","ACS","FK","FD","Agent"]
-    if len(headers) == 8:
-        headers = EXPECTED_HEADERS
+    if player_df.empty:
+        st.error(f"❌ No scrim data found for {selected}!")
+        return
 
-    data = []
-    r = DATA_START_ROW
+    st.subheader(f"{selected} Scrim Stats")
+    st.dataframe(player_df, use_container_width=True)
 
-    while r < len(df):
-        row = df.iloc[r, start_col:end_col].tolist()
-
-        if all(str(x).strip() == "" for x in row):
+    # AGENT USAGE CHART
+    agent_col = None
+    for col in player_df.columns:
+        if col.lower().strip() in ["agent", "agent played"]:
+            agent_col = col
             break
 
-        if all(str(x).strip() in ["", "N/A"] for x in row):
-            r += 1
-            continue
-
-        data.append(row)
-        r += 1
-
-    if not data:
-        return None
-
-    player_df = pd.DataFrame(data, columns=headers)
-    player_df["Player"] = player  # ⭐ IMPORTANT: add player name column
-    player_df.replace(["", "N/A"], np.nan, inplace=True)
-
-    return player_df
-
-
-# ---------------------------------------------------------
-# BUILD FULL PLAYER DATAFRAME (for benchmark page)
-# ---------------------------------------------------------
-full_blocks = []
-
-for p in players:
-    temp = extract_player_block(p)
-    if temp is not None:
-        full_blocks.append(temp)
-
-if len(full_blocks) == 0:
-    st.error("❌ No player data found!")
-    st.stop()
-
-full_df = pd.concat(full_blocks, ignore_index=True)
+    if not agent_col:
+        st.warning("No 'Agent' column detected for this player.")
+        return
 
-# ⭐ SAVE INTO SESSION STATE FOR BENCHMARK PAGE
-st.session_state["player_stats_df"] = full_df
-
-
-
-# ---------------------------------------------------------
-# UI FOR SELECTED PLAYER
-# ---------------------------------------------------------
-player_df = full_df[full_df["Player"] == selected]
-
-st.subheader(f"{selected} Scrim Stats")
-st.dataframe(player_df, use_container_width=True)
-
-
-# ---------------------------------------------------------
-# AGENT USAGE CHART
-# ---------------------------------------------------------
-agent_col = None
-for col in player_df.columns:
-    if col.lower().strip() in ["agent", "agent played"]:
-        agent_col = col
-        break
-
-if agent_col:
     st.subheader(f"{selected} – Agent Usage")
 
     agent_counts = (
@@ -140,6 +66,7 @@ if agent_col:
         .reset_index()
     )
     agent_counts.columns = ["Agent", "Count"]
+    agent_counts = top_k(agent_counts, "Agent", "Count")
 
     chart = (
         alt.Chart(agent_counts)
@@ -154,5 +81,5 @@ if agent_col:
 
     st.altair_chart(chart, use_container_width=False)
 
-else:
-    st.warning("No 'Agent' column detected for this player.")
+
+player_section(players)
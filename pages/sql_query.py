@@ -0,0 +1,82 @@
+import streamlit as st
+
+from sql_engine import (
+    refresh_engine, table_schema, count_rows, query_page, export_csv,
+    load_saved_queries, save_query
+)
+from tenants import spreadsheet_selector
+
+st.set_page_config(page_title="SQL Query", layout="wide")
+spreadsheet_selector()
+
+GOLD = "#d4af37"
+PAGE_SIZE = 100
+
+col1, col2 = st.columns([1, 8])
+with col1:
+    st.image("heaven_sent_logo.png", width=75)
+with col2:
+    st.markdown(f"<h1 style='color:{GOLD};'>SQL Query</h1>", unsafe_allow_html=True)
+
+
+# ---------------------------------------------------------
+# ENGINE (RELOADS ONLY TABLES WHOSE DATA CHANGED)
+# ---------------------------------------------------------
+try:
+    engine, reloaded = refresh_engine()
+except Exception as e:
+    st.error(f"❌ Error loading tables: {e}")
+    st.stop()
+
+if reloaded:
+    st.caption(f"Loaded: {', '.join(reloaded)}")
+
+with st.expander("Tables and columns"):
+    st.dataframe(table_schema(engine), use_container_width=True, height=300)
+    st.caption('Quote column names with spaces: "ATK W". Dates are text, e.g. DATE >= date(\'now\', \'-30 day\').')
+
+
+# ---------------------------------------------------------
+# SAVED QUERIES + EDITOR
+# ---------------------------------------------------------
+saved = load_saved_queries()
+choice = st.selectbox("Saved queries", ["(new query)"] + list(saved.keys()))
+
+sql = st.text_area(
+    "SQL",
+    value="" if choice == "(new query)" else saved[choice],
+    height=180,
+    key=f"sql_{choice}"
+)
+
+s1, s2 = st.columns([3, 1])
+with s1:
+    save_name = st.text_input("Save as", placeholder="Name this query")
+with s2:
+    st.write("")
+    if st.button("Save query", disabled=not (save_name and sql.strip())):
+        save_query(save_name, sql)
+        st.success(f"Saved '{save_name}'")
+
+if not sql.strip():
+    st.stop()
+
+
+# ---------------------------------------------------------
+# RESULTS (ONE PAGE AT A TIME)
+# ---------------------------------------------------------
+try:
+    total = count_rows(engine, sql)
+except Exception as e:
+    st.error(f"❌ {e}")
+    st.stop()
+
+pages = max((total - 1) // PAGE_SIZE + 1, 1)
+page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+
+result = query_page(engine, sql, page, PAGE_SIZE)
+st.caption(f"{total} rows · showing {page * PAGE_SIZE + 1}–{page * PAGE_SIZE + len(result)}")
+st.dataframe(result, use_container_width=True)
+
+
+st.download_button("Download all rows (CSV)", lambda: export_csv(engine, sql), file_name="query.csv", mime="text/csv")
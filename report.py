@@ -0,0 +1,253 @@
+"""Headless batch report generator.
+
+Fetches the sheets once, then renders a report for every map and every
+player to static HTML / PNG / JSON in a process pool, using the same
+computations as the Streamlit pages (views.py, charts.py).
+
+    python report.py --out reports --formats html,json --workers 4
+    HS_LOCAL_DATA=exports python report.py --maps Lotus Split
+
+PNG output needs the optional `kaleido` package.
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from charts import map_win_rate_bar, pick_rate_bar, agent_frequency_bar, benchmark_radar
+from views import map_cards, comp_view, infer_role, player_view
+
+FORMATS = ["html", "png", "json"]
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<style>
+body {{ background:#0d0f12; color:white; font-family:sans-serif; margin:30px; }}
+h1, h2 {{ color:#d4af37; }}
+.cards {{ display:flex; gap:12px; flex-wrap:wrap; }}
+.card {{ background:#16181d; padding:18px; border-radius:12px; min-width:180px; }}
+.card p {{ margin:0; }} .card .t {{ color:#d4af37; font-weight:600; }} .card .v {{ font-size:28px; font-weight:800; }}
+table {{ border-collapse:collapse; }} td, th {{ padding:4px 10px; border-bottom:1px solid #333; }}
+</style></head><body>
+<h1>{title}</h1>
+{body}
+</body></html>
+"""
+
+
+def slug(name):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(name)).strip("_") or "unnamed"
+
+
+def to_json(value):
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else float(value)
+    return str(value)
+
+
+# ---------------------------------------------------------
+# ONE FETCH FOR THE WHOLE BATCH
+# ---------------------------------------------------------
+def fetch_batch_data(spreadsheet):
+    # Imported here so pool workers never import the Streamlit data layer
+    from data_loader import load_comp_data, load_map_wl_rate, load_player_stats
+
+    comps = load_comp_data(spreadsheet=spreadsheet)
+    try:
+        map_wl = load_map_wl_rate(spreadsheet=spreadsheet)
+    except Exception as e:
+        print(f"Map W/L Rate unavailable, skipping overview cards: {e}", file=sys.stderr)
+        map_wl = None
+    players = load_player_stats(spreadsheet=spreadsheet)
+
+    return comps, map_wl, players
+
+
+def build_jobs(comps, map_wl, players, maps=None, player_names=None, roles=None, dist=None):
+    """(kind, name, payload) per report; payloads carry only their own slice."""
+    roster = comps.attrs.get("agent_roster")
+    jobs = []
+
+    all_maps = set(comps["Map"].dropna().unique())
+    if map_wl is not None:
+        all_maps |= set(map_wl["Maps"].dropna().unique())
+    for m in sorted(all_maps):
+        if maps and m not in maps:
+            continue
+        wl_row = None
+        if map_wl is not None and (map_wl["Maps"] == m).any():
+            wl_row = map_wl[map_wl["Maps"] == m].iloc[0]
+        jobs.append(("map", m, {
+            "df_map": comps[comps["Map"] == m],
+            "roster": roster,
+            "wl_row": wl_row,
+            "map_wl": map_wl,
+        }))
+
+    for p in players["Player"].unique():
+        if player_names and p not in player_names:
+            continue
+        df_p = players[players["Player"] == p]
+        role = (roles or {}).get(p) or infer_role(df_p) or "Duelist"
+        jobs.append(("player", p, {"df_p": df_p, "role": role, "dist": dist}))
+
+    return jobs
+
+
+# ---------------------------------------------------------
+# RENDERING (RUNS IN POOL WORKERS)
+# ---------------------------------------------------------
+def render_map(name, payload):
+    df_map = payload["df_map"]
+    summary = {"map": name, "games": int(len(df_map))}
+    blocks, figures = [], {}
+
+    if payload["wl_row"] is not None:
+        cards = map_cards(payload["wl_row"])
+        summary["overview"] = {t: v for t, v in cards}
+        blocks.append("<div class='cards'>" + "".join(
+            f"<div class='card'><p class='t'>{html.escape(t)}</p><p class='v'>{html.escape(str(v))}</p></div>"
+            for t, v in cards
+        ) + "</div>")
+        figures["map_win_rates"] = map_win_rate_bar(payload["map_wl"])
+
+    if len(df_map):
+        comp_stats, agent_freq = comp_view(df_map, payload["roster"])
+        top = comp_stats.sort_values("Win Rate", ascending=False)
+        summary["comps"] = top.drop(columns=["Comp Mask"]).to_dict(orient="records")
+        summary["agent_frequency"] = dict(zip(agent_freq["Agent"], agent_freq["Count"]))
+
+        blocks.append("<h2>Compositions</h2>" + top[[
+            "Comp", "Games", "Wins", "Losses", "Win Rate", "ATK WR", "DEF WR", "Round Diff", "Pick Rate %"
+        ]].to_html(index=False, float_format="{:.1f}".format, border=0))
+        figures["pick_rate"] = pick_rate_bar(comp_stats)
+        figures["agent_frequency"] = agent_frequency_bar(agent_freq)
+
+    return summary, blocks, figures
+
+
+def render_player(name, payload):
+    role = payload["role"]
+    metrics, comp_df = player_view(payload["df_p"], role, payload.get("dist"))
+
+    summary = {"player": name, "role": role, "scrims": int(len(payload["df_p"])), "metrics": metrics}
+    if "Percentile" in comp_df.columns:
+        summary["percentiles"] = dict(zip(comp_df["Metric"], comp_df["Percentile"]))
+    blocks = [
+        f"<p>Compared against {'pro' if payload.get('dist') else 'VCT'} {html.escape(role)} "
+        f"{'medians and percentiles' if payload.get('dist') else 'averages'}</p>",
+        comp_df.to_html(index=False, float_format="{:.2f}".format, border=0),
+    ]
+    figures = {
+        "benchmark": benchmark_radar(
+            comp_df["Metric"].tolist(), comp_df["Player"].tolist(), comp_df["VCT Bench"].tolist(), name, role
+        )
+    }
+    return summary, blocks, figures
+
+
+def render_job(kind, name, payload, out_dir, formats):
+    render = render_map if kind == "map" else render_player
+    summary, blocks, figures = render(name, payload)
+
+    base = os.path.join(out_dir, f"{kind}_{slug(name)}")
+    written = []
+
+    if "json" in formats:
+        with open(base + ".json", "w") as f:
+            json.dump(summary, f, indent=2, default=to_json)
+        written.append(base + ".json")
+
+    if "html" in formats:
+        body = "\n".join(blocks) + "\n".join(
+            f"<h2>{html.escape(title.replace('_', ' ').title())}</h2>"
+            + fig.to_html(full_html=False, include_plotlyjs=False)
+            for title, fig in figures.items()
+        )
+        title = f"{'Map' if kind == 'map' else 'Player'} report — {name}"
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(PAGE_TEMPLATE.format(title=html.escape(title), body=body))
+        written.append(base + ".html")
+
+    if "png" in formats:
+        for title, fig in figures.items():
+            try:
+                fig.write_image(f"{base}_{title}.png", width=1000, height=600)
+                written.append(f"{base}_{title}.png")
+            except (ValueError, ImportError, RuntimeError) as e:
+                print(f"PNG skipped for {kind} {name} ({e})", file=sys.stderr)
+                break
+
+    return written
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render per-map and per-player reports without Streamlit.")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--formats", default="html,json", help=f"comma-separated: {','.join(FORMATS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--spreadsheet", default=None, help="spreadsheet name (default: first configured)")
+    parser.add_argument("--maps", nargs="*", help="only these maps")
+    parser.add_argument("--players", nargs="*", help="only these players")
+    parser.add_argument("--role", action="append", default=[], metavar="PLAYER=ROLE",
+                        help="benchmark role for a player (default: role of their most played agent)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise SystemExit(f"Unknown formats: {', '.join(sorted(unknown))}")
+
+    from tenants import configured_spreadsheets
+    spreadsheet = args.spreadsheet or next(iter(configured_spreadsheets().values()))
+    roles = dict(r.split("=", 1) for r in args.role if "=" in r)
+
+    from benchmarks import load_distribution
+    dist = load_distribution()
+
+    started = time.perf_counter()
+    comps, map_wl, players = fetch_batch_data(spreadsheet)
+    jobs = build_jobs(comps, map_wl, players, args.maps, args.players, roles, dist)
+    fetched = time.perf_counter()
+
+    os.makedirs(args.out, exist_ok=True)
+    written, failed = [], 0
+
+    with ProcessPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+        futures = {
+            pool.submit(render_job, kind, name, payload, args.out, formats): (kind, name)
+            for kind, name, payload in jobs
+        }
+        for future in as_completed(futures):
+            kind, name = futures[future]
+            try:
+                written.extend(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"Failed {kind} {name}: {e}", file=sys.stderr)
+
+    done = time.perf_counter()
+    print(
+        f"{len(jobs)} reports, {len(written)} files in {args.out} "
+        f"(fetch {fetched - started:.1f}s, render {done - fetched:.1f}s, {failed} failed)"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+from cache import resize, resource
+from tenants import current_spreadsheet
+
+# Searched columns and how much a hit in each counts towards the score
+SEARCH_FIELDS = {"Opponent": 3.0, "Comp": 2.0, "Notes": 1.0}
+
+_TOKEN = re.compile(r"[\w/]+")
+
+
+def tokenize(text):
+    """Lowercase words; "/" stays inside a token so KAY/O is one word."""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+# ---------------------------------------------------------
+# INVERTED INDEX
+# ---------------------------------------------------------
+# postings: token -> {row: weighted term frequency}. Each row's own token
+# counts are kept too, so a changed row can be taken out and re-added
+# without touching the rest of the index.
+def new_index():
+    return {
+        "postings": {},
+        "docs": [],      # per row: (field texts, Counter of weighted tokens)
+        "vocab": [],     # sorted tokens, for prefix lookups
+        "vocab_dirty": False,
+        "arrays": {},    # token -> (rows, weights) arrays, built on first query
+        "version": None,
+        "lock": threading.Lock(),
+    }
+
+
+def _row_texts(df, fields):
+    columns = [df[f].tolist() if f in df.columns else [""] * len(df) for f in fields]
+    for values in zip(*columns):
+        yield tuple(v if isinstance(v, str) else "" for v in values)
+
+
+def _row_tokens(texts, fields):
+    counts = Counter()
+    for text, field in zip(texts, fields):
+        for token in tokenize(text):
+            counts[token] += SEARCH_FIELDS[field]
+    return counts
+
+
+def _add_row(index, row, texts, fields):
+    counts = _row_tokens(texts, fields)
+    for token, weight in counts.items():
+        posting = index["postings"].get(token)
+        if posting is None:
+            posting = index["postings"][token] = {}
+            index["vocab_dirty"] = True
+        posting[row] = weight
+        index["arrays"].pop(token, None)
+    return texts, counts
+
+
+def _remove_row(index, row):
+    _, counts = index["docs"][row]
+    for token in counts:
+        posting = index["postings"][token]
+        posting.pop(row, None)
+        index["arrays"].pop(token, None)
+        if not posting:
+            del index["postings"][token]
+            index["vocab_dirty"] = True
+
+
+def update_index(index, df):
+    """Bring the index in line with `df`, re-indexing only rows whose search
+    text changed (or that were added/removed). Returns how many rows were
+    re-indexed."""
+    fields = list(SEARCH_FIELDS)
+    docs = index["docs"]
+    changed = 0
+
+    for i, texts in enumerate(_row_texts(df, fields)):
+        if i < len(docs):
+            if docs[i][0] == texts:
+                continue
+            _remove_row(index, i)
+            docs[i] = _add_row(index, i, texts, fields)
+        else:
+            docs.append(_add_row(index, i, texts, fields))
+        changed += 1
+
+    while len(docs) > len(df):
+        _remove_row(index, len(docs) - 1)
+        docs.pop()
+        changed += 1
+
+    if index["vocab_dirty"]:
+        index["vocab"] = sorted(index["postings"])
+        index["vocab_dirty"] = False
+    return changed
+
+
+def build_index(df):
+    index = new_index()
+    update_index(index, df)
+    index["version"] = df.attrs.get("data_version")
+    return index
+
+
+# ---------------------------------------------------------
+# QUERY
+# ---------------------------------------------------------
+def _expand(index, term, prefix):
+    if not prefix:
+        return [term] if term in index["postings"] else []
+    vocab = index["vocab"]
+    out = []
+    for i in range(bisect_left(vocab, term), len(vocab)):
+        if not vocab[i].startswith(term):
+            break
+        out.append(vocab[i])
+    return out
+
+
+def _posting_arrays(index, token):
+    arrays = index["arrays"].get(token)
+    if arrays is None:
+        posting = index["postings"][token]
+        arrays = (
+            np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+            np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+        )
+        index["arrays"][token] = arrays
+    return arrays
+
+
+def search(index, query, limit=100, allowed=None):
+    """Rows matching every query word, best first, as [(row, score)].
+
+    The last word matches as a prefix, so results follow partial input.
+    Scores are tf-idf with per-field weights (SEARCH_FIELDS) and saturated
+    term frequency, so one long note can't dominate. `allowed` (a boolean
+    array over rows) restricts the results, e.g. to a filter's rows."""
+    terms = tokenize(query)
+    n = len(index["docs"])
+    if not terms or not n:
+        return []
+
+    total = None
+    for k, term in enumerate(terms):
+        term_scores = np.zeros(n)
+        for token in _expand(index, term, prefix=k == len(terms) - 1):
+            rows, weights = _posting_arrays(index, token)
+            idf = np.log(1 + n / len(rows))
+            term_scores[rows] = np.maximum(term_scores[rows], idf * weights / (weights + 1))
+
+        if total is None:
+            total = term_scores
+        else:
+            total = np.where((total > 0) & (term_scores > 0), total + term_scores, 0)
+        if not total.any():
+            return []
+
+    if allowed is not None:
+        total[~np.asarray(allowed[:n], dtype=bool)] = 0
+    hits = np.flatnonzero(total)
+    if len(hits) > limit:
+        hits = hits[np.argpartition(-total[hits], limit - 1)[:limit]]
+    hits = hits[np.lexsort((hits, -total[hits]))]
+    return [(int(r), float(total[r])) for r in hits]
+
+
+def search_frame(index, df, query, limit=100, allowed=None):
+    """The matching rows of `df` with a Score column, best first."""
+    with index["lock"]:
+        hits = search(index, query, limit, allowed)
+    rows = [r for r, _ in hits if r < len(df)]
+    out = df.iloc[rows].copy()
+    out.insert(0, "Score", [s for r, s in hits if r < len(df)])
+    return out
+
+
+# ---------------------------------------------------------
+# ONE INDEX PER SPREADSHEET, UPDATED IN PLACE
+# ---------------------------------------------------------
+def get_search_index(spreadsheet):
+    # In the budgeted cache: evicted or cleared with the spreadsheet, then
+    # rebuilt from the frame on the next refresh
+    return resource("search_index", new_index, spreadsheet)
+
+
+def refresh_search_index(df, spreadsheet=None):
+    """Update the spreadsheet's index when the match history's data version
+    changed. Returns (index, rows re-indexed)."""
+    spreadsheet = spreadsheet or current_spreadsheet()
+    index = get_search_index(spreadsheet)
+    version = df.attrs.get("data_version")
+
+    with index["lock"]:
+        if version is not None and index["version"] == version:
+            return index, 0
+        changed = update_index(index, df)
+        index["version"] = version
+        resize("search_index", index, spreadsheet)
+    return index, changed
@@ -0,0 +1,286 @@
+"""Cleaned tables shared between replicas through memory-mapped Arrow files.
+
+Set HS_SHARED_CACHE to a directory every replica on the host can reach. Each
+loaded table is then published there as <version>.arrow (uncompressed Arrow
+IPC, so it can be mapped without copying) plus a CURRENT pointer. A replica
+that needs a table maps the current file instead of fetching and parsing
+the sheet. Text columns and null-free numeric and date columns are read in
+place, so those pages are shared through the page cache; numeric columns
+with blanks are copied into each process's own memory (see map_table).
+
+One replica refreshes at a time: the refresher holds an exclusive flock on
+the table's lock file while it fetches, parses and publishes. The others
+keep serving the previous version meanwhile, or wait for the first one.
+A published version counts as fresh for HS_SHARED_TTL seconds (default
+300); loaders' cache entries expire on the same clock so replicas pick up
+new versions. Locks are POSIX flocks, released if the holder dies.
+"""
+import functools
+import json
+import os
+import re
+import socket
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from tenants import current_spreadsheet
+
+SHARED_DIR = os.environ.get("HS_SHARED_CACHE")
+SHARED_TTL = float(os.environ.get("HS_SHARED_TTL", "300")) if SHARED_DIR else None
+
+ATTRS_KEY = b"hs_attrs"
+POINTER = "CURRENT"
+LOCK = "refresh.lock"
+
+# Versions kept on disk: the current one and the one before, which readers
+# that mapped it earlier may still be using (unlinking a mapped file is
+# safe on POSIX, but a slow reader may still be opening it)
+KEEP_VERSIONS = 2
+
+
+def enabled():
+    return bool(SHARED_DIR)
+
+
+# ---------------------------------------------------------
+# ARROW FILES (UNCOMPRESSED, SO MAPPING IS ZERO-COPY)
+# ---------------------------------------------------------
+def write_table(path, df):
+    """Write df (and its attrs) as an Arrow IPC file, atomically."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[ATTRS_KEY] = json.dumps(df.attrs).encode()
+    table = table.replace_schema_metadata(meta)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+# Text columns stay Arrow-backed ("str", pandas' own string dtype), so their
+# buffers are used in place. Numbers and dates keep their numpy dtypes, as in
+# frames loaded without the shared cache.
+_STRINGS = {pa.string(): pd.StringDtype("pyarrow", na_value=np.nan),
+            pa.large_string(): pd.StringDtype("pyarrow", na_value=np.nan)}
+
+
+def map_table(path):
+    """A DataFrame over the memory-mapped file. Text columns, and numeric or
+    date columns without nulls, use the mapped buffers directly; columns that
+    need converting (numbers with blanks, booleans) are copied into this
+    process's memory, and only those count against the cache budget."""
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    df = table.to_pandas(split_blocks=True, types_mapper=_STRINGS.get)
+    df.attrs = json.loads((table.schema.metadata or {}).get(ATTRS_KEY, b"{}"))
+
+    _owned[id(df)] = _owned_bytes(df, table)
+    weakref.finalize(df, _owned.pop, id(df), None)
+    return df
+
+
+# id(frame) -> bytes the frame holds outside the mapping, for map_table frames
+_owned = {}
+
+
+def _addresses(series):
+    arr = series.array
+    if hasattr(arr, "__arrow_array__"):
+        chunks = arr.__arrow_array__().chunks
+        return [b.address for c in chunks for b in c.buffers() if b is not None and b.size]
+    values = series.to_numpy(copy=False)
+    return [values.__array_interface__["data"][0]] if values.size else []
+
+
+def _owned_bytes(df, table):
+    buffers = [b for col in table.columns for c in col.chunks for b in c.buffers() if b is not None and b.size]
+    if not buffers:
+        return int(df.memory_usage(deep=True).sum())
+    lo = min(b.address for b in buffers)
+    hi = max(b.address + b.size for b in buffers)
+
+    owned = int(df.index.memory_usage())
+    for c in df.columns:
+        if not all(lo <= a < hi for a in _addresses(df[c])):
+            owned += int(df[c].memory_usage(index=False, deep=True))
+    return owned
+
+
+def owned_nbytes(df):
+    """Bytes a map_table frame keeps in this process's own memory (columns
+    that had to be converted), or None for any other frame."""
+    return _owned.get(id(df))
+
+
+# ---------------------------------------------------------
+# DIRECTORY LAYOUT: <dir>/<spreadsheet>/<table>/{CURRENT, <version>.arrow}
+# ---------------------------------------------------------
+def _safe(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "_"
+
+
+def table_dir(spreadsheet, table, root=None):
+    folder = os.path.join(root or SHARED_DIR, _safe(spreadsheet), _safe(table))
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def read_pointer(folder):
+    try:
+        with open(os.path.join(folder, POINTER)) as f:
+            pointer = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return pointer if os.path.exists(os.path.join(folder, pointer["file"])) else None
+
+
+def is_fresh(pointer, ttl=None):
+    ttl = SHARED_TTL if ttl is None else ttl
+    return pointer is not None and time.time() - pointer["published"] < (ttl or 0)
+
+
+def publish(folder, df):
+    """Write df as the table's current version. The caller holds the lock."""
+    version = df.attrs.get("data_version") or f"t{time.time_ns()}"
+    file_name = f"{_safe(version)}.arrow"
+    path = os.path.join(folder, file_name)
+    if not os.path.exists(path):
+        write_table(path, df)
+
+    pointer = {
+        "file": file_name,
+        "version": version,
+        "published": time.time(),
+        "by": f"{socket.gethostname()}:{os.getpid()}",
+        "rows": len(df),
+    }
+    tmp = os.path.join(folder, f"{POINTER}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(pointer, f)
+    os.replace(tmp, os.path.join(folder, POINTER))
+
+    versions = sorted(
+        (e for e in os.scandir(folder) if e.name.endswith(".arrow")),
+        key=lambda e: e.stat().st_mtime, reverse=True
+    )
+    for e in versions[KEEP_VERSIONS:]:
+        if e.name != file_name:
+            os.unlink(e.path)
+    return pointer
+
+
+# ---------------------------------------------------------
+# REFRESH LOCK (ONE REPLICA FETCHES, THE OTHERS MAP)
+# ---------------------------------------------------------
+class RefreshLock:
+    """Exclusive flock on a table's lock file. acquire(wait=False) returns
+    False instead of blocking when another process holds it."""
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, LOCK)
+        self.fd = None
+
+    def acquire(self, wait=True):
+        import fcntl
+
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+
+    def release(self):
+        import fcntl
+
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+def load_shared(spreadsheet, table, build, root=None, ttl=None):
+    """The table from the shared directory, refreshed with build() by whichever
+    replica gets the lock once the current version is older than the TTL."""
+    folder = table_dir(spreadsheet, table, root)
+    pointer = read_pointer(folder)
+    if is_fresh(pointer, ttl):
+        return map_table(os.path.join(folder, pointer["file"]))
+
+    lock = RefreshLock(folder)
+    if not lock.acquire(wait=pointer is None):
+        # Another replica is refreshing; serve the version we have meanwhile
+        return map_table(os.path.join(folder, pointer["file"]))
+
+    try:
+        # Another replica may have published while we waited for the lock
+        latest = read_pointer(folder)
+        if not is_fresh(latest, ttl):
+            latest = publish(folder, build())
+    finally:
+        lock.release()
+    return map_table(os.path.join(folder, latest["file"]))
+
+
+def _table_name(func, args):
+    return "--".join([func.__name__] + [str(a) for a in args])
+
+
+def shared_table(func):
+    """Route a frame loader through the shared directory when HS_SHARED_CACHE
+    is set; otherwise call it directly. Put it under @cached."""
+    @functools.wraps(func)
+    def wrapper(*args, spreadsheet=None, **kwargs):
+        if not enabled():
+            return func(*args, spreadsheet=spreadsheet, **kwargs)
+
+        spreadsheet = spreadsheet or current_spreadsheet()
+        return load_shared(
+            spreadsheet, _table_name(func, args),
+            lambda: func(*args, spreadsheet=spreadsheet, **kwargs)
+        )
+
+    def share(df, *args, spreadsheet=None):
+        """Publish an already loaded frame (e.g. after a write-back)."""
+        if not enabled():
+            return
+        folder = table_dir(spreadsheet or current_spreadsheet(), _table_name(func, args))
+        lock = RefreshLock(folder)
+        lock.acquire()
+        try:
+            publish(folder, df)
+        finally:
+            lock.release()
+
+    wrapper.share = share
+    return wrapper
+
+
+def status(root=None):
+    """One row per shared table: version, age, rows, file size, publisher."""
+    root = root or SHARED_DIR
+    rows = []
+    if not root or not os.path.isdir(root):
+        return pd.DataFrame(rows, columns=["Spreadsheet", "Table", "Version", "Age (s)", "Rows", "Size (KB)", "By"])
+    for sheet in sorted(os.listdir(root)):
+        for table in sorted(os.listdir(os.path.join(root, sheet))):
+            folder = os.path.join(root, sheet, table)
+            pointer = read_pointer(folder)
+            if pointer is None:
+                continue
+            rows.append({
+                "Spreadsheet": sheet,
+                "Table": table,
+                "Version": pointer["version"],
+                "Age (s)": time.time() - pointer["published"],
+                "Rows": pointer["rows"],
+                "Size (KB)": os.path.getsize(os.path.join(folder, pointer["file"])) / 1024,
+                "By": pointer["by"],
+            })
+    return pd.DataFrame(rows, columns=["Spreadsheet", "Table", "Version", "Age (s)", "Rows", "Size (KB)", "By"])
@@ -0,0 +1,230 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pandas as pd
+
+from cache import resize, resource
+from data_loader import load_clean_data, load_comp_data, load_player_stats
+from tenants import current_spreadsheet
+
+# Cleaned tables exposed to SQL, under these table names
+SQL_TABLES = {
+    "match_history": load_clean_data,
+    "comps": load_comp_data,
+    "player_stats": load_player_stats,
+}
+
+# Files the app writes at runtime (saved queries) live here, outside the code
+DATA_DIR = os.environ.get("HS_DATA_DIR", "user_data")
+SAVED_QUERIES_PATH = os.environ.get("HS_SAVED_QUERIES", os.path.join(DATA_DIR, "saved_queries.json"))
+
+EXAMPLE_QUERIES = {
+    "Pistol wins on Lotus, last 30 days": (
+        'SELECT "Game Level", COUNT(*) AS games,\n'
+        '       SUM("Pistols (ATK)") AS atk_pistols, SUM("Pistols (DEF)") AS def_pistols,\n'
+        '       ROUND(100.0 * (SUM("Pistols (ATK)") + SUM("Pistols (DEF)")) / (2 * COUNT(*)), 1) AS pistol_win_pct\n'
+        "FROM match_history\n"
+        "WHERE Map = 'Lotus' AND DATE >= date('now', '-30 day')\n"
+        'GROUP BY "Game Level"'
+    ),
+    "Win rate by map": (
+        "SELECT Map, COUNT(*) AS games,\n"
+        "       ROUND(100.0 * SUM(Result = 'Win') / COUNT(*), 1) AS win_pct\n"
+        "FROM match_history GROUP BY Map ORDER BY games DESC"
+    ),
+    "Most played agents per player": (
+        "SELECT Player, Agent, COUNT(*) AS scrims, ROUND(AVG(ACS), 1) AS avg_acs\n"
+        "FROM player_stats GROUP BY Player, Agent ORDER BY Player, scrims DESC"
+    ),
+}
+
+# Only reads are allowed while a user query runs
+_READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+}
+
+
+def _read_only(action, *args):
+    return sqlite3.SQLITE_OK if action in _READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+# ---------------------------------------------------------
+# ENGINE: ONE IN-MEMORY DATABASE PER SPREADSHEET
+# ---------------------------------------------------------
+# Pistol cells typed as W/L stay text in the loaded frame (coerce_numeric
+# won't discard them); SQL sums them, so they are counted as 1/0 here
+PISTOL_COLUMNS = ["Pistols (ATK)", "Pistols (DEF)"]
+_PISTOL_WINS = {"1": 1, "w": 1, "win": 1, "won": 1, "0": 0, "l": 0, "loss": 0, "lost": 0}
+
+def get_engine(spreadsheet):
+    """The spreadsheet's SQLite database, kept in the budgeted cache (sized
+    by its pages) so it is evicted with the spreadsheet's other entries and
+    rebuilt from the cached frames on the next refresh."""
+    def build():
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        return {"conn": conn, "lock": threading.Lock(), "versions": {}, "counts": {}}
+
+    return resource("sql_engine", build, spreadsheet)
+
+
+def _sql_frame(name, df):
+    if name != "match_history":
+        return df
+    for c in PISTOL_COLUMNS:
+        if c in df.columns and not pd.api.types.is_numeric_dtype(df[c]):
+            df = df.assign(**{c: df[c].astype(str).str.strip().str.lower().map(_PISTOL_WINS)})
+    return df
+
+
+def refresh_engine(spreadsheet=None):
+    """Load or reload only the tables whose data version changed since the
+    last refresh. Returns the engine and the names of reloaded tables."""
+    spreadsheet = spreadsheet or current_spreadsheet()
+    engine = get_engine(spreadsheet)
+    reloaded = []
+
+    for name, load in SQL_TABLES.items():
+        df = load(spreadsheet=spreadsheet)
+        version = df.attrs.get("data_version")
+        if version is not None and engine["versions"].get(name) == version:
+            continue
+
+        with engine["lock"]:
+            _sql_frame(name, df).to_sql(name, engine["conn"], if_exists="replace", index=False, chunksize=5000)
+            engine["versions"][name] = version
+            engine["counts"].clear()
+        reloaded.append(name)
+
+    if reloaded:
+        # Re-store so the cache charges the database's new size
+        with engine["lock"]:
+            resize("sql_engine", engine, spreadsheet)
+
+    return engine, reloaded
+
+
+def table_schema(engine):
+    with engine["lock"]:
+        rows = []
+        for name in SQL_TABLES:
+            for _, col, ctype, *_ in engine["conn"].execute(f'PRAGMA table_info("{name}")'):
+                rows.append({"Table": name, "Column": col, "Type": ctype})
+    return pd.DataFrame(rows, columns=["Table", "Column", "Type"])
+
+
+def _check_select(sql):
+    sql = sql.strip()
+    if not sql.lower().startswith(("select", "with")):
+        raise ValueError("Only SELECT queries are allowed.")
+    # A ";" ends the statement only where SQLite's own tokenizer says so,
+    # not inside a string literal or quoted name
+    for i, ch in enumerate(sql):
+        if ch == ";" and sqlite3.complete_statement(sql[:i + 1]):
+            if sql[i + 1:].strip(" \t\r\n;"):
+                raise ValueError("Run one statement at a time.")
+            sql = sql[:i]
+            break
+    # The query is wrapped in a subquery; end a trailing -- comment first
+    return sql + "\n"
+
+
+# ---------------------------------------------------------
+# PAGINATED / STREAMED RESULTS
+# ---------------------------------------------------------
+def count_rows(engine, sql):
+    """Total rows the query returns, counted once per query and table
+    versions (paging through the result reuses it)."""
+    sql = _check_select(sql)
+    key = (sql.strip(), tuple(sorted(engine["versions"].items())))
+    with engine["lock"]:
+        if key in engine["counts"]:
+            return engine["counts"][key]
+        engine["conn"].set_authorizer(_read_only)
+        try:
+            total = engine["conn"].execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+        finally:
+            engine["conn"].set_authorizer(None)
+        engine["counts"][key] = total
+        return total
+
+
+def query_page(engine, sql, page=0, page_size=100):
+    """One page of results; SQLite only produces the rows on that page."""
+    sql = _check_select(sql)
+    with engine["lock"]:
+        engine["conn"].set_authorizer(_read_only)
+        try:
+            cur = engine["conn"].execute(
+                f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?", (page_size, page * page_size)
+            )
+            columns = [d[0] for d in cur.description]
+            return pd.DataFrame(cur.fetchall(), columns=columns)
+        finally:
+            engine["conn"].set_authorizer(None)
+
+
+def iter_csv(engine, sql, chunk_size=5000):
+    """Yield the full result as CSV text, header first, `chunk_size` rows at
+    a time from one cursor (no LIMIT/OFFSET re-scans, no DataFrames). The
+    engine stays locked until the generator finishes or is closed."""
+    sql = _check_select(sql)
+    with engine["lock"]:
+        engine["conn"].set_authorizer(_read_only)
+        try:
+            cur = engine["conn"].execute(sql)
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator="\n")
+            writer.writerow(d[0] for d in cur.description)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                writer.writerows(rows)
+                yield buf.getvalue()
+                if not rows:
+                    return
+                buf.seek(0)
+                buf.truncate()
+        finally:
+            engine["conn"].set_authorizer(None)
+
+
+def export_csv(engine, sql, chunk_size=5000):
+    """The full result as a CSV file object, written chunk by chunk to a
+    temporary file (on disk once it passes a few MB) and rewound."""
+    f = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+    for text in iter_csv(engine, sql, chunk_size):
+        f.write(text.encode("utf-8"))
+    f.seek(0)
+    return f
+
+
+# ---------------------------------------------------------
+# SAVED QUERIES
+# ---------------------------------------------------------
+def load_saved_queries():
+    saved = dict(EXAMPLE_QUERIES)
+    if os.path.exists(SAVED_QUERIES_PATH):
+        with open(SAVED_QUERIES_PATH) as f:
+            saved.update(json.load(f))
+    return saved
+
+
+def save_query(name, sql):
+    saved = {}
+    if os.path.exists(SAVED_QUERIES_PATH):
+        with open(SAVED_QUERIES_PATH) as f:
+            saved = json.load(f)
+    saved[name] = sql
+
+    # Write a temp file and swap it in, so a crash can't leave half a file
+    folder = os.path.dirname(SAVED_QUERIES_PATH) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp, SAVED_QUERIES_PATH)
@@ -0,0 +1,48 @@
+import os
+
+import streamlit as st
+
+DEFAULT_SPREADSHEET = "HS SPREADSHEET NEW ROSTER"
+
+
+# ---------------------------------------------------------
+# WHICH SPREADSHEETS THIS SERVER CAN SHOW
+# ---------------------------------------------------------
+def configured_spreadsheets():
+    """{label: spreadsheet name}. Read from the [spreadsheets] table in
+    secrets.toml, or HS_SPREADSHEETS="Main=HS SPREADSHEET NEW ROSTER;Academy=..."."""
+    try:
+        if "spreadsheets" in st.secrets:
+            return dict(st.secrets["spreadsheets"])
+    except Exception:
+        pass
+
+    env = os.environ.get("HS_SPREADSHEETS", "")
+    pairs = [p.split("=", 1) for p in env.split(";") if "=" in p]
+    if pairs:
+        return {label.strip(): name.strip() for label, name in pairs}
+
+    return {"Main": DEFAULT_SPREADSHEET}
+
+
+def current_spreadsheet():
+    sheets = configured_spreadsheets()
+    try:
+        chosen = st.session_state.get("spreadsheet")
+    except Exception:
+        chosen = None
+    return chosen if chosen in sheets.values() else next(iter(sheets.values()))
+
+
+def spreadsheet_selector():
+    """Sidebar roster picker; the choice lives in session state so every page
+    of the session reads the same spreadsheet."""
+    sheets = configured_spreadsheets()
+    if len(sheets) < 2:
+        return current_spreadsheet()
+
+    labels = list(sheets.keys())
+    names = list(sheets.values())
+    label = st.sidebar.selectbox("Roster", labels, index=names.index(current_spreadsheet()))
+    st.session_state["spreadsheet"] = sheets[label]
+    return sheets[label]
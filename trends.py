@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Scrims are logged per game; the benchmark page also assumes 24 rounds
+ROUNDS_PER_SCRIM = 24
+
+
+# ---------------------------------------------------------
+# PREFIX SUMS
+# ---------------------------------------------------------
+def _counts(values):
+    # A count column the sheet kept as text (e.g. W/L) counts its numbers
+    # only; blanks and text add 0
+    return pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def prefix_sums(values):
+    """[0, v0, v0+v1, ...] so any window sum is two lookups."""
+    return np.concatenate(([0.0], np.cumsum(_counts(values))))
+
+
+def extend_prefix_sums(prefix, new_values):
+    return np.concatenate((prefix, prefix[-1] + np.cumsum(_counts(new_values))))
+
+
+def window_sums(prefix, window):
+    """Sum of the last `window` values ending at every position."""
+    end = np.arange(1, len(prefix))
+    start = np.maximum(end - window, 0)
+    return prefix[end] - prefix[start]
+
+
+# ---------------------------------------------------------
+# PER-GROUP TREND TABLES
+# ---------------------------------------------------------
+def build_trend_table(df, group_col, sort_col, value_cols):
+    """{group: {"key": sort keys, col: prefix sums}} over `df` sorted by
+    `sort_col`. Built once per data version; windows are then O(1) per point."""
+    table = {}
+    ordered = df.sort_values(sort_col, kind="stable")
+
+    for group, g in ordered.groupby(group_col, sort=False):
+        entry = {"key": g[sort_col].to_numpy()}
+        for c in value_cols:
+            entry[c] = prefix_sums(g[c].to_numpy())
+        table[group] = entry
+
+    return table
+
+
+def extend_trend_table(table, new_rows, group_col, sort_col, value_cols):
+    """A new table with `new_rows` appended, extending each group's arrays
+    instead of rebuilding them. `table` is not modified (it may be a cached
+    entry). Returns None if a new row sorts before the last one already in
+    its group; the caller then rebuilds."""
+    out = dict(table)
+    for group, g in new_rows.sort_values(sort_col, kind="stable").groupby(group_col, sort=False):
+        keys = g[sort_col].to_numpy()
+        entry = table.get(group)
+        if entry is None:
+            out[group] = {"key": keys}
+            for c in value_cols:
+                out[group][c] = prefix_sums(g[c].to_numpy())
+            continue
+
+        if len(entry["key"]) and keys[0] < entry["key"][-1]:
+            return None
+        out[group] = {"key": np.concatenate((entry["key"], keys))}
+        for c in value_cols:
+            out[group][c] = extend_prefix_sums(entry[c], g[c].to_numpy())
+
+    return out
+
+
+def _ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den * 100, np.nan)
+
+
+# ---------------------------------------------------------
+# MAP FORM (MATCH HISTORY)
+# ---------------------------------------------------------
+MAP_TREND_COLUMNS = ["Games", "Wins", "ATK W", "ATK L", "DEF W", "DEF L"]
+
+
+def _map_trend_rows(df):
+    if "DATE" not in df.columns or "Map" not in df.columns:
+        # Nothing to place on a timeline: same as a sheet with no rows
+        return pd.DataFrame(columns=["Map", "DATE"] + MAP_TREND_COLUMNS)
+    df = df.assign(
+        Games=1,
+        Wins=(df["Result"] == "Win").astype(int) if "Result" in df.columns else 0,
+        **{c: 0 for c in MAP_TREND_COLUMNS[2:] if c not in df.columns},
+    )
+    return df[df["DATE"].notna()]
+
+
+def build_map_trends(df):
+    return build_trend_table(_map_trend_rows(df), "Map", "DATE", MAP_TREND_COLUMNS)
+
+
+def extend_map_trends(table, new_rows):
+    """build_map_trends(df + new_rows) from build_map_trends(df), or None."""
+    return extend_trend_table(table, _map_trend_rows(new_rows), "Map", "DATE", MAP_TREND_COLUMNS)
+
+
+def rolling_map_form(table, window, maps=None):
+    frames = []
+
+    for m, e in table.items():
+        if maps is not None and m not in maps:
+            continue
+
+        games = window_sums(e["Games"], window)
+        atk_w, atk_l = window_sums(e["ATK W"], window), window_sums(e["ATK L"], window)
+        def_w, def_l = window_sums(e["DEF W"], window), window_sums(e["DEF L"], window)
+
+        frames.append(pd.DataFrame({
+            "Map": m,
+            "DATE": e["key"],
+            "Games": games,
+            "Win Rate": _ratio(window_sums(e["Wins"], window), games),
+            "ATK Round %": _ratio(atk_w, atk_w + atk_l),
+            "DEF Round %": _ratio(def_w, def_w + def_l),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=["Map", "DATE", "Games", "Win Rate", "ATK Round %", "DEF Round %"])
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------------------------------------------------
+# PLAYER FORM (LONG-FORMAT SCRIM STATS)
+# ---------------------------------------------------------
+PLAYER_TREND_COLUMNS = ["Scrims", "ACS", "Kills"]
+
+
+def build_player_trends(df):
+    df = df.assign(Scrims=df["ACS"].notna().astype(int))
+    return build_trend_table(df, "Player", "Scrim", PLAYER_TREND_COLUMNS)
+
+
+def rolling_player_form(table, window, players=None):
+    frames = []
+
+    for p, e in table.items():
+        if players is not None and p not in players:
+            continue
+
+        scrims = window_sums(e["Scrims"], window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            acs = np.where(scrims > 0, window_sums(e["ACS"], window) / scrims, np.nan)
+            kpr = np.where(scrims > 0, window_sums(e["Kills"], window) / (scrims * ROUNDS_PER_SCRIM), np.nan)
+
+        frames.append(pd.DataFrame({
+            "Player": p,
+            "Scrim": e["key"],
+            "ACS": acs,
+            "KPR": kpr,
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=["Player", "Scrim", "ACS", "KPR"])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,76 @@
+import pandas as pd
+
+from benchmarks import METRICS, player_metrics, compare_to_benchmark, rank_roster
+from comps import AGENT_ROLES, agent_counts, comp_stats_table
+
+# ---------------------------------------------------------
+# PAGE COMPUTATIONS SHARED WITH THE HEADLESS REPORT (report.py)
+# ---------------------------------------------------------
+
+
+def map_cards(row):
+    """Overview stat cards for one row of the Map W/L Rate sheet."""
+    return [
+        ("Total Games Played", int(row["Total Games Played"])),
+        ("Map Win %", f"{row['Map Win%']:.2f}%"),
+        ("Atk Win %", f"{row['Atk Win%']:.2f}%"),
+        ("Def Win %", f"{row['Def Win%']:.2f}%"),
+        ("Pistol Win % (ATK)", f"{row['Pistol Win% (ATK)']:.2f}%"),
+        ("Pistol Win % (DEF)", f"{row['Pistol Win% (DEF)']:.2f}%"),
+    ]
+
+
+def map_summary(df, map_col="Map", result_col="Result"):
+    """Games, Wins, Draws, Losses and Win Rate (%) per map, aggregated from
+    match rows so charts get one row per map."""
+    result = df[result_col]
+    summary = (
+        pd.DataFrame({
+            "Map": df[map_col].to_numpy(),
+            "Games": 1,
+            "Wins": (result == "Win").to_numpy().astype(int),
+            "Draws": (result == "Tie").to_numpy().astype(int),
+            "Losses": (result == "Loss").to_numpy().astype(int),
+        })
+        .query("Map != ''")
+        .groupby("Map", as_index=False)
+        .sum()
+    )
+    summary["Win Rate"] = summary["Wins"] / summary["Games"] * 100
+    return summary
+
+
+def comp_view(df_map, roster, result_col="Result"):
+    """Per-comp stats (with pick rate) and agent frequency for one map."""
+    comp_stats = comp_stats_table(df_map, roster, result_col)
+    comp_stats["Pick Rate %"] = (comp_stats["Games"] / max(df_map.shape[0], 1)) * 100
+
+    agent_freq = agent_counts(df_map["Comp Mask"].to_numpy(), roster).reset_index()
+    agent_freq.columns = ["Agent", "Count"]
+
+    return comp_stats, agent_freq
+
+
+def infer_role(df_p, agent_col="Agent"):
+    """Role of the agent a player has logged most often."""
+    if agent_col not in df_p.columns or df_p[agent_col].dropna().empty:
+        return None
+    top = df_p[agent_col].dropna().value_counts().index[0]
+    return next((role for role, agents in AGENT_ROLES.items() if top in agents), None)
+
+
+def player_view(df_p, role, dist=None):
+    """Metrics and benchmark table; `dist` is the pro distribution from
+    benchmarks.load_distribution(), if any."""
+    metrics = player_metrics(df_p)
+    return metrics, compare_to_benchmark(metrics, role, dist)
+
+
+def roster_view(players, dist, roles=None):
+    """One row per player (metrics, role, pro percentiles), ranking the whole
+    roster against the distribution at once. Roles default to infer_role."""
+    rows = []
+    for player, df_p in players.groupby("Player", sort=False):
+        role = (roles or {}).get(player) or infer_role(df_p) or "Duelist"
+        rows.append({"Player": player, "Role": role, **player_metrics(df_p)})
+    return rank_roster(pd.DataFrame(rows, columns=["Player", "Role"] + METRICS), dist)
@@ -0,0 +1,84 @@
+import streamlit as st
+
+# ---------------------------------------------------------
+# SEARCH BOX THAT RERUNS AS YOU TYPE
+# ---------------------------------------------------------
+# st.text_input only sends its value on Enter or blur. This inline component
+# (no extra package, no build step) sends it after a short pause in typing,
+# and at once on Enter.
+_SEARCH_HTML = """
+<label class="hs-label"></label>
+<input class="hs-input" type="text" autocomplete="off" spellcheck="false" />
+"""
+
+_SEARCH_CSS = """
+.hs-label {
+    display: block;
+    font-size: 0.875rem;
+    margin-bottom: 0.25rem;
+    color: var(--st-text-color, inherit);
+}
+.hs-input {
+    box-sizing: border-box;
+    width: 100%;
+    padding: 0.5rem 0.75rem;
+    font: inherit;
+    color: var(--st-text-color, inherit);
+    background: var(--st-secondary-background-color, #f0f2f6);
+    border: 1px solid transparent;
+    border-radius: 0.5rem;
+    outline: none;
+}
+.hs-input:focus {
+    border-color: var(--st-primary-color, #d4af37);
+}
+"""
+
+_SEARCH_JS = """
+export default function(component) {
+    const { data, setStateValue, parentElement } = component;
+    const label = parentElement.querySelector(".hs-label");
+    const input = parentElement.querySelector(".hs-input");
+    label.textContent = data.label;
+    input.placeholder = data.placeholder;
+    // Only take the server's value while the viewer isn't typing
+    if (document.activeElement !== input && parentElement.activeElement !== input) {
+        input.value = data.value;
+    }
+
+    let timer;
+    const send = () => {
+        clearTimeout(timer);
+        setStateValue("value", input.value);
+    };
+    input.oninput = () => {
+        clearTimeout(timer);
+        timer = setTimeout(send, data.debounce_ms);
+    };
+    input.onkeydown = (e) => {
+        if (e.key === "Enter") send();
+    };
+    return () => clearTimeout(timer);
+}
+"""
+
+_search_box = st.components.v2.component(
+    "hs_search_box", html=_SEARCH_HTML, css=_SEARCH_CSS, js=_SEARCH_JS
+)
+
+
+def search_box(label, key, placeholder="", debounce_ms=250):
+    """A text box whose value reaches Python `debounce_ms` after the last
+    keystroke (or on Enter), so results follow the typing. Returns the text."""
+    result = _search_box(
+        key=key,
+        data={
+            "label": label,
+            "placeholder": placeholder,
+            "value": st.session_state.get(key, {}).get("value") or "",
+            "debounce_ms": debounce_ms,
+        },
+        default={"value": ""},
+        on_value_change=lambda: None,
+    )
+    return result.value or ""
@@ -0,0 +1,161 @@
+"""Append a match to "All Match History" from the dashboard.
+
+The row goes to the sheet in one append call. Before that call, the cleaned
+match frame in the cache is replaced by a copy with the row added under a new
+data version (optimistic update), so every page shows it on its next rerun
+without refetching the sheet. The match_store bitmaps and the map form
+prefix sums are extended in place of a rebuild; other derived tables
+rebuild for the new version as usual, and the search index re-indexes only
+the new row. If the write fails, the previous frame is put back.
+"""
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from cache import cached, get_cache, prime_derived
+from data_loader import (
+    WORKSHEET_NAME, SHEET_LAYOUTS,
+    clean_match_history, fingerprint, load_clean_data, open_worksheet,
+)
+from match_store import extend_match_store
+from tenants import current_spreadsheet
+from trends import extend_map_trends
+
+HEADER_ROW = SHEET_LAYOUTS[WORKSHEET_NAME]["header_rows"][1]
+
+
+# ---------------------------------------------------------
+# SHEET ROW FROM A FORM ENTRY
+# ---------------------------------------------------------
+@cached(ttl=600)
+def load_match_header(spreadsheet=None):
+    """The All Match History header row, full width, in sheet order."""
+    rows = open_worksheet(WORKSHEET_NAME, spreadsheet).get(f"{HEADER_ROW + 1}:{HEADER_ROW + 1}")
+    return [c.strip() for c in rows[0]] if rows else []
+
+
+def _norm(name):
+    return name.replace(" ", "").lower()
+
+
+def derive_result(entry):
+    """Played, Differential and Result from Won / Lost."""
+    won, lost = int(entry.get("Won") or 0), int(entry.get("Lost") or 0)
+    result = "Win" if won > lost else "Loss" if won < lost else "Tie"
+    return {**entry, "Played": won + lost, "Differential": won - lost, "Result": result}
+
+
+def match_row(header, entry):
+    """Cell values for `entry` ({cleaned column: value}) in the sheet's
+    column order. The roster goes into the first roster column; dates are
+    written day first, as the sheet holds them."""
+    by_name = {_norm(k): v for k, v in derive_result(entry).items()}
+    roster_cols = [i for i, h in enumerate(header) if any(p in h.lower() for p in ["roster", "pink", "cyan"])]
+
+    row = []
+    for i, h in enumerate(header):
+        if roster_cols and i == roster_cols[0]:
+            value = entry.get("Rosters", "")
+        elif i in roster_cols:
+            value = ""
+        else:
+            value = by_name.get(_norm(h), "")
+
+        if hasattr(value, "strftime"):
+            value = value.strftime("%d/%m/%Y")
+        row.append("" if value is None else str(value))
+    return row
+
+
+# ---------------------------------------------------------
+# OPTIMISTIC FRAME UPDATE
+# ---------------------------------------------------------
+def _align_dtypes(new, df):
+    # A one-row clean can type a column differently from the full sheet
+    # (e.g. a count column the sheet keeps as text); follow the cached frame
+    for c in df.columns:
+        if c not in new.columns or new[c].dtype == df[c].dtype:
+            continue
+        if pd.api.types.is_numeric_dtype(df[c]):
+            new[c] = pd.to_numeric(new[c], errors="coerce")
+        elif pd.api.types.is_datetime64_any_dtype(df[c]):
+            new[c] = pd.to_datetime(new[c], errors="coerce", dayfirst=True)
+        else:
+            new[c] = new[c].astype(df[c].dtype)
+    return new
+
+
+def append_to_frame(df, header, row):
+    """A new frame: `df` plus the cleaned sheet row, under a new data version.
+    `df` is not modified."""
+    new = clean_match_history([[] for _ in range(HEADER_ROW)] + [header, row])
+    new = _align_dtypes(new.reindex(columns=df.columns), df)
+
+    out = pd.concat([df, new], ignore_index=True)
+    # The raw grid behind df no longer matches, so drop its grid_version
+    out.attrs = {k: v for k, v in df.attrs.items() if k != "grid_version"}
+    out.attrs["data_version"] = fingerprint([row], df.attrs.get("data_version"))
+    return out, new
+
+
+@st.cache_resource
+def get_write_lock():
+    # One append at a time per process, so two optimistic frames can't race
+    return threading.Lock()
+
+
+class CacheSyncError(Exception):
+    """The row was saved, but publishing the new frame to the other replicas
+    failed. `frame` is the new frame, already in this process's cache."""
+
+    def __init__(self, frame, cause):
+        super().__init__(f"Saved, but other replicas will only see it after their refresh ({cause}).")
+        self.frame = frame
+
+
+def add_match(entry, spreadsheet=None):
+    """Append one match to the sheet and the cached frame. Returns the new
+    frame; on a failed write the cache is rolled back and the error raised.
+    If the write succeeds but the shared copy can't be published, raises
+    CacheSyncError (the match is saved; don't retry)."""
+    if not str(entry.get("Opponent", "")).strip():
+        raise ValueError("A match needs an opponent.")
+
+    spreadsheet = spreadsheet or current_spreadsheet()
+    header = load_match_header(spreadsheet=spreadsheet)
+    if not header:
+        raise ValueError(f"No header row found in {WORKSHEET_NAME}.")
+    row = match_row(header, entry)
+
+    with get_write_lock():
+        before = load_clean_data(spreadsheet=spreadsheet)
+        after, new = append_to_frame(before, header, row)
+
+        load_clean_data.prime(after, spreadsheet=spreadsheet)
+        store = get_cache().peek(spreadsheet, ("derived", "match_store", before.attrs.get("data_version")))
+        if store is not None and store["n"] == len(before):
+            prime_derived("match_store", after.attrs["data_version"], extend_match_store(store, new), spreadsheet)
+        trends = get_cache().peek(spreadsheet, ("derived", "map_trends", before.attrs.get("data_version")))
+        trends = extend_map_trends(trends, new) if trends is not None else None
+        if trends is not None:
+            prime_derived("map_trends", after.attrs["data_version"], trends, spreadsheet)
+
+        try:
+            open_worksheet(WORKSHEET_NAME, spreadsheet).append_row(
+                row,
+                value_input_option="USER_ENTERED",
+                insert_data_option="INSERT_ROWS",
+                table_range=f"A{HEADER_ROW + 1}",
+            )
+        except Exception:
+            load_clean_data.replace(after, before, spreadsheet=spreadsheet)
+            raise
+
+        # Other replicas map the new frame instead of waiting for the TTL
+        try:
+            load_clean_data.share(after, spreadsheet=spreadsheet)
+        except Exception as e:
+            raise CacheSyncError(after, e) from e
+
+    return after